@@ -0,0 +1,135 @@
+/**
+ * Micro-benchmark of the pending notification tracking in src/tracking.ts
+ *
+ * Compares the previous full scans with NotificationTracker on synthetic
+ * notebooks of 5,000 code cells, with every cell pending and a few open
+ * notebooks. Build the library first: `jlpm build:lib`, then run
+ * `node benchmarks/tracking.mjs`.
+ */
+import { performance } from 'node:perf_hooks';
+
+import { NotificationTracker } from '../lib/tracking.js';
+
+const CELLS = 5000;
+const NOTEBOOKS = 4;
+const MSGS_PER_CELL = 2;
+
+const notebooks = Array.from({ length: NOTEBOOKS }, (_, n) => ({
+  id: `notebook-${n}`,
+  widgets: Array.from({ length: CELLS }, (_, c) => ({
+    model: { id: `cell-${n}-${c}`, isDisposed: false },
+  })),
+}));
+
+function time(label, fn) {
+  const start = performance.now();
+  const count = fn();
+  const elapsed = performance.now() - start;
+  console.log(
+    `${label.padEnd(46)} ${elapsed.toFixed(2).padStart(10)} ms` +
+      (count !== undefined ? `  (${count} cells)` : ''),
+  );
+  return elapsed;
+}
+
+// Previous implementation: Map by cell, and msg_id -> cell maps per notebook
+function legacyState() {
+  const cellNotificationMap = new Map();
+  const msgIdToCellByNotebook = new Map();
+  for (const notebook of notebooks) {
+    const msgMap = new Map();
+    for (const widget of notebook.widgets) {
+      cellNotificationMap.set(widget.model.id, {
+        notebookId: notebook.id,
+        notificationIssued: false,
+      });
+      for (let m = 0; m < MSGS_PER_CELL; m++) {
+        msgMap.set(`${widget.model.id}-msg-${m}`, widget.model.id);
+      }
+    }
+    msgIdToCellByNotebook.set(notebook.id, msgMap);
+  }
+  return { cellNotificationMap, msgIdToCellByNotebook };
+}
+
+function trackerState() {
+  const tracker = new NotificationTracker();
+  for (const notebook of notebooks) {
+    for (const widget of notebook.widgets) {
+      tracker.set(widget.model.id, {
+        notebookId: notebook.id,
+        notificationIssued: false,
+        cell: widget.model,
+      });
+      for (let m = 0; m < MSGS_PER_CELL; m++) {
+        tracker.addMessage(`${widget.model.id}-msg-${m}`, widget.model.id);
+      }
+    }
+  }
+  return tracker;
+}
+
+console.log(
+  `${NOTEBOOKS} notebooks x ${CELLS} pending cells, ` +
+    `${MSGS_PER_CELL} tracked execute_requests per cell\n`,
+);
+
+const notebook = notebooks[0];
+
+{
+  const { cellNotificationMap, msgIdToCellByNotebook } = legacyState();
+  time('legacy: clean up every cell of one notebook', () => {
+    for (const widget of notebook.widgets) {
+      const msgIdMap = msgIdToCellByNotebook.get(notebook.id);
+      if (msgIdMap) {
+        for (const [msgId, cellId] of msgIdMap.entries()) {
+          if (cellId === widget.model.id) {
+            msgIdMap.delete(msgId);
+          }
+        }
+      }
+      cellNotificationMap.delete(widget.model.id);
+    }
+    return notebook.widgets.length;
+  });
+}
+{
+  const tracker = trackerState();
+  time('tracker: clean up every cell of one notebook', () => {
+    for (const widget of notebook.widgets) {
+      tracker.delete(widget.model.id);
+    }
+    return notebook.widgets.length;
+  });
+}
+
+{
+  const { cellNotificationMap } = legacyState();
+  time('legacy: kernel death fan-out', () => {
+    let affected = 0;
+    for (const [cellId, notification] of cellNotificationMap.entries()) {
+      if (
+        notification.notebookId === notebook.id &&
+        !notification.notificationIssued
+      ) {
+        const widget = notebook.widgets.find(w => w.model.id === cellId);
+        if (widget) {
+          affected++;
+        }
+      }
+    }
+    return affected;
+  });
+}
+{
+  const tracker = trackerState();
+  time('tracker: kernel death fan-out', () => {
+    let affected = 0;
+    for (const [, notification] of tracker.inNotebook(notebook.id)) {
+      if (!notification.notificationIssued && !notification.cell.isDisposed) {
+        affected++;
+      }
+    }
+    return affected;
+  });
+}
@@ -0,0 +1,3 @@
+from .base import ENTRY_POINT_GROUP, BackendRegistry, NotifierBackend, ProbeStep
+
+__all__ = ["ENTRY_POINT_GROUP", "BackendRegistry", "NotifierBackend", "ProbeStep"]
@@ -0,0 +1,317 @@
+import asyncio
+import threading
+from functools import partial
+from importlib import import_module
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from traitlets import Int
+from traitlets.config import Config, LoggingConfigurable
+
+from ..tracing import NOOP_TRACE
+
+ENTRY_POINT_GROUP = "jupyterlab_notify.backends"
+
+# Used when the package metadata is unavailable, e.g. in a source checkout.
+_BUILTIN_BACKENDS = {
+    "slack": "jupyterlab_notify.backends.slack:SlackBackend",
+    "email": "jupyterlab_notify.backends.email:EmailBackend",
+    "webhook": "jupyterlab_notify.backends.webhook:WebhookBackend",
+}
+
+# Outcome of one step of a channel probe: (step, seconds, succeeded)
+ProbeStep = Tuple[str, float, bool]
+
+
+class NotifierBackend(LoggingConfigurable):
+    """
+    Base class for notification delivery channels.
+
+    Backends are discovered through the ``jupyterlab_notify.backends`` entry
+    point group and instantiated on first use. Subclasses implement ``send``;
+    ``send_batch`` defaults to sending each message concurrently. Blocking
+    client calls should go through ``run_blocking`` so that they respect the
+    backend's concurrency limit. Backend options are configured on the
+    subclass, e.g. ``c.SlackBackend.max_concurrency = 2``.
+    """
+
+    name: str = ""
+
+    max_concurrency = Int(
+        4,
+        config=True,
+        help="Maximum number of deliveries in flight at once on this channel",
+    )
+
+    def __init__(self, app: Any, **kwargs: Any) -> None:
+        super().__init__(parent=app, **kwargs)
+        self.app = app
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def available(self) -> bool:
+        """Whether the backend is configured well enough to deliver."""
+        return True
+
+    async def send(self, message: str, recipients: Optional[List[str]] = None) -> bool:
+        """
+        Deliver a single message.
+
+        Args:
+            message: The formatted notification message.
+            recipients: Destinations in the backend's own addressing, e.g. email
+                addresses or Slack channels. None means the configured default.
+
+        Returns:
+            True if the message was delivered to every recipient.
+        """
+        raise NotImplementedError
+
+    async def send_batch(
+        self, messages: List[str], recipients: Optional[List[str]] = None
+    ) -> List[bool]:
+        """
+        Deliver several messages to the same recipients.
+
+        Returns:
+            One delivery result per message, in order.
+        """
+        return list(await asyncio.gather(*(self.send(m, recipients) for m in messages)))
+
+    def probe(self) -> List[ProbeStep]:
+        """
+        Check that the channel is reachable without sending anything; blocking.
+
+        Returns:
+            The timed steps of the check in order, e.g. connecting and
+            authenticating; empty if the backend has nothing to check.
+        """
+        return []
+
+    async def close(self) -> None:
+        """Release connections held by the backend."""
+
+    async def run_blocking(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking call in the shared executor within the concurrency limit."""
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, partial(func, *args))
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so that it belongs to the delivery loop.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+
+def _entry_points() -> Dict[str, Any]:
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return {}
+
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        eps = eps.select(group=ENTRY_POINT_GROUP)
+    else:
+        eps = eps.get(ENTRY_POINT_GROUP, [])
+    return {ep.name: ep for ep in eps}
+
+
+def _import_object(path: str) -> Any:
+    module_name, _, attr = path.partition(":")
+    return getattr(import_module(module_name), attr)
+
+
+class BackendRegistry:
+    """
+    Registry of notification backends keyed by channel name.
+
+    Entry points are listed at startup but a backend class is only imported
+    and instantiated the first time its channel is used. Deliveries run on a
+    private event loop in a daemon thread, so they can be started from the
+    server's IOLoop and from timer threads alike, and the backends' clients and
+    connection pools are shared by every notification.
+    """
+
+    def __init__(self, app: Any, log: Any = None) -> None:
+        self.app = app
+        self.log = log
+        self._sources: Dict[str, Any] = dict(_BUILTIN_BACKENDS)
+        self._sources.update(_entry_points())
+        self._backends: Dict[str, Optional[NotifierBackend]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._config: Optional[Config] = None
+
+    def names(self) -> List[str]:
+        """Return the names of all discovered channels without loading them."""
+        return sorted(self._sources)
+
+    def get(self, name: str) -> Optional[NotifierBackend]:
+        """Return the backend for a channel, loading it on first use."""
+        with self._lock:
+            if name in self._backends:
+                return self._backends[name]
+
+            backend = None
+            source = self._sources.get(name)
+            if source is not None:
+                try:
+                    cls = (
+                        _import_object(source)
+                        if isinstance(source, str)
+                        else source.load()
+                    )
+                    if self._config is None:
+                        backend = cls(self.app)
+                    else:
+                        backend = cls(self.app, config=self._config)
+                except Exception as exc:
+                    self.log.error(f"Failed to load notification backend {name}: {exc}")
+            self._backends[name] = backend
+            return backend
+
+    def reconfigure(self, config: Config) -> None:
+        """
+        Apply a reloaded configuration to the backends.
+
+        Loaded backends keep their clients and connection pools; only their
+        options change. Backends loaded later are created with the new
+        configuration.
+        """
+        with self._lock:
+            self._config = config
+            backends = [b for b in self._backends.values() if b is not None]
+        for backend in backends:
+            backend.config = config
+
+    def deliver(
+        self,
+        message: str,
+        channels: List[str],
+        recipients: Optional[Dict[str, Optional[List[str]]]] = None,
+        trace: Any = NOOP_TRACE,
+    ) -> Dict[str, bool]:
+        """
+        Send a message on several channels concurrently and wait for the results.
+
+        The total latency is that of the slowest channel. Unknown channels are
+        logged and reported as delivered, so that they are not retried forever.
+
+        Args:
+            message: The formatted notification message.
+            channels: Backend names.
+            recipients: Optional recipients by channel; see NotifierBackend.send.
+            trace: Trace of the notification, receiving a span per channel.
+
+        Returns:
+            Mapping of channel name to delivery result.
+        """
+        if not channels:
+            return {}
+        future = asyncio.run_coroutine_threadsafe(
+            self.send(message, channels, recipients, trace), self._ensure_loop()
+        )
+        return future.result()
+
+    async def send(
+        self,
+        message: str,
+        channels: List[str],
+        recipients: Optional[Dict[str, Optional[List[str]]]] = None,
+        trace: Any = NOOP_TRACE,
+    ) -> Dict[str, bool]:
+        """Send a message on several channels concurrently."""
+        recipients = recipients or {}
+        results = await asyncio.gather(
+            *(
+                self._send_one(channel, message, recipients.get(channel), trace)
+                for channel in channels
+            )
+        )
+        return dict(zip(channels, results))
+
+    def deliver_batches(
+        self, batches: List[Tuple[str, Optional[List[str]], List[str]]]
+    ) -> List[List[bool]]:
+        """
+        Send several messages per channel, letting each backend batch them.
+
+        Args:
+            batches: (channel, recipients, messages) tuples.
+
+        Returns:
+            For each batch, one delivery result per message.
+        """
+        if not batches:
+            return []
+        future = asyncio.run_coroutine_threadsafe(
+            self._send_batches(batches), self._ensure_loop()
+        )
+        return future.result()
+
+    def close(self) -> None:
+        """Close the loaded backends and stop the delivery loop."""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._close_backends(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+
+    async def _close_backends(self) -> None:
+        backends = [b for b in self._backends.values() if b is not None]
+        await asyncio.gather(*(b.close() for b in backends), return_exceptions=True)
+
+    async def _send_batches(
+        self, batches: List[Tuple[str, Optional[List[str]], List[str]]]
+    ) -> List[List[bool]]:
+        return list(await asyncio.gather(*(self._send_batch(*b) for b in batches)))
+
+    async def _send_batch(
+        self, channel: str, recipients: Optional[List[str]], messages: List[str]
+    ) -> List[bool]:
+        backend = self.get(channel)
+        if backend is None:
+            self.log.error(f"Unknown notification channel: {channel}")
+            return [True] * len(messages)
+        try:
+            results = await backend.send_batch(messages, recipients)
+            return [bool(result) for result in results]
+        except Exception as exc:
+            self.log.error(f"Error sending {channel} notifications: {exc}")
+            return [False] * len(messages)
+
+    async def _send_one(
+        self,
+        channel: str,
+        message: str,
+        recipients: Optional[List[str]],
+        trace: Any = NOOP_TRACE,
+    ) -> bool:
+        backend = self.get(channel)
+        if backend is None:
+            self.log.error(f"Unknown notification channel: {channel}")
+            return True
+        with trace.span(f"send {channel}", channel=channel):
+            try:
+                return bool(await backend.send(message, recipients))
+            except Exception as exc:
+                self.log.error(f"Error sending {channel} notification: {exc}")
+                return False
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="notify-backends",
+                    daemon=True,
+                )
+                self._thread.start()
+            return self._loop
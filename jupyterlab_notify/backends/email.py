@@ -0,0 +1,38 @@
+from typing import List, Optional
+
+from traitlets import Int
+
+from .base import NotifierBackend, ProbeStep
+
+
+class EmailBackend(NotifierBackend):
+    """
+    Deliver notifications by email through the configured SMTP instance.
+
+    All recipients of a notification are addressed in a single message, so
+    they cost one SMTP transaction.
+    """
+
+    name = "email"
+
+    # A single SMTP connection cannot send messages concurrently.
+    max_concurrency = Int(
+        1,
+        config=True,
+        help="Maximum number of deliveries in flight at once on this channel",
+    )
+
+    @property
+    def available(self) -> bool:
+        return bool(self.app.email and self.app._config.smtp_instance)
+
+    def probe(self) -> List[ProbeStep]:
+        """Open a new SMTP connection, greet the server and log in if configured."""
+        return self.app._config.probe_smtp()
+
+    async def send(self, message: str, recipients: Optional[List[str]] = None) -> bool:
+        if recipients is None:
+            return await self.run_blocking(self.app.send_email_notification, message)
+        return await self.run_blocking(
+            self.app.send_email_notification, message, recipients
+        )
@@ -0,0 +1,48 @@
+import asyncio
+import time
+from typing import List, Optional
+
+from .base import NotifierBackend, ProbeStep
+
+
+class SlackBackend(NotifierBackend):
+    """
+    Deliver notifications as Slack messages through the extension's WebClient.
+
+    Recipients are channel names prefixed with ``#``, channel IDs or user IDs
+    (which receive a direct message); they are posted to concurrently.
+    """
+
+    name = "slack"
+
+    @property
+    def available(self) -> bool:
+        return bool(
+            self.app.slack_client
+            and (self.app.slack_user_id or self.app.slack_channel_name)
+        )
+
+    def probe(self) -> List[ProbeStep]:
+        """Check that Slack accepts the token with ``auth.test``."""
+        client = self.app.slack_client
+        if client is None:
+            self.log.error("Slack is not configured or slack_sdk is not installed.")
+            return [("auth", 0.0, False)]
+        started = time.perf_counter()
+        try:
+            ok = bool(client.auth_test()["ok"])
+        except Exception as exc:
+            self.log.error(f"Slack rejected the token: {exc}")
+            ok = False
+        return [("auth", time.perf_counter() - started, ok)]
+
+    async def send(self, message: str, recipients: Optional[List[str]] = None) -> bool:
+        if recipients is None:
+            return await self.run_blocking(self.app.send_slack_notification, message)
+        results = await asyncio.gather(
+            *(
+                self.run_blocking(self.app.send_slack_notification, message, target)
+                for target in recipients
+            )
+        )
+        return all(results)
@@ -0,0 +1,230 @@
+import asyncio
+import http.client
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from traitlets import Bool, Float, Unicode
+from traitlets import Dict as DictTrait
+
+from .base import NotifierBackend, ProbeStep
+
+
+class WebhookBackend(NotifierBackend):
+    """
+    Deliver notifications as JSON HTTP POST requests.
+
+    Each notification is posted as ``{"text": message}``, which is also what
+    Slack-compatible incoming webhooks expect. Connections are kept alive and
+    reused; at most ``max_concurrency`` requests are in flight, so the pool
+    never holds more connections than that. With ``batch`` enabled,
+    notifications sent within ``batch_window`` seconds of each other are posted
+    together as one JSON array. Routing rules can add more URLs, which are
+    posted to concurrently alongside ``url``.
+    """
+
+    name = "webhook"
+
+    url = Unicode(
+        None,
+        allow_none=True,
+        config=True,
+        help="URL notifications are posted to (http or https)",
+    )
+
+    headers = DictTrait(
+        config=True,
+        help="Additional HTTP headers sent with every request, e.g. an Authorization header",
+    )
+
+    timeout = Float(
+        10.0,
+        config=True,
+        help="Seconds to wait for the endpoint to accept a connection or respond",
+    )
+
+    batch = Bool(
+        False,
+        config=True,
+        help="Post notifications sent together as a single JSON array; the endpoint must accept arrays",
+    )
+
+    batch_window = Float(
+        0.0,
+        config=True,
+        help="Seconds to wait for more notifications before posting a batch",
+    )
+
+    def __init__(self, app: Any, **kwargs: Any) -> None:
+        super().__init__(app, **kwargs)
+        # Idle connections by (scheme, host, port).
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._pool_lock = threading.Lock()
+        # Messages waiting to be batched, by URL.
+        self._pending: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+
+    @property
+    def available(self) -> bool:
+        return bool(self.url)
+
+    async def send(self, message: str, recipients: Optional[List[str]] = None) -> bool:
+        urls = self._urls(recipients)
+        if not urls:
+            self.log.error("Webhook URL is not configured; skipping notification.")
+            return False
+        results = await asyncio.gather(*(self._send_to(url, message) for url in urls))
+        return all(results)
+
+    async def send_batch(
+        self, messages: List[str], recipients: Optional[List[str]] = None
+    ) -> List[bool]:
+        urls = self._urls(recipients)
+        if not urls:
+            self.log.error("Webhook URL is not configured; skipping notification.")
+            return [False] * len(messages)
+        if not self.batch:
+            return await super().send_batch(messages, recipients)
+        body = [{"text": message} for message in messages]
+        results = await asyncio.gather(
+            *(self.run_blocking(self._post, url, body) for url in urls)
+        )
+        return [all(results)] * len(messages)
+
+    async def close(self) -> None:
+        with self._pool_lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn in connections:
+                conn.close()
+
+    def _urls(self, recipients: Optional[List[str]]) -> List[str]:
+        urls = [self.url] if self.url else []
+        return urls + [url for url in recipients or [] if url not in urls]
+
+    async def _send_to(self, url: str, message: str) -> bool:
+        if not self.batch:
+            return await self.run_blocking(self._post, url, {"text": message})
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if url not in self._pending:
+            self._pending[url] = []
+            loop.call_later(
+                self.batch_window,
+                lambda: loop.create_task(self._flush_pending(url)),
+            )
+        self._pending[url].append((message, future))
+        return await future
+
+    async def _flush_pending(self, url: str) -> None:
+        pending = self._pending.pop(url, [])
+        body = [{"text": message} for message, _ in pending]
+        try:
+            delivered = await self.run_blocking(self._post, url, body)
+        except Exception as exc:
+            self.log.error(f"Error posting webhook batch: {exc}")
+            delivered = False
+        for _, future in pending:
+            if not future.done():
+                future.set_result(delivered)
+
+    def probe(self) -> List[ProbeStep]:
+        """
+        Open a connection to ``url``.
+
+        The connection is pooled, so that the next notification reuses it.
+        """
+        if not self.url:
+            self.log.error("Webhook URL is not configured.")
+            return [("connect", 0.0, False)]
+        target = urlsplit(self.url)
+        started = time.perf_counter()
+        conn, _ = self._acquire(target, fresh=True)
+        try:
+            conn.connect()
+        except OSError as exc:
+            conn.close()
+            self.log.error(f"Failed to connect to the webhook endpoint: {exc}")
+            return [("connect", time.perf_counter() - started, False)]
+        elapsed = time.perf_counter() - started
+        self._release(target, conn)
+        return [("connect", elapsed, True)]
+
+    def _post(self, url: str, body: Any) -> bool:
+        """POST a JSON body, reusing an idle keep-alive connection when possible."""
+        target = urlsplit(url)
+        path = target.path or "/"
+        if target.query:
+            path += f"?{target.query}"
+        data = json.dumps(body).encode("utf-8")
+        headers = {"Content-Type": "application/json", **self.headers}
+
+        conn, reused = self._acquire(target)
+        try:
+            response = self._request(conn, path, data, headers)
+        except (OSError, http.client.HTTPException) as exc:
+            conn.close()
+            if not reused:
+                self.log.error(f"Error posting webhook notification: {exc}")
+                return False
+            # The server may have closed the idle connection; retry on a new one.
+            conn, _ = self._acquire(target, fresh=True)
+            try:
+                response = self._request(conn, path, data, headers)
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                self.log.error(f"Error posting webhook notification: {exc}")
+                return False
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(target, conn)
+
+        if response.status >= 300:
+            self.log.error(
+                f"Webhook endpoint returned {response.status} {response.reason}"
+            )
+            return False
+        return True
+
+    def _request(
+        self,
+        conn: http.client.HTTPConnection,
+        path: str,
+        data: bytes,
+        headers: Dict[str, str],
+    ) -> http.client.HTTPResponse:
+        conn.request("POST", path, body=data, headers=headers)
+        response = conn.getresponse()
+        # Drain the body so the connection can be reused.
+        response.read()
+        return response
+
+    def _acquire(
+        self, target: Any, fresh: bool = False
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        if not fresh:
+            with self._pool_lock:
+                idle = self._idle.get(self._pool_key(target))
+                if idle:
+                    return idle.pop(), True
+        cls = (
+            http.client.HTTPSConnection
+            if target.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        return cls(target.hostname, target.port, timeout=self.timeout), False
+
+    def _release(self, target: Any, conn: http.client.HTTPConnection) -> None:
+        with self._pool_lock:
+            idle = self._idle.setdefault(self._pool_key(target), [])
+            if len(idle) < self.max_concurrency:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _pool_key(self, target: Any) -> Tuple[str, str, int]:
+        return (target.scheme, target.hostname, target.port)
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+import uuid
+from typing import Any, Dict, Tuple
+
+# A failing channel is probed at most every interval * 2 ** _MAX_BACKOFF seconds.
+_MAX_BACKOFF = 4
+
+
+class CapabilityMonitor:
+    """
+    Versioned snapshot of what the extension can deliver.
+
+    The snapshot is recomputed when the configuration changes and after
+    each health probe, which checks that Slack accepts the token and that
+    the SMTP server answers. Probes run in the background when a client
+    asks for the capabilities, at most once per ``interval``; the wait
+    doubles after each failed probe. A failed SMTP probe reopens the
+    connection. The version only changes when the content does, so clients
+    can revalidate cheaply with the ``etag``.
+    """
+
+    def __init__(self, app: Any, interval: float = 60.0, log: Any = None) -> None:
+        self.app = app
+        self.interval = interval
+        self.log = log
+        self.version = 0
+        self._epoch = uuid.uuid4().hex[:8]
+        self._state: Dict[str, Any] = {}
+        # Probe results; channels are assumed healthy until a probe fails.
+        self._slack_ok = True
+        self._smtp_ok = True
+        self._lock = threading.Lock()
+        self._probing = False
+        self._failures = 0
+        self._next_probe = 0.0
+        self.refresh()
+
+    @property
+    def etag(self) -> str:
+        return f'"{self._epoch}-{self.version}"'
+
+    def snapshot(self) -> Tuple[str, Dict[str, Any]]:
+        """
+        Return the current capabilities.
+
+        Returns:
+            Tuple of (etag, capabilities).
+        """
+        with self._lock:
+            return self.etag, self._state
+
+    def refresh(self) -> None:
+        """Recompute the snapshot from the extension's state and the probe results."""
+        app = self.app
+        resource_sampler = getattr(app, "resource_sampler", None)
+        state = {
+            "nbmodel_installed": bool(getattr(app, "is_listening", False)),
+            "kernel_tap": bool(app.kernel_tap),
+            "slack_configured": bool(
+                app.slack_client
+                and (app.slack_user_id or app.slack_channel_name)
+                and self._slack_ok
+            ),
+            "email_configured": bool(app.email),
+            "smtp_server_running": bool(app._config.smtp_instance and self._smtp_ok),
+            "resource_monitoring": bool(
+                resource_sampler and resource_sampler.available
+            ),
+            "channels": app.backends.names(),
+        }
+        with self._lock:
+            if state != self._state:
+                self._state = state
+                self.version += 1
+
+    def reset(self) -> None:
+        """Forget the probe results of replaced clients and refresh the snapshot."""
+        self._slack_ok = self._smtp_ok = True
+        self.refresh()
+
+    def probe(self) -> None:
+        """Check the Slack and SMTP connections and refresh the snapshot; blocking."""
+        self._slack_ok = self._probe_slack()
+        self._smtp_ok = self._probe_smtp()
+        self.refresh()
+
+    def request_probe(self) -> None:
+        """Probe off the IOLoop unless a probe is running or was done recently."""
+        if self.interval <= 0 or self._probing:
+            return
+        if time.monotonic() < self._next_probe:
+            return
+        self._probing = True
+        future = asyncio.get_running_loop().run_in_executor(None, self.probe)
+        future.add_done_callback(self._probed)
+
+    def _probed(self, future: "asyncio.Future[None]") -> None:
+        self._probing = False
+        if future.exception():
+            self.log.error(f"Notification health probe failed: {future.exception()}")
+        if future.exception() or not (self._slack_ok and self._smtp_ok):
+            self._failures = min(self._failures + 1, _MAX_BACKOFF)
+        else:
+            self._failures = 0
+        self._next_probe = time.monotonic() + self.interval * 2**self._failures
+
+    def _probe_slack(self) -> bool:
+        backend = self.app.backends.get("slack")
+        if self.app.slack_client is None or backend is None:
+            return True
+        return all(ok for _, _, ok in backend.probe())
+
+    def _probe_smtp(self) -> bool:
+        config = self.app._config
+        if config.smtp_instance is None:
+            return True
+        # The connection is shared with deliveries, which must not interleave.
+        with self.app.smtp_lock:
+            if config.ping_smtp():
+                return True
+            # smtplib does not reopen a dropped connection by itself.
+            self.log.info("Reconnecting to the SMTP server.")
+            return config.reconnect_smtp() and config.ping_smtp()
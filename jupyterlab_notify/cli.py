@@ -0,0 +1,665 @@
+import asyncio
+import json
+import os
+import signal
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from jupyter_core.application import JupyterApp, base_aliases
+from tornado.httpserver import HTTPServer
+from tornado.ioloop import IOLoop
+from tornado.netutil import bind_unix_socket
+from tornado.web import Application as WebApplication
+from traitlets import Dict as DictTrait
+from traitlets import Float, Int, Unicode, default
+from traitlets import List as ListTrait
+from traitlets.config import Application
+from traitlets.config.loader import ConfigFileNotFound
+
+from ._version import __version__
+from .backends import NotifierBackend, ProbeStep
+from .config import NotificationParams, notification_params_from_dict
+from .extension import NBMODEL_SCHEMA_ID, NotifyExtension
+from .gateway import GATEWAY_PATH, GatewayHandler, NotificationGateway
+from .handlers import cancel_registration, run_delivery, trigger_notification
+from .outbox import Outbox
+from .priority import DEFERRED
+from .recording import EventRecorder
+from .registry import NotificationRegistry
+
+# Timeout of replayed registrations, which time out when the recording says
+# they did instead
+_PARKED_TIMEOUT = 24 * 3600
+
+
+class CLIExtension(NotifyExtension):
+    """
+    The notification extension outside of a server.
+
+    Only the configuration, the backends and the send path are set up, as in
+    ``_init_config``; there is no outbox, history or registry. The outcome of
+    each delivery is recorded instead of being pushed to browsers.
+    """
+
+    def _init_config(self) -> None:
+        super()._init_config()
+        self.deliveries: Dict[Optional[str], Dict[str, bool]] = {}
+
+    def publish(self, event: Dict[str, Any], username: Optional[str] = None) -> None:
+        if event["type"] == "delivery":
+            self.deliveries[event["cell_id"]] = event["results"]
+
+    def close(self) -> None:
+        """Send pending summaries and close the backends."""
+        self.flush_pending_notifications()
+        self.delivery_executor.shutdown(wait=False)
+        self.tracer.close()
+        self.recorder.close()
+        self.backends.close()
+
+
+def _percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+class NotifyBaseApp(JupyterApp):
+    """Base class of the commands, which load the server's notification config."""
+
+    version = __version__
+
+    channels = ListTrait(
+        Unicode(),
+        config=True,
+        help="Channels to use, e.g. slack or webhook; all configured channels when empty",
+    )
+
+    aliases = {**base_aliases, "channel": "NotifyBaseApp.channels"}
+
+    @default("config_file_name")
+    def _config_file_name_default(self) -> str:
+        return "jupyter_notify_config"
+
+    def load_config_file(self, suppress_errors: bool = True) -> None:
+        """
+        Load the config files in the order the server does.
+
+        ``jupyter_config`` and ``jupyter_notify_config`` are loaded first, then
+        the server's own ``jupyter_server_config`` overrides them; the command
+        line overrides all of them.
+        """
+        super().load_config_file(suppress_errors)
+        try:
+            Application.load_config_file(
+                self, "jupyter_server_config", path=self.config_file_paths
+            )
+        except ConfigFileNotFound:
+            self.log.debug("Config file not found, skipping: jupyter_server_config")
+        except Exception:
+            if (not suppress_errors) or self.raise_config_file_errors:
+                raise
+
+    def create_extension(self) -> CLIExtension:
+        """Create the extension from the loaded configuration."""
+        extension = CLIExtension(config=self.config)
+        extension._init_config()
+        return extension
+
+    def selected_channels(self, extension: CLIExtension) -> List[str]:
+        """Return the requested channels, or every configured one."""
+        if self.channels:
+            return list(self.channels)
+        channels = []
+        for name in extension.backends.names():
+            backend = extension.backends.get(name)
+            if backend is not None and backend.available:
+                channels.append(name)
+        return channels
+
+
+class NotifyCheckApp(NotifyBaseApp):
+    name = "jupyter-notify-check"
+    description = """Send a test notification on each configured channel.
+
+    Reports how long connecting to the channel, greeting the server, logging
+    in and sending took. Slack connects on every request, so its connect time
+    is part of the auth step. Exits with status 1 if a step failed.
+    """
+
+    message = Unicode(
+        "Test notification from jupyter notify check",
+        config=True,
+        help="Text of the test notification",
+    )
+
+    aliases = {**NotifyBaseApp.aliases, "message": "NotifyCheckApp.message"}
+
+    def start(self) -> None:
+        extension = self.create_extension()
+        channels = self.selected_channels(extension)
+        if not channels:
+            self.log.error("No notification channel is configured.")
+            extension.close()
+            self.exit(1)
+
+        failed = False
+        try:
+            for channel in channels:
+                for step, seconds, ok in self.check_channel(extension, channel):
+                    print(
+                        f"{channel:<10} {step:<8} {seconds * 1000:10.1f} ms  "
+                        f"{'ok' if ok else 'FAILED'}"
+                    )
+                    failed = failed or not ok
+        finally:
+            extension.close()
+        if failed:
+            self.exit(1)
+
+    def check_channel(self, extension: CLIExtension, channel: str) -> List[ProbeStep]:
+        """
+        Check a channel and send it the test notification.
+
+        Args:
+            extension: The extension whose send path is used.
+            channel: Backend name.
+
+        Returns:
+            The steps of the check; the notification is not sent if a
+            preceding step failed.
+        """
+        backend = extension.backends.get(channel)
+        steps = backend.probe() if backend is not None else []
+        if all(ok for _, _, ok in steps):
+            started = time.perf_counter()
+            results = extension.deliver(
+                self.message, [channel], cell_id=f"check-{channel}"
+            )
+            steps.append(("send", time.perf_counter() - started, results[channel]))
+        return steps
+
+
+class NotifyBenchApp(NotifyBaseApp):
+    name = "jupyter-notify-bench"
+    description = """Push notifications through the server's send path and report throughput and latency.
+
+    Each notification goes through send_notification, as that of a finished
+    cell does, so routing rules, Slack run summaries and the backends'
+    max_concurrency apply. Use it against stand-in servers, e.g. with
+    smtp_args, slack_api_url or WebhookBackend.url pointing at localhost, to
+    size relays and rate limits. Exits with status 1 if a delivery failed.
+    """
+
+    count = Int(100, config=True, help="Number of notifications to send")
+
+    concurrency = Int(4, config=True, help="Number of notifications being sent at once")
+
+    aliases = {
+        **NotifyBaseApp.aliases,
+        "n": "NotifyBenchApp.count",
+        "count": "NotifyBenchApp.count",
+        "concurrency": "NotifyBenchApp.concurrency",
+    }
+
+    def start(self) -> None:
+        extension = self.create_extension()
+        channels = self.selected_channels(extension)
+        if not channels:
+            self.log.error("No notification channel is configured.")
+            extension.close()
+            self.exit(1)
+
+        def send(index: int) -> float:
+            params = NotificationParams(
+                cell_id=f"bench-{index}",
+                mode="default",
+                slackEnabled=False,
+                emailEnabled=False,
+                successMessage=f"Benchmark notification {index + 1} of {self.count}",
+                failureMessage="",
+                threshold=0,
+                success=True,
+                notebook_name="jupyter-notify-bench",
+                execution_count=index,
+                channels=channels,
+            )
+            started = time.perf_counter()
+            extension.send_notification(params)
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max(self.concurrency, 1)) as pool:
+                latencies = list(pool.map(send, range(self.count)))
+            elapsed = time.perf_counter() - started
+        finally:
+            extension.close()
+
+        if not latencies:
+            return
+        print(
+            f"Sent {len(latencies)} notifications on {', '.join(channels)} "
+            f"with concurrency {self.concurrency} in {elapsed:.2f} s "
+            f"({len(latencies) / elapsed:.1f}/s)"
+        )
+        print(
+            "Latency: "
+            + ", ".join(
+                f"{label} {_percentile(latencies, p) * 1000:.1f} ms"
+                for label, p in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+            )
+            + f", max {max(latencies) * 1000:.1f} ms"
+        )
+        failed = False
+        for channel in channels:
+            outcomes = [
+                extension.deliveries.get(f"bench-{index}", {}).get(channel)
+                for index in range(len(latencies))
+            ]
+            delivered = outcomes.count(True)
+            deferred = outcomes.count(DEFERRED)
+            undelivered = len(outcomes) - delivered - deferred
+            print(
+                f"{channel:<10} {delivered} delivered, {undelivered} failed"
+                + (f", {deferred} folded into digests" if deferred else "")
+            )
+            failed = failed or undelivered > 0
+        if failed:
+            self.exit(1)
+
+
+class NotifyGatewayApp(NotifyBaseApp):
+    name = "jupyter-notify-gateway"
+    description = """Run a notification gateway shared by the Jupyter servers of a host.
+
+    Servers whose gateway_url points at the gateway forward their Slack, email
+    and other channel notifications to it, instead of each opening its own
+    connections. The gateway journals them in its outbox, rate limits each
+    channel across all servers, folds the notifications held back by the rate
+    limit into digests, and sends them with its own configuration, to the
+    recipients it has for each server's user. It listens on a Unix socket, or
+    on localhost. Each user's servers authenticate with that user's token;
+    tokens may only be left out on a socket that nobody but the gateway's
+    user can access, whose notifications then go to the gateway's own
+    recipients.
+    """
+
+    port = Int(8899, config=True, help="Port to listen on, on 127.0.0.1")
+
+    socket = Unicode(
+        "",
+        config=True,
+        help="Unix socket to listen on instead of a port",
+    )
+
+    socket_mode = Int(
+        0o600,
+        config=True,
+        help=(
+            "Permissions of the Unix socket; servers of other users need write "
+            "access, e.g. 0o660 for a shared group, which requires tokens"
+        ),
+    )
+
+    tokens = DictTrait(
+        config=True,
+        help=(
+            "User names by token; each server sends its user's token as its "
+            "gateway_token, and is sent notifications as that user"
+        ),
+    )
+
+    recipients = DictTrait(
+        config=True,
+        help=(
+            "Recipients by user name, with the keys of a routing rule: email, "
+            "slack_users, slack_channels and webhook_urls; users without an entry "
+            "are refused"
+        ),
+    )
+
+    rate_limit = Float(
+        0.0,
+        config=True,
+        help="Notifications sent per second on each channel, across all servers; 0 for no limit",
+    )
+
+    rate_burst = Int(
+        10,
+        config=True,
+        help="Notifications sent at once on a channel before the rate limit applies",
+    )
+
+    digest_max = Int(
+        50,
+        config=True,
+        help="Maximum number of notifications folded into one digest",
+    )
+
+    aliases = {
+        **NotifyBaseApp.aliases,
+        "port": "NotifyGatewayApp.port",
+        "socket": "NotifyGatewayApp.socket",
+        "rate-limit": "NotifyGatewayApp.rate_limit",
+    }
+
+    def start(self) -> None:
+        # Without tokens, only the owner of the socket may connect.
+        if not self.tokens and not (self.socket and self.socket_mode & 0o077 == 0):
+            self.log.error(
+                "The gateway requires tokens, unless it listens on a Unix socket "
+                "with owner-only permissions (socket_mode 0o600)."
+            )
+            self.exit(1)
+        extension = self.create_extension()
+        config = extension._config
+        if config.persist_outbox:
+            os.makedirs(config.state_dir, exist_ok=True)
+            extension.outbox = Outbox(
+                os.path.join(config.state_dir, "outbox-gateway.jsonl"), log=self.log
+            )
+        gateway = NotificationGateway(
+            extension,
+            rate_limit=self.rate_limit,
+            rate_burst=self.rate_burst,
+            digest_max=self.digest_max,
+            recipients=self.recipients,
+            log=self.log,
+        )
+        server = HTTPServer(
+            WebApplication(
+                [
+                    (
+                        GATEWAY_PATH,
+                        GatewayHandler,
+                        {"gateway": gateway, "tokens": self.tokens},
+                    )
+                ]
+            )
+        )
+        if self.socket:
+            server.add_socket(bind_unix_socket(self.socket, mode=self.socket_mode))
+            self.log.info(f"Notification gateway listening on {self.socket}")
+        else:
+            server.listen(self.port, "127.0.0.1")
+            self.log.info(f"Notification gateway listening on 127.0.0.1:{self.port}")
+
+        loop = IOLoop.current()
+        signal.signal(
+            signal.SIGTERM, lambda *args: loop.add_callback_from_signal(loop.stop)
+        )
+        loop.add_callback(gateway.restore)
+        try:
+            loop.start()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
+            # Notifications still queued are replayed by the next gateway.
+            gateway.close()
+            if extension.outbox:
+                extension.outbox.close()
+            extension.close()
+
+
+class StandInBackend(NotifierBackend):
+    """Backend of a replay: delivers nothing, after ``latency`` seconds."""
+
+    name = "stand-in"
+
+    latency = Float(
+        0.0, config=True, help="Seconds each stand-in delivery takes, e.g. 0.2"
+    )
+
+    async def send(self, message: str, recipients: Optional[List[str]] = None) -> bool:
+        async with self.semaphore:
+            await asyncio.sleep(self.latency)
+        return True
+
+
+class _IdleSampler:
+    """Resource sampler of a replay; recorded resource alerts are not replayed."""
+
+    def watch(self, params: NotificationParams) -> None:
+        pass
+
+    def unwatch(self, cell_id: str, kernel_id: Optional[str]) -> None:
+        pass
+
+
+class ReplayExtension(CLIExtension):
+    """
+    The extension of a replay, with a stand-in backend on every channel.
+
+    Registrations are kept in memory and nothing is recorded. Notifications
+    are counted by status, and deliveries by channel.
+    """
+
+    def _init_config(self) -> None:
+        super()._init_config()
+        self.cell_ids = NotificationRegistry()
+        self.resource_sampler = _IdleSampler()
+        self.recorder = EventRecorder()
+        for name in self.backends.names():
+            self.stand_in(name)
+        self.statuses: Counter = Counter()
+        self.delivered: Counter = Counter()
+        self._counts_lock = threading.Lock()
+
+    def stand_in(self, channel: str) -> None:
+        """Deliver the notifications of a channel with the stand-in backend."""
+        self.backends._sources[channel] = f"{__name__}:StandInBackend"
+
+    def publish(self, event: Dict[str, Any], username: Optional[str] = None) -> None:
+        with self._counts_lock:
+            if event["type"] == "notification":
+                self.statuses[event["status"]] += 1
+            elif event["type"] == "delivery":
+                self.delivered.update(
+                    channel for channel, ok in event["results"].items() if ok is True
+                )
+
+
+def load_recording(path: str) -> List[Dict[str, Any]]:
+    """Read the records of an ``event_record_file``, in time order."""
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return sorted(records, key=lambda record: record["t"])
+
+
+async def replay(
+    extension: NotifyExtension,
+    records: List[Dict[str, Any]],
+    speed: float = 1.0,
+    on_done: Optional[Callable[[Dict[str, Any], float], None]] = None,
+) -> None:
+    """
+    Feed recorded records into an extension with their original spacing.
+
+    Registrations and cancellations are applied in order, as the server
+    applies them; events, triggers and timeouts are handled concurrently, as
+    on the IOLoop and in timer threads. Timeouts happen when the recording
+    says they did rather than when the replayed registration would time out,
+    so the interleaving does not depend on the replay speed.
+
+    Args:
+        extension: The extension to feed, e.g. a ReplayExtension.
+        records: Records from ``load_recording``.
+        speed: Replay speed relative to the recording, e.g. 10 for ten times
+            faster; 0 replays as fast as possible.
+        on_done: Called with each record and the seconds from when it was due
+            until it was handled.
+    """
+    if not records:
+        return
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    first = records[0]["t"]
+
+    def done(record: Dict[str, Any], due: float) -> None:
+        if on_done is not None:
+            on_done(record, loop.time() - due)
+
+    async def handle(record: Dict[str, Any], due: float) -> None:
+        kind, data = record["kind"], record["data"]
+        if kind == "event":
+            await extension.event_listener(None, NBMODEL_SCHEMA_ID, data)
+        elif kind == "trigger":
+            params = notification_params_from_dict(data)
+            delivery = trigger_notification(extension, params)
+            if delivery is not None:
+                await delivery
+        elif kind == "timeout":
+            params = extension.cell_ids.get(data["cell_id"])
+            if params is not None:
+                await run_delivery(
+                    extension, extension._send_timeout_notification, params
+                )
+        done(record, due)
+
+    pending = []
+    try:
+        for record in records:
+            due = started
+            if speed > 0:
+                due += (record["t"] - first) / speed
+                if due > loop.time():
+                    await asyncio.sleep(due - loop.time())
+            kind, data = record["kind"], record["data"]
+            if kind == "register":
+                params = notification_params_from_dict(data)
+                if params.mode == "custom-timeout":
+                    # Parked; the recorded timeout fires it.
+                    params.deadline = time.time() + _PARKED_TIMEOUT
+                extension.register_notification(params)
+                done(record, due)
+            elif kind == "cancel":
+                cancel_registration(extension, data["cell_id"])
+                done(record, due)
+            else:
+                pending.append(asyncio.ensure_future(handle(record, due)))
+        await asyncio.gather(*pending)
+    finally:
+        for params in list(extension.cell_ids.values()):
+            if params.timer:
+                params.timer.cancel()
+
+
+class NotifyReplayApp(NotifyBaseApp):
+    name = "jupyter-notify-replay"
+    description = """Replay a recording of registrations and nbmodel events against stand-in backends.
+
+    Record a server's traffic with NotificationConfig.event_record_file, then
+    replay it here, at its original pace, N times faster with --speed=N, or as
+    fast as possible with --speed=0. Every channel is delivered by a stand-in
+    backend taking --latency seconds per message, so the timings are those of
+    the notification pipeline itself. Reports how late each kind of record was
+    handled, and the notifications sent.
+    """
+
+    examples = "jupyter notify replay --speed=10 notify-events.jsonl"
+
+    speed = Float(
+        1.0,
+        config=True,
+        help="Replay speed relative to the recording; 0 for as fast as possible",
+    )
+
+    aliases = {
+        **NotifyBaseApp.aliases,
+        "speed": "NotifyReplayApp.speed",
+        "latency": "StandInBackend.latency",
+    }
+
+    def create_extension(self) -> ReplayExtension:
+        extension = ReplayExtension(config=self.config)
+        extension._init_config()
+        return extension
+
+    def start(self) -> None:
+        if len(self.extra_args) != 1:
+            self.log.error("Please supply the recording to replay.")
+            self.exit(1)
+        try:
+            records = load_recording(self.extra_args[0])
+        except (OSError, ValueError, KeyError) as exc:
+            self.log.error(f"Failed to read recording {self.extra_args[0]}: {exc}")
+            self.exit(1)
+
+        extension = self.create_extension()
+        for record in records:
+            for channel in record["data"].get("channels") or []:
+                extension.stand_in(channel)
+        lag: Dict[str, List[float]] = {}
+
+        def on_done(record: Dict[str, Any], seconds: float) -> None:
+            lag.setdefault(record["kind"], []).append(seconds)
+
+        started = time.perf_counter()
+        try:
+            asyncio.run(replay(extension, records, self.speed, on_done))
+            elapsed = time.perf_counter() - started
+        finally:
+            extension.close()
+
+        if not records:
+            return
+        speed = f"{self.speed:g}x" if self.speed > 0 else "maximum speed"
+        print(
+            f"Replayed {len(records)} records of "
+            f"{records[-1]['t'] - records[0]['t']:.1f} s at {speed} in {elapsed:.2f} s"
+        )
+        for kind, values in sorted(lag.items()):
+            print(
+                f"{kind:<10} {len(values):>6}  handled after "
+                + ", ".join(
+                    f"{label} {_percentile(values, p) * 1000:.1f} ms"
+                    for label, p in (("p50", 0.5), ("p99", 0.99))
+                )
+                + f", max {max(values) * 1000:.1f} ms"
+            )
+        print(
+            "Notifications: "
+            + (
+                ", ".join(
+                    f"{count} {status}"
+                    for status, count in sorted(extension.statuses.items())
+                )
+                or "none"
+            )
+        )
+        shed = sum(extension.delivery_gate.shed.values())
+        if shed:
+            print(f"Folded into digests: {shed}")
+        for channel, count in sorted(extension.delivered.items()):
+            print(f"{channel:<10} {count} delivered")
+
+
+class NotifyApp(NotifyBaseApp):
+    name = "jupyter-notify"
+    description = (
+        "Check, benchmark and replay the notification channels of jupyterlab-notify"
+    )
+
+    subcommands = {
+        "check": (NotifyCheckApp, NotifyCheckApp.description.splitlines()[0]),
+        "bench": (NotifyBenchApp, NotifyBenchApp.description.splitlines()[0]),
+        "gateway": (NotifyGatewayApp, NotifyGatewayApp.description.splitlines()[0]),
+        "replay": (NotifyReplayApp, NotifyReplayApp.description.splitlines()[0]),
+    }
+
+    def start(self) -> None:
+        super().start()
+        self.log.error(
+            f"Please supply a subcommand: {', '.join(sorted(self.subcommands))}"
+        )
+        self.exit(1)
+
+
+main = NotifyApp.launch_instance
+
+if __name__ == "__main__":
+    main()
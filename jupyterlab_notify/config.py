@@ -1,11 +1,15 @@
+import os
 from getpass import getuser
 from pathlib import Path
+from jupyter_core.paths import jupyter_data_dir
 from traitlets.config import Configurable
-from traitlets import Unicode, default, Any
+from traitlets import Bool, Enum, Int, Unicode, Float, default, Any
+from traitlets import Dict as DictTrait, List as ListTrait
 from importlib import import_module
 import inspect
+import time
 from dataclasses import dataclass, fields
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 from threading import Timer
 
 
@@ -25,13 +29,29 @@ class NotificationParams:
     notebook_name: Optional[str] = None
     execution_count: Optional[int] = None
     notification_sent: bool = False
+    kernel_id: Optional[str] = None
+    memory_threshold: Optional[float] = None
+    cpu_threshold: Optional[float] = None
+    resource_alert: Optional[str] = None
+    deadline: Optional[float] = None
+    idempotency_key: Optional[str] = None
+    channels: Optional[List[str]] = None
+    notebook_path: Optional[str] = None
+    run_id: Optional[str] = None
+    run_size: Optional[int] = None
+    run_started: Optional[float] = None
+    duration: Optional[float] = None
+    msg_id: Optional[str] = None
+    notebookId: Optional[str] = None
+    username: Optional[str] = None
+    trace: Optional[object] = None
 
 
 def notification_params_from_dict(data: Dict[str, Any]) -> NotificationParams:
     """Convert JSON data to NotificationParams."""
 
-    # Get valid field names from NotificationParams
-    allowed_fields = {f.name for f in fields(NotificationParams)}
+    # Get valid field names from NotificationParams; traces are server-side only
+    allowed_fields = {f.name for f in fields(NotificationParams)} - {"trace"}
 
     # Filter out unexpected fields
     filtered_data = {k: v for k, v in data.items() if k in allowed_fields}
@@ -56,6 +76,20 @@ class NotificationConfig(Configurable):
         help="Arguments to pass to the SMTP class constructor, as a string",
     )
 
+    smtp_username = Unicode(
+        None,
+        allow_none=True,
+        config=True,
+        help="User name to log in to the SMTP server with; no login when empty",
+    )
+
+    smtp_password = Unicode(
+        None,
+        allow_none=True,
+        config=True,
+        help="Password of smtp_username",
+    )
+
     email = Unicode(
         help="User's email for notifications",
         allow_none=True,
@@ -84,6 +118,302 @@ class NotificationConfig(Configurable):
         config=True,
     )
 
+    slack_api_url = Unicode(
+        "https://slack.com/api/",
+        config=True,
+        help="Base URL of the Slack Web API, e.g. a local stand-in server for testing",
+    )
+
+    slack_run_summary = Bool(
+        False,
+        config=True,
+        help=(
+            "Post one Slack message per notebook run and edit it as cells finish, "
+            "with failures as thread replies, instead of one message per cell"
+        ),
+    )
+
+    slack_summary_debounce = Float(
+        2.0,
+        config=True,
+        help="Minimum seconds between Slack API calls updating a run summary",
+    )
+
+    slack_run_idle_timeout = Float(
+        600.0,
+        config=True,
+        help="Seconds without a finished cell after which a notebook's next outcome starts a new run summary",
+    )
+
+    email_recipients = ListTrait(
+        Unicode(),
+        config=True,
+        help="Additional email addresses that receive every notification, in the same message",
+    )
+
+    slack_user_ids = ListTrait(
+        Unicode(),
+        config=True,
+        help="Additional Slack user IDs that receive every notification as a direct message",
+    )
+
+    slack_channel_names = ListTrait(
+        Unicode(),
+        config=True,
+        help="Additional Slack channels that receive every notification",
+    )
+
+    routing_rules = ListTrait(
+        DictTrait(),
+        config=True,
+        help=(
+            "Per-notebook routing rules. Each rule is a dict whose 'notebook' glob is matched "
+            "against the notebook path and whose 'email', 'slack_users', 'slack_channels' and "
+            "'webhook_urls' lists add recipients; 'channels' adds channels to every matching "
+            "notification"
+        ),
+    )
+
+    resource_poll_interval = Float(
+        5.0,
+        config=True,
+        help="Interval in seconds between kernel memory/CPU samples for resource-threshold notifications",
+    )
+
+    memory_threshold = Float(
+        help="Default kernel memory threshold in MB for resource-threshold notifications",
+        allow_none=True,
+        default_value=None,
+        config=True,
+    )
+
+    cpu_threshold = Float(
+        help="Default kernel CPU threshold in percent of one core for resource-threshold notifications",
+        allow_none=True,
+        default_value=None,
+        config=True,
+    )
+
+    state_dir = Unicode(
+        config=True,
+        help="Directory for the extension's persistent state (pending notification registry, outbox, history)",
+    )
+
+    @default("state_dir")
+    def _default_state_dir(self):
+        return str(Path(jupyter_data_dir()) / "notify")
+
+    persist_registry = Bool(
+        True,
+        config=True,
+        help="Persist pending notifications to SQLite so they survive server restarts",
+    )
+
+    registry_max_age = Float(
+        86400.0,
+        config=True,
+        help=(
+            "Restored pending notifications without a kernel that were last updated "
+            "more than this many seconds ago are dropped"
+        ),
+    )
+
+    persist_outbox = Bool(
+        True,
+        config=True,
+        help="Journal outgoing notifications so undelivered ones are retried until delivered",
+    )
+
+    persist_history = Bool(
+        True,
+        config=True,
+        help="Record sent and skipped notifications in a SQLite log served by the history API",
+    )
+
+    history_max_entries = Int(
+        10000,
+        config=True,
+        help="Maximum number of entries kept in the notification history",
+    )
+
+    history_max_age = Float(
+        30 * 24 * 3600.0,
+        config=True,
+        help="Notification history entries older than this many seconds are dropped",
+    )
+
+    outbox_drain_timeout = Float(
+        10.0,
+        config=True,
+        help="Time budget in seconds for delivering journaled notifications on shutdown",
+    )
+
+    outbox_retry_interval = Float(
+        30.0,
+        config=True,
+        help=(
+            "Seconds after which journaled notifications that failed are retried while "
+            "the server runs; the wait doubles while they keep failing, up to "
+            "outbox_retry_max_interval. 0 retries only on shutdown and startup"
+        ),
+    )
+
+    outbox_retry_max_interval = Float(
+        900.0,
+        config=True,
+        help="Maximum seconds between retries of journaled notifications that failed",
+    )
+
+    outbox_max_age = Float(
+        86400.0,
+        config=True,
+        help="Journaled notifications older than this many seconds are dropped instead of replayed",
+    )
+
+    dedup_cache_size = Int(
+        1024,
+        config=True,
+        help="Number of recently sent notification keys remembered to suppress duplicate deliveries",
+    )
+
+    event_buffer_size = Int(
+        256,
+        config=True,
+        help="Number of recent notification events kept per user for browsers that reconnect",
+    )
+
+    failure_suppression_window = Float(
+        0.0,
+        config=True,
+        help=(
+            "Seconds during which repeats of an identical failure are suppressed and "
+            "then reported in one summary, e.g. 300; 0 disables suppression"
+        ),
+    )
+
+    kernel_tap = Bool(
+        False,
+        config=True,
+        help=(
+            "Detect cell completion on the server from kernel iopub messages when "
+            "jupyter_server_nbmodel is not installed, so that Slack and email "
+            "notifications are sent even if the browser is closed"
+        ),
+    )
+
+    capability_probe_interval = Float(
+        60.0,
+        config=True,
+        help=(
+            "Minimum seconds between checks that Slack accepts the token and the "
+            "SMTP server answers, run when the capability endpoint is requested and "
+            "backing off after failures; 0 disables them"
+        ),
+    )
+
+    config_reload_interval = Float(
+        2.0,
+        config=True,
+        help=(
+            "Seconds between checks of the config files for changes, which are "
+            "reloaded without restarting the server; 0 disables the checks"
+        ),
+    )
+
+    config_reload_debounce = Float(
+        1.0,
+        config=True,
+        help="Seconds a changed config file must stay unchanged before it is reloaded",
+    )
+
+    delivery_concurrency = Int(
+        8,
+        config=True,
+        help="Maximum number of notifications being delivered at once, across channels",
+    )
+
+    delivery_queue_size = Int(
+        64,
+        config=True,
+        help=(
+            "Maximum number of notifications waiting for delivery, failures first, "
+            "then timeouts, then successes; beyond it the least urgent are folded "
+            "into a digest sent once the backlog is gone"
+        ),
+    )
+
+    gateway_url = Unicode(
+        "",
+        config=True,
+        help=(
+            "Notification gateway that Slack, email and other channel notifications are "
+            "forwarded to, e.g. http://127.0.0.1:8899 or unix:///run/jupyter-notify.sock; "
+            "they are sent directly when empty or when the gateway is unavailable"
+        ),
+    )
+
+    gateway_batch_window = Float(
+        0.05,
+        config=True,
+        help="Seconds to wait for more notifications before forwarding a batch to the gateway",
+    )
+
+    gateway_timeout = Float(
+        5.0,
+        config=True,
+        help="Seconds to wait for the gateway to accept a connection or respond",
+    )
+
+    gateway_retry_interval = Float(
+        30.0,
+        config=True,
+        help="Seconds during which notifications are sent directly after the gateway failed",
+    )
+
+    gateway_token = Unicode(
+        config=True,
+        help=(
+            "This server's user's token on the notification gateway, a key of its "
+            "NotifyGatewayApp.tokens; defaults to the JUPYTER_NOTIFY_GATEWAY_TOKEN "
+            "environment variable"
+        ),
+    )
+
+    @default("gateway_token")
+    def _default_gateway_token(self):
+        return os.environ.get("JUPYTER_NOTIFY_GATEWAY_TOKEN", "")
+
+    trace_file = Unicode(
+        "",
+        config=True,
+        help=(
+            "File to which a trace of each notification, from registration to "
+            "channel delivery, is appended; tracing is disabled when empty"
+        ),
+    )
+
+    trace_format = Enum(
+        ["chrome", "otlp"],
+        default_value="chrome",
+        config=True,
+        help="Format of the trace file: Chrome trace events or OTLP-JSON lines",
+    )
+
+    trace_sample_rate = Float(
+        1.0,
+        config=True,
+        help="Fraction of notifications that are traced, between 0 and 1",
+    )
+
+    event_record_file = Unicode(
+        "",
+        config=True,
+        help=(
+            "File to which every registration, nbmodel event and timeout is "
+            "appended as JSON lines, for `jupyter notify replay`; disabled when empty"
+        ),
+    )
+
     def __init__(self, config=None, logger=None, **kwargs):
         super().__init__(config=config, **kwargs)
         self.log = logger
@@ -96,10 +426,102 @@ class NotificationConfig(Configurable):
             self._validate_smtp_class(smtp_class)
             self.smtp_instance = self._create_smtp_instance(smtp_class)
             self._validate_smtp_instance(self.smtp_instance)
+            self._login(self.smtp_instance)
         except SMTPConfigurationError as e:
             if self.log:
                 self.log.error(f"SMTP Configuration Error: {str(e)}")
 
+    def ping_smtp(self) -> bool:
+        """
+        Check that the SMTP connection answers NOOP; blocking.
+
+        The caller must keep deliveries off the connection meanwhile. An
+        instance without ``noop`` is assumed to be healthy.
+
+        Returns:
+            True if the server answered.
+        """
+        noop = getattr(self.smtp_instance, "noop", None)
+        if noop is None:
+            return True
+        try:
+            return noop()[0] == 250
+        except Exception as e:
+            if self.log:
+                self.log.warning(f"SMTP health probe failed: {str(e)}")
+            return False
+
+    def probe_smtp(self) -> List[Tuple[str, float, bool]]:
+        """
+        Open a new SMTP connection as the server does and close it; blocking.
+
+        The steps are ``connect``, then ``ehlo`` if the SMTP class supports
+        it and ``login`` if smtp_username is set. A step is only run if the
+        previous one succeeded.
+
+        Returns:
+            (step, seconds, succeeded) tuples.
+        """
+        started = time.perf_counter()
+        try:
+            smtp = self._create_smtp_instance(self._import_smtp_class())
+        except SMTPConfigurationError as e:
+            if self.log:
+                self.log.error(f"Failed to connect to the SMTP server: {str(e)}")
+            return [("connect", time.perf_counter() - started, False)]
+        steps = [("connect", time.perf_counter() - started, True)]
+
+        try:
+            ehlo = getattr(smtp, "ehlo", None)
+            if ehlo is not None:
+                started = time.perf_counter()
+                try:
+                    ok = ehlo()[0] == 250
+                except Exception as e:
+                    if self.log:
+                        self.log.error(f"SMTP server did not answer EHLO: {str(e)}")
+                    ok = False
+                steps.append(("ehlo", time.perf_counter() - started, ok))
+                if not ok:
+                    return steps
+            if self.smtp_username:
+                started = time.perf_counter()
+                try:
+                    self._login(smtp)
+                    ok = True
+                except SMTPConfigurationError as e:
+                    if self.log:
+                        self.log.error(str(e))
+                    ok = False
+                steps.append(("login", time.perf_counter() - started, ok))
+        finally:
+            close = getattr(smtp, "quit", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+        return steps
+
+    def reconnect_smtp(self) -> bool:
+        """
+        Replace the SMTP instance with a newly connected one.
+
+        The current instance is kept if the new one cannot be created.
+
+        Returns:
+            True if the instance was replaced.
+        """
+        previous = self.smtp_instance
+        self._setup_smtp_instance()
+        if self.smtp_instance is previous:
+            return False
+        try:
+            previous.close()
+        except Exception:
+            pass
+        return True
+
     def _import_smtp_class(self):
         try:
             module_name, class_name = self.smtp_class.rsplit(".", 1)
@@ -147,6 +569,14 @@ class NotificationConfig(Configurable):
                 f"Failed to instantiate {smtp_class.__name__}: {str(e)}"
             )
 
+    def _login(self, smtp_instance):
+        if not self.smtp_username:
+            return
+        try:
+            smtp_instance.login(self.smtp_username, self.smtp_password or "")
+        except Exception as e:
+            raise SMTPConfigurationError(f"SMTP login failed: {str(e)}")
+
     def _validate_smtp_instance(self, smtp_instance):
         if not hasattr(smtp_instance, "connect") or not callable(
             getattr(smtp_instance, "connect")
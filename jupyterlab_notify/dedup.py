@@ -0,0 +1,198 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Optional
+
+from .config import NotificationParams
+
+
+def idempotency_key(params: NotificationParams, status: str) -> str:
+    """
+    Build the idempotency key of a notification.
+
+    The key identifies one outcome of one execution of a cell, so every
+    delivery path (nbmodel events, timeout timers, browser triggers) derives
+    the same key for the same completion. When the execution count is not
+    known, the execution start time or the timeout deadline tells repeated
+    runs of the same cell apart.
+    """
+    execution = params.execution_count
+    if execution is None:
+        execution = params.start_time or params.deadline
+    return f"{params.notebook_name}:{params.cell_id}:{execution}:{status}"
+
+
+class RecentKeys:
+    """
+    Bounded, thread-safe set of recently seen keys.
+
+    Lookups and insertions are O(1); once full, the least recently seen key
+    is evicted.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._keys: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._keys
+
+    def add(self, key: Hashable) -> bool:
+        """
+        Record a key.
+
+        Returns:
+            True if the key was not seen recently, False for a repeat.
+        """
+        with self._lock:
+            if key in self._keys:
+                self._keys.move_to_end(key)
+                return False
+            self._keys[key] = None
+            if len(self._keys) > self.maxsize:
+                self._keys.popitem(last=False)
+            return True
+
+
+_ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+_HEX_ADDRESS = re.compile(r"0x[0-9a-fA-F]+")
+# "File "x.py", line 12", "Cell In[3], line 5"
+_LINE_NUMBER = re.compile(r"\bline \d+")
+# "In [3]", "Cell In[3]", "<ipython-input-3-1a2b3c>"
+_EXECUTION_COUNT = re.compile(r"\bIn ?\[\d+\]|<ipython-input-\d+-[0-9a-f]+>")
+# Numbered source lines of IPython tracebacks: "      1 x = 1", "----> 2 f()"
+_SOURCE_LINE = re.compile(r"^(\s*-*>?\s*)\d+(?=\s)", re.MULTILINE)
+# "id=140234", "id: 140234"
+_OBJECT_ID = re.compile(r"\bid\s*[=:]\s*\d+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def error_fingerprint(error: str) -> str:
+    """
+    Fingerprint an error from its exception type and normalized traceback.
+
+    ANSI colors, line numbers, execution counts, memory addresses, object ids
+    and whitespace are normalized away so that the same failure repeated in a
+    loop produces the same fingerprint. Other numbers, e.g. shapes or values
+    in the message, tell failures apart.
+    """
+    text = _ANSI_ESCAPE.sub("", error).strip()
+    first_line = text.splitlines()[0] if text else ""
+    error_type = first_line.split(":", 1)[0].strip()
+    text = _SOURCE_LINE.sub(r"\1N", text)
+    text = _LINE_NUMBER.sub("line N", text)
+    text = _EXECUTION_COUNT.sub("In [N]", text)
+    text = _OBJECT_ID.sub("id=N", _HEX_ADDRESS.sub("0x", text))
+    normalized = _WHITESPACE.sub(" ", text)
+    digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+    return f"{error_type}:{digest}"
+
+
+@dataclass
+class FailureOccurrences:
+    """Repeats of one failure fingerprint within the suppression window."""
+
+    fingerprint: str
+    notebook_name: Optional[str]
+    summary: str
+    channels: List[str]
+    recipients: Optional[Dict[str, Optional[List[str]]]] = None
+    suppressed: int = 0
+    timer: Optional[threading.Timer] = None
+
+
+class FailureFingerprints:
+    """
+    Bounded LRU index of recent failure fingerprints.
+
+    The first failure with a given fingerprint is delivered and opens a
+    suppression window; repeats within the window are only counted. When the
+    window closes, ``on_summary`` is called once with the number of
+    suppressed repeats. Memory is fixed by ``maxsize`` and lookups are O(1).
+    """
+
+    def __init__(
+        self,
+        window: float,
+        on_summary: Callable[[FailureOccurrences], None],
+        maxsize: int = 256,
+    ) -> None:
+        self.window = window
+        self.on_summary = on_summary
+        self.maxsize = maxsize
+        self._index: "OrderedDict[Hashable, FailureOccurrences]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def record(
+        self,
+        key: Hashable,
+        notebook_name: Optional[str],
+        summary: str,
+        channels: List[str],
+        recipients: Optional[Dict[str, Optional[List[str]]]] = None,
+    ) -> bool:
+        """
+        Record a failure.
+
+        Returns:
+            True if the failure should be delivered, False if it is a repeat
+            within the suppression window.
+        """
+        if self.window <= 0:
+            return True
+
+        evicted = None
+        with self._lock:
+            occurrences = self._index.get(key)
+            if occurrences is not None:
+                occurrences.suppressed += 1
+                self._index.move_to_end(key)
+                return False
+
+            occurrences = FailureOccurrences(
+                fingerprint=key if isinstance(key, str) else str(key),
+                notebook_name=notebook_name,
+                summary=summary,
+                channels=channels,
+                recipients=recipients,
+            )
+            occurrences.timer = threading.Timer(self.window, self._close, args=(key,))
+            occurrences.timer.daemon = True
+            self._index[key] = occurrences
+            if len(self._index) > self.maxsize:
+                _, evicted = self._index.popitem(last=False)
+        occurrences.timer.start()
+
+        if evicted is not None:
+            # Report an evicted window early rather than lose its count.
+            evicted.timer.cancel()
+            self._summarize(evicted)
+        return True
+
+    def close_all(self) -> None:
+        """Close every open window, reporting suppressed repeats."""
+        with self._lock:
+            keys = list(self._index)
+        for key in keys:
+            self._close(key)
+
+    def _close(self, key: Hashable) -> None:
+        with self._lock:
+            occurrences = self._index.pop(key, None)
+        if occurrences is None:
+            return
+        occurrences.timer.cancel()
+        self._summarize(occurrences)
+
+    def _summarize(self, occurrences: FailureOccurrences) -> None:
+        if occurrences.suppressed:
+            self.on_summary(occurrences)
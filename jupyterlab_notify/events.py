@@ -0,0 +1,61 @@
+import threading
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+class EventBuffer:
+    """
+    Bounded per-user history of the notification events pushed to browsers.
+
+    Each user's events are numbered by an increasing sequence, so that a
+    browser that was disconnected, e.g. while the laptop slept, can fetch
+    everything after the last sequence it saw in one request. Only the
+    latest ``size`` events per user are kept. Sequences restart with the
+    server, which is told apart by a new ``epoch``.
+    """
+
+    def __init__(self, size: int = 256) -> None:
+        self.size = size
+        self.epoch = uuid.uuid4().hex
+        self._seq: Dict[Optional[str], int] = {}
+        self._events: Dict[Optional[str], Deque[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def seq(self, username: Optional[str] = None) -> int:
+        """Return the sequence number of the user's latest event."""
+        return self._seq.get(username, 0)
+
+    def append(
+        self, event: Dict[str, Any], username: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Record an event for a user.
+
+        Returns:
+            A copy of the event with its ``seq`` set.
+        """
+        with self._lock:
+            seq = self._seq[username] = self._seq.get(username, 0) + 1
+            event = dict(event, seq=seq)
+            events = self._events.get(username)
+            if events is None:
+                events = self._events[username] = deque(maxlen=self.size)
+            events.append(event)
+        return event
+
+    def since(
+        self, after: int, username: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Return the user's events with a sequence greater than ``after``.
+
+        Returns:
+            Tuple of (events, truncated); truncated is True if some events
+            after ``after`` were already dropped from the buffer.
+        """
+        with self._lock:
+            events = list(self._events.get(username, ()))
+        missed = [event for event in events if event["seq"] > after]
+        oldest = missed[0]["seq"] if missed else self.seq(username) + 1
+        return missed, oldest > after + 1
@@ -1,9 +1,57 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from email.message import EmailMessage
-from typing import Dict, Any, Optional
+from functools import partial
+from getpass import getuser
+from typing import Dict, Any, List, Optional, Set, Tuple, Union
 
 from jupyter_server.extension.application import ExtensionApp
-from .handlers import NotifyHandler, NotifyTriggerHandler
+from traitlets.config import Config
+from .backends import BackendRegistry
+from .capabilities import CapabilityMonitor
+from .handlers import (
+    NotifyConfigHandler,
+    NotifyEventsHandler,
+    NotifyHandler,
+    NotifyHistoryHandler,
+    NotifySocketHandler,
+    NotifyTriggerHandler,
+    run_delivery,
+)
+from .events import EventBuffer
+from .gateway import GatewayClient, GatewayUnavailable
+from .history import NotificationHistory
+from .kernel_tap import KERNEL_ACTIONS_SCHEMA_ID, KernelTap
 from .config import NotificationConfig, NotificationParams
+from .dedup import (
+    FailureFingerprints,
+    FailureOccurrences,
+    RecentKeys,
+    error_fingerprint,
+    idempotency_key,
+)
+from .outbox import Outbox, OutboxEntry
+from .priority import (
+    DEFERRED,
+    PRIORITY_FAILURE,
+    PRIORITY_SUCCESS,
+    DigestBuffer,
+    PriorityGate,
+    delivery_decision,
+    delivery_priority,
+)
+from .recording import EventRecorder
+from .registry import NotificationRegistry, params_to_dict
+from .resources import ResourceSampler
+from .routing import resolve_recipients
+from .runs import RunState, RunTracker, format_duration
+from .reload import CONFIG_GENERATION, ConfigWatcher
+from .slack_summary import SlackRunSummaries
+from .tracing import NOOP_TRACE, Tracer
 from datetime import datetime, timedelta
 
 NBMODEL_SCHEMA_ID = (
@@ -11,35 +59,254 @@ NBMODEL_SCHEMA_ID = (
 )
 
 
+def _timestamp_ns(value: Optional[str]) -> Optional[int]:
+    """Convert a timezone-aware ISO timestamp to epoch nanoseconds."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        return None
+    return int(parsed.timestamp() * 1e9)
+
+
 class NotifyExtension(ExtensionApp):
     name = "notify"
 
     def initialize(self) -> None:
         """Initialize extension, configuration, logging, and event listeners."""
         self._init_config()
+        self._init_outbox()
+        self._init_history()
         self._init_nbmodel_listener()
+        self._init_kernel_tap()
+        self._init_resource_sampler()
         super().initialize()
 
     def _init_config(self) -> None:
         """Initialize and set up the notification configuration."""
-        self._config = NotificationConfig(config=self.config, log=self.log)
+        self._config = NotificationConfig(config=self.config, logger=self.log)
         self.slack_client = None
         self.slack_imported = False
+        self.outbox: Optional[Outbox] = None
+        # Outbox entries that failed while the server runs, retried by a timer.
+        self._retry_ids: Set[str] = set()
+        self._retry_failures = 0
+        self._retry_timer: Optional[threading.Timer] = None
+        self._retry_lock = threading.Lock()
+        self.history: Optional[NotificationHistory] = None
+        self.kernel_tap: Optional[KernelTap] = None
+        self.sockets: Set[NotifySocketHandler] = set()
+        self.backends = BackendRegistry(self, log=self.log)
+        self.sent_keys = RecentKeys(self._config.dedup_cache_size)
+        self.events = EventBuffer(self._config.event_buffer_size)
+        self.tracer = Tracer(
+            path=self._config.trace_file or None,
+            format=self._config.trace_format,
+            sample_rate=self._config.trace_sample_rate,
+            log=self.log,
+        )
+        self.recorder = EventRecorder(self._config.event_record_file or None, self.log)
+        self.slack_summaries = SlackRunSummaries(
+            get_client=lambda: self.slack_client,
+            resolve_channel=self._slack_channel,
+            debounce=self._config.slack_summary_debounce,
+            idle_timeout=self._config.slack_run_idle_timeout,
+            log=self.log,
+        )
+        self.runs = RunTracker(on_notify=self.send_run_notification, log=self.log)
+        self.failure_fingerprints = FailureFingerprints(
+            window=self._config.failure_suppression_window,
+            on_summary=self._send_failure_summary,
+        )
+
+        self.config_generation = 1
+        self.config_loaded_at = time.time()
+        self.config_error: Optional[str] = None
+        self.config_watcher: Optional[ConfigWatcher] = None
+        self._reload_lock = threading.Lock()
 
         # Initialize email and Slack configuration
         self.email = self._config.email
         self.slack_user_id = self._config.slack_user_id
         self.slack_channel_name = self._config.slack_channel_name
+        self.slack_client, self.slack_imported = self._create_slack_client(self._config)
+        if CONFIG_GENERATION is not None:
+            CONFIG_GENERATION.set(self.config_generation)
+        self.smtp_lock = threading.Lock()
+        self.gateway = self._create_gateway_client(self._config)
+        self.delivery_gate = PriorityGate(
+            slots=self._config.delivery_concurrency,
+            max_waiting=self._config.delivery_queue_size,
+        )
+        self.digests = DigestBuffer()
+        # Sized so that every delivery gets a thread, and waits in the gate
+        # rather than in the executor's queue.
+        self.delivery_executor = ThreadPoolExecutor(
+            max_workers=self.delivery_gate.slots + self.delivery_gate.max_waiting + 1,
+            thread_name_prefix="notify-delivery",
+        )
+        self.capabilities = CapabilityMonitor(
+            self, interval=self._config.capability_probe_interval, log=self.log
+        )
 
+    def _create_slack_client(self, config: NotificationConfig) -> Tuple[Any, bool]:
+        """
+        Create the Slack client of a configuration.
+
+        Returns:
+            Tuple of (client or None, whether slack_sdk is available).
+        """
         try:
             from slack_sdk import WebClient
 
-            if self._config.slack_token:
-                self.slack_client = WebClient(token=self._config.slack_token)
-            self.slack_imported = True
+            if config.slack_token:
+                return (
+                    WebClient(token=config.slack_token, base_url=config.slack_api_url),
+                    True,
+                )
+            return None, True
         except Exception as e:
             self.log.debug(f"Failed to configure slack: {e}")
-            self.slack_imported = False
+            return None, False
+
+    def _create_gateway_client(
+        self, config: NotificationConfig
+    ) -> Optional[GatewayClient]:
+        """Return the client of the configured notification gateway, if any."""
+        if not config.gateway_url:
+            return None
+        return GatewayClient(
+            config.gateway_url,
+            token=config.gateway_token or None,
+            batch_window=config.gateway_batch_window,
+            timeout=config.gateway_timeout,
+            retry_interval=config.gateway_retry_interval,
+            log=self.log,
+        )
+
+    def _config_sources(self) -> List[Tuple[str, List[str]]]:
+        """Return the config file base names and search paths, lowest priority first."""
+        sources = [
+            ("jupyter_config", self.config_file_paths),
+            (self.config_file_name, self.config_file_paths),
+        ]
+        # The server's own config files and command line override the extension's.
+        serverapp = self.serverapp
+        sources.extend(
+            [
+                ("jupyter_config", serverapp.config_file_paths),
+                (serverapp.config_file_name, serverapp.config_file_paths),
+            ]
+        )
+        return sources
+
+    def config_files(self) -> List[str]:
+        """Return every path a watched config file may be loaded from."""
+        paths = []
+        for basefilename, search_paths in self._config_sources():
+            for directory in search_paths:
+                for extension in (".py", ".json"):
+                    path = os.path.join(directory, basefilename + extension)
+                    if path not in paths:
+                        paths.append(path)
+        return paths
+
+    def _read_config_files(self) -> Config:
+        """Load the config files the way the server does at startup."""
+        config = Config()
+        for basefilename, search_paths in self._config_sources():
+            for file_config, _ in self._load_config_files(
+                basefilename,
+                path=search_paths,
+                log=self.log,
+                raise_config_file_errors=True,
+            ):
+                config.merge(file_config)
+        config.merge(self.serverapp.cli_config)
+        return config
+
+    def reload_config(self) -> bool:
+        """
+        Re-read the config files and swap in the new configuration.
+
+        The SMTP transport and Slack client are created before anything is
+        replaced, and each delivery holds on to the clients it started with,
+        so deliveries in flight finish on the old ones. Options that size
+        buffers or open files, e.g. ``state_dir`` or ``trace_file``, still
+        need a restart.
+
+        Returns:
+            True if the configuration was reloaded; on errors the current
+            configuration stays in use.
+        """
+        with self._reload_lock:
+            try:
+                config = self._read_config_files()
+                notification_config = NotificationConfig(config=config, logger=self.log)
+            except Exception as exc:
+                self.config_error = str(exc)
+                self.log.error(
+                    f"Failed to reload notification config; keeping the current one: {exc}"
+                )
+                return False
+            slack_client, slack_imported = self._create_slack_client(
+                notification_config
+            )
+
+            self._config = notification_config
+            self.slack_client, self.slack_imported = slack_client, slack_imported
+            self.email = notification_config.email
+            self.slack_user_id = notification_config.slack_user_id
+            self.slack_channel_name = notification_config.slack_channel_name
+            self.backends.reconfigure(config)
+            self.gateway = self._create_gateway_client(notification_config)
+            sampler = getattr(self, "resource_sampler", None)
+            if sampler is not None:
+                sampler.memory_threshold = notification_config.memory_threshold
+                sampler.cpu_threshold = notification_config.cpu_threshold
+            self.capabilities.reset()
+
+            self.config_generation += 1
+            self.config_loaded_at = time.time()
+            self.config_error = None
+            if CONFIG_GENERATION is not None:
+                CONFIG_GENERATION.set(self.config_generation)
+        self.log.info(
+            f"Reloaded notification config (generation {self.config_generation})."
+        )
+        return True
+
+    def _schedule_reload(self) -> None:
+        """Reload the config off the IOLoop, since creating clients may block."""
+        asyncio.get_running_loop().run_in_executor(None, self.reload_config)
+
+    def _init_outbox(self) -> None:
+        """Open the journal of notifications awaiting delivery."""
+        if self._config.persist_outbox:
+            self.outbox = Outbox(self._state_path("outbox.jsonl"), log=self.log)
+
+    def _init_history(self) -> None:
+        """Open the log of sent and skipped notifications."""
+        if self._config.persist_history:
+            self.history = NotificationHistory(
+                self._state_path("history.db"),
+                max_entries=self._config.history_max_entries,
+                max_age=self._config.history_max_age,
+                log=self.log,
+            )
+
+    def _state_path(self, name: str) -> str:
+        """
+        Return the path of a state file of this server in ``state_dir``.
+
+        Files are keyed by the user and the root directory rather than the
+        port, so that a server restarted on another port finds its state.
+        """
+        identity = f"{getuser()}:{os.path.realpath(self.serverapp.root_dir)}"
+        key = hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+        stem, suffix = os.path.splitext(name)
+        return os.path.join(self._config.state_dir, f"{stem}-{key}{suffix}")
 
     def _init_nbmodel_listener(self) -> None:
         """Initialize event listener if jupyter_server_nbmodel is available."""
@@ -57,9 +324,43 @@ class NotifyExtension(ExtensionApp):
             )
             self.is_listening = False
 
+    def _init_kernel_tap(self) -> None:
+        """Follow kernel iopub messages when nbmodel events are not available."""
+        if not self._config.kernel_tap or self.is_listening:
+            return
+        self.kernel_tap = KernelTap(
+            kernel_manager=self.serverapp.kernel_manager,
+            on_event=self._on_kernel_event,
+            log=self.log,
+        )
+        self.serverapp.event_logger.add_listener(
+            schema_id=KERNEL_ACTIONS_SCHEMA_ID,
+            listener=self.kernel_tap.kernel_action_listener,
+        )
+
+    def _on_kernel_event(self, data: dict) -> None:
+        """Handle an execution event of the kernel tap like an nbmodel event."""
+        asyncio.ensure_future(self.event_listener(None, NBMODEL_SCHEMA_ID, data))
+
+    def _init_resource_sampler(self) -> None:
+        """Initialize the shared kernel resource sampler."""
+        self.resource_sampler = ResourceSampler(
+            kernel_manager=self.serverapp.kernel_manager,
+            on_exceeded=partial(self.submit_delivery, self.send_resource_notification),
+            interval=self._config.resource_poll_interval,
+            memory_threshold=self._config.memory_threshold,
+            cpu_threshold=self._config.cpu_threshold,
+            log=self.log,
+        )
+
     def initialize_handlers(self) -> None:
         """Register API handlers for notification endpoints."""
-        self.cell_ids: Dict[str, NotificationParams] = {}
+        registry_path = None
+        if self._config.persist_registry:
+            registry_path = self._state_path("registry.db")
+        self.cell_ids: Dict[str, NotificationParams] = NotificationRegistry(
+            path=registry_path, io_loop=self.serverapp.io_loop, log=self.log
+        )
         self.handlers.extend(
             [
                 (r"/api/jupyter-notify/notify", NotifyHandler, {"extension_app": self}),
@@ -68,9 +369,317 @@ class NotifyExtension(ExtensionApp):
                     NotifyTriggerHandler,
                     {"extension_app": self},
                 ),
+                (
+                    r"/api/jupyter-notify/history",
+                    NotifyHistoryHandler,
+                    {"extension_app": self},
+                ),
+                (
+                    r"/api/jupyter-notify/events",
+                    NotifyEventsHandler,
+                    {"extension_app": self},
+                ),
+                (
+                    r"/api/jupyter-notify/config",
+                    NotifyConfigHandler,
+                    {"extension_app": self},
+                ),
+                (
+                    r"/api/jupyter-notify/ws",
+                    NotifySocketHandler,
+                    {"extension_app": self},
+                ),
             ]
         )
 
+    async def _start_jupyter_server_extension(self, serverapp: Any) -> None:
+        """Restore pending notifications, replay undelivered ones and watch the config."""
+        if self._config.config_reload_interval > 0:
+            self.config_watcher = ConfigWatcher(
+                self.config_files(),
+                on_change=self._schedule_reload,
+                interval=self._config.config_reload_interval,
+                debounce=self._config.config_reload_debounce,
+                log=self.log,
+            )
+            self.config_watcher.start()
+        self.capabilities.refresh()
+        if self.kernel_tap:
+            for kernel_id in self.serverapp.kernel_manager.list_kernel_ids():
+                self.kernel_tap.attach(kernel_id)
+        self.restore_pending_notifications()
+        if self.outbox and self.outbox.pending():
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(None, self.drain_outbox)
+
+    async def stop_extension(self) -> None:
+        """Flush the registry and deliver journaled notifications within the time budget."""
+        self.cell_ids.close()
+        if self.config_watcher:
+            self.config_watcher.stop()
+        if self.kernel_tap:
+            self.kernel_tap.close()
+        await run_delivery(self, self.flush_pending_notifications)
+        self.delivery_executor.shutdown(wait=False)
+        with self._retry_lock:
+            # The outbox is drained below.
+            self._retry_ids.clear()
+            if self._retry_timer is not None:
+                self._retry_timer.cancel()
+                self._retry_timer = None
+        if self.history:
+            self.history.close()
+        self.tracer.close()
+        self.recorder.close()
+        if self.gateway:
+            self.gateway.close()
+        if not self.outbox:
+            self.backends.close()
+            return
+
+        budget = self._config.outbox_drain_timeout
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.wait_for(
+                loop.run_in_executor(None, self.drain_outbox, time.time() + budget),
+                budget,
+            )
+        except asyncio.TimeoutError:
+            self.log.warning(
+                f"Undelivered notifications remain after {budget}s; "
+                "they will be replayed on next startup."
+            )
+        self.outbox.close()
+        self.backends.close()
+
+    def drain_outbox(
+        self, deadline: Optional[float] = None, entry_ids: Optional[Set[str]] = None
+    ) -> None:
+        """
+        Retry delivery of journaled notifications.
+
+        With a notification gateway, they are forwarded to it under their
+        entry ID as idempotency key. Otherwise, pending messages are grouped
+        by channel so that backends able to post several notifications in one
+        request can do so. Channels that are no longer configured are dropped
+        rather than retried.
+
+        Args:
+            deadline: Optional epoch time after which no new delivery is started.
+            entry_ids: Entries to retry; all pending entries when None.
+        """
+        if deadline is not None and time.time() >= deadline:
+            return
+        max_age = self._config.outbox_max_age
+        entries = []
+        for entry in self.outbox.pending():
+            if entry_ids is not None and entry.id not in entry_ids:
+                continue
+            if time.time() - entry.created > max_age:
+                self.log.warning(f"Dropping stale journaled notification {entry.id}")
+                self.outbox.discard(entry.id)
+                continue
+            entries.append(entry)
+        if self.gateway is not None:
+            entries = self._forward_entries(entries, deadline)
+
+        # (channel, recipients) -> entries
+        groups: Dict[tuple, List[OutboxEntry]] = {}
+        for entry in entries:
+            for channel in entry.remaining:
+                if not self._channel_available(channel):
+                    self.log.warning(
+                        f"Dropping journaled notification {entry.id} on {channel}: "
+                        "the channel is not configured"
+                    )
+                    self.outbox.ack(entry.id, channel)
+                    continue
+                recipients = (entry.recipients or {}).get(channel)
+                key = (channel, tuple(recipients) if recipients is not None else None)
+                groups.setdefault(key, []).append(entry)
+
+        if not groups:
+            return
+        self.log.debug(f"Replaying {len(groups)} batch(es) of journaled notifications")
+        keys = list(groups)
+        results = self.backends.deliver_batches(
+            [
+                (
+                    channel,
+                    list(recipients) if recipients is not None else None,
+                    [entry.message for entry in groups[(channel, recipients)]],
+                )
+                for channel, recipients in keys
+            ]
+        )
+        for (channel, recipients), delivered in zip(keys, results):
+            for entry, ok in zip(groups[(channel, recipients)], delivered):
+                if ok:
+                    self.outbox.ack(entry.id, channel)
+
+    def _forward_entries(
+        self, entries: List[OutboxEntry], deadline: Optional[float] = None
+    ) -> List[OutboxEntry]:
+        """
+        Forward journaled notifications to the gateway.
+
+        Returns:
+            The entries left to send directly because the gateway cannot be
+            connected to. Entries the gateway may have received stay pending.
+        """
+        for index, entry in enumerate(entries):
+            if deadline is not None and time.time() >= deadline:
+                return []
+            try:
+                results = self.gateway.forward(
+                    entry.message,
+                    entry.remaining,
+                    notebook=entry.notebook,
+                    key=entry.id,
+                )
+            except GatewayUnavailable as exc:
+                self.log.warning(
+                    f"Notification gateway unavailable; sending directly: {exc}"
+                )
+                return entries[index:]
+            except Exception as exc:
+                self.log.warning(
+                    f"Notification gateway did not answer; retrying later: {exc}"
+                )
+                return []
+            for channel, accepted in results.items():
+                if accepted:
+                    self.outbox.ack(entry.id, channel)
+        return []
+
+    def _channel_available(self, channel: str) -> bool:
+        """Whether a channel is configured here, so that retrying it can succeed."""
+        backend = self.backends.get(channel)
+        return backend is not None and backend.available
+
+    def _schedule_retry(self, entry_id: Optional[str] = None) -> None:
+        """
+        Retry failed outbox entries later, backing off while they keep failing.
+
+        Args:
+            entry_id: Outbox entry that just failed, if any.
+        """
+        interval = self._config.outbox_retry_interval
+        if interval <= 0:
+            return
+        with self._retry_lock:
+            if entry_id is not None:
+                self._retry_ids.add(entry_id)
+            if self._retry_timer is not None or not self._retry_ids:
+                return
+            delay = min(
+                interval * 2**self._retry_failures,
+                self._config.outbox_retry_max_interval,
+            )
+            self._retry_timer = threading.Timer(delay, self._retry_deliveries)
+            self._retry_timer.daemon = True
+            self._retry_timer.start()
+
+    def _retry_deliveries(self) -> None:
+        """Retry the outbox entries that failed; runs in the retry timer."""
+        with self._retry_lock:
+            self._retry_timer = None
+            entry_ids = set(self._retry_ids)
+        try:
+            self.drain_outbox(entry_ids=entry_ids)
+        except Exception as exc:
+            self.log.error(f"Error retrying journaled notifications: {exc}")
+        pending = {entry.id for entry in self.outbox.pending()}
+        with self._retry_lock:
+            # Entries that failed meanwhile stay for the next round.
+            self._retry_ids -= entry_ids - pending
+            if entry_ids & pending:
+                self._retry_failures = min(self._retry_failures + 1, 16)
+            else:
+                self._retry_failures = 0
+        self._schedule_retry()
+
+    def register_notification(self, params: NotificationParams) -> None:
+        """
+        Register a cell for notifications and arm its timeout or resource watch.
+
+        Args:
+            params: Notification parameters for the cell.
+        """
+        if self.recorder.enabled:
+            self.recorder.record("register", params_to_dict(params))
+        with self.trace(params).span("registration"):
+            if params.mode == "custom-timeout" and not params.notification_sent:
+                if params.deadline is None:
+                    params.deadline = time.time() + params.threshold
+                # An expired deadline fires immediately.
+                timer = threading.Timer(
+                    max(params.deadline - time.time(), 0),
+                    self._send_timeout_notification,
+                    args=(params,),
+                )
+                params.timer = timer
+                timer.start()
+            elif params.mode == "resource-threshold" and not params.notification_sent:
+                self.resource_sampler.watch(params)
+            if params.run_id:
+                self.runs.add(params)
+
+            self.cell_ids[params.cell_id] = params
+            if self.kernel_tap and params.msg_id and params.kernel_id:
+                self.kernel_tap.watch(params.kernel_id, params.msg_id, params.cell_id)
+
+    def trace(self, params: NotificationParams) -> Any:
+        """Return the trace of a notification, starting it if needed."""
+        if params.trace is None:
+            params.trace = self.tracer.start(
+                "notification",
+                cell_id=params.cell_id,
+                mode=params.mode,
+                notebook=params.notebook_path or params.notebook_name,
+            )
+        return params.trace
+
+    def end_trace(self, params: NotificationParams, **attributes: Any) -> None:
+        """End the trace of a notification, if any, with the given outcome."""
+        if params.trace is not None:
+            params.trace.end(**attributes)
+            params.trace = None
+
+    def restore_pending_notifications(self) -> None:
+        """
+        Reload persisted registrations and reconcile them with running kernels.
+
+        Cells whose kernel no longer exists will never report completion, so
+        they are notified as failed and dropped. Cells without a kernel are
+        dropped once older than ``registry_max_age``. The others are re-armed.
+        """
+        restored = self.cell_ids.load(max_age=self._config.registry_max_age)
+        if not restored:
+            return
+
+        running = set(self.serverapp.kernel_manager.list_kernel_ids())
+        self.log.info(f"Restoring {len(restored)} pending notification(s).")
+        for params in restored:
+            if params.kernel_id and params.kernel_id not in running:
+                del self.cell_ids[params.cell_id]
+                if not params.notification_sent:
+                    params.success = False
+                    params.error = (
+                        "The kernel is no longer running; "
+                        "the cell did not report completion."
+                    )
+                    self.submit_delivery(self.send_notification, params)
+                continue
+            self.register_notification(params)
+
+    def _send_timeout_notification(self, params: NotificationParams) -> None:
+        """Send a timeout notification and persist that it was sent."""
+        self.recorder.record("timeout", {"cell_id": params.cell_id})
+        self.send_notification(params)
+        if params.cell_id in self.cell_ids:
+            self.cell_ids.touch(params.cell_id)
+
     async def event_listener(self, logger: Any, schema_id: str, data: dict) -> None:
         """
         Handle cell execution events and send notifications upon completion.
@@ -80,13 +689,16 @@ class NotifyExtension(ExtensionApp):
             schema_id: The schema identifier for the event.
             data: The event data containing details about the cell execution.
         """
+        self.recorder.record("event", data)
         event_type = data.get("event_type")
         cell_id = data.get("cell_id")
 
         if event_type == "execution_start" and cell_id in self.cell_ids:
             params = self.cell_ids[cell_id]
-            if params.mode == "default":
-                params.start_time = data.get("timestamp")
+            params.start_time = data.get("timestamp")
+            if params.execution_count is None:
+                params.execution_count = data.get("execution_count")
+            self.cell_ids.touch(cell_id)
             return
 
         if event_type != "execution_end" or cell_id not in self.cell_ids:
@@ -94,6 +706,34 @@ class NotifyExtension(ExtensionApp):
 
         self.log.debug(f"Received execution end event: {data}")
         params = self.cell_ids[cell_id]
+        trace = self.trace(params)
+        if trace.sampled:
+            # From the end of execution until the event reached the extension
+            received = time.time_ns()
+            emitted = _timestamp_ns(data.get("timestamp")) or received
+            trace.add_span(
+                "event receipt",
+                min(emitted, received),
+                received,
+                success=data.get("success"),
+            )
+        if params.mode == "resource-threshold":
+            self.resource_sampler.unwatch(cell_id, params.kernel_id)
+
+        # Cells of a run are reported by a single notification for the run
+        if params.run_id:
+            if params.timer:
+                params.timer.cancel()
+            del self.cell_ids[cell_id]
+            params.error = data.get("kernel_error")
+            await run_delivery(
+                self,
+                self.complete_run_cell,
+                params,
+                data.get("success"),
+                data.get("timestamp"),
+            )
+            return
 
         # Skip if notification was already sent (e.g., by timeout)
         if params.notification_sent:
@@ -101,67 +741,473 @@ class NotifyExtension(ExtensionApp):
             if params.timer:
                 params.timer.cancel()
             del self.cell_ids[cell_id]
+            self.end_trace(params, decision="skipped: already sent")
             return
 
         if params.timer:
             params.timer.cancel()
+        # Removed before the delivery, which may wait, so that a re-run of the
+        # cell registered meanwhile is kept.
+        del self.cell_ids[cell_id]
         params.success = data.get("success")
         params.error = data.get("kernel_error")
         self.log.debug(f"Sending notification for cell_id {cell_id}: {params}")
-        self.send_notification(params, data.get("timestamp"))
-        # Remove cell record after notification is sent.
-        del self.cell_ids[cell_id]
+        await run_delivery(self, self.send_notification, params, data.get("timestamp"))
 
-    def send_slack_notification(self, message_content: str) -> None:
+    def send_slack_notification(
+        self, message_content: str, target: Optional[str] = None
+    ) -> bool:
         """
         Send a Slack notification if configuration and dependencies allow it.
 
         Args:
             message_content: The content to send in the Slack message.
+            target: Channel name prefixed with "#", channel ID or user ID to send
+                to instead of the configured channel or user.
+
+        Returns:
+            True if the message was sent.
         """
         self.log.debug("Attempting to send Slack notification.")
-        if not (self.slack_imported and self.slack_client):
+        # A config reload may swap the client; this delivery keeps the one it started with.
+        client = self.slack_client
+        if not (self.slack_imported and client):
             self.log.error("Slack library not imported or client not initialized.")
-            return
+            return False
 
-        channel = f"#{self.slack_channel_name}"
-        # If a specific Slack user is set, try opening a DM channel.
-        if self.slack_user_id:
-            try:
-                response = self.slack_client.conversations_open(
-                    users=[self.slack_user_id]
-                )
-                channel = response["channel"]["id"]
-            except Exception as exc:
-                self.log.error(f"Failed to open DM conversation: {exc}")
+        channel = self._slack_channel(target, client)
+        if channel is None:
+            return False
 
         try:
-            self.slack_client.chat_postMessage(channel=channel, text=message_content)
+            client.chat_postMessage(channel=channel, text=message_content)
         except Exception as exc:
             self.log.error(f"Error sending Slack notification: {exc}")
+            return False
+        return True
+
+    def _slack_channel(
+        self, target: Optional[str] = None, client: Any = None
+    ) -> Optional[str]:
+        """
+        Resolve a Slack destination to a channel usable with chat.postMessage.
 
-    def send_email_notification(self, message_content: str) -> None:
+        Args:
+            target: Channel name prefixed with "#", channel ID or user ID, or
+                None for the configured user or channel.
+            client: Slack client to use instead of the current one.
+
+        Returns:
+            The channel, or None if a DM channel could not be opened for a target.
+        """
+        client = client or self.slack_client
+        if target is None:
+            channel = f"#{self.slack_channel_name}"
+            # If a specific Slack user is set, try opening a DM channel.
+            if self.slack_user_id:
+                try:
+                    response = client.conversations_open(users=[self.slack_user_id])
+                    channel = response["channel"]["id"]
+                except Exception as exc:
+                    self.log.error(f"Failed to open DM conversation: {exc}")
+            return channel
+
+        # User IDs need a DM channel opened first.
+        if target[:1] in ("U", "W"):
+            try:
+                response = client.conversations_open(users=[target])
+                return response["channel"]["id"]
+            except Exception as exc:
+                self.log.error(f"Failed to open DM conversation: {exc}")
+                return None
+        return target
+
+    def send_email_notification(
+        self, message_content: str, recipients: Optional[List[str]] = None
+    ) -> bool:
         """
         Send an email notification if email is configured.
 
         Args:
             message_content: The content to include in the email.
+            recipients: Addresses to send to instead of the configured email.
+                They all receive the same message in one SMTP transaction.
+
+        Returns:
+            True if the message was sent.
         """
         self.log.debug("Attempting to send email notification.")
-        if not self.email:
+        sender = self.email
+        if not sender:
             self.log.error("Email is not configured; skipping email notification.")
-            return
+            return False
 
         email_message = EmailMessage()
         email_message["Subject"] = "Jupyter Cell Execution Status"
-        email_message["From"] = self.email
-        email_message["To"] = self.email
+        email_message["From"] = sender
+        email_message["To"] = ", ".join(recipients or [sender])
         email_message.set_content(message_content)
 
         try:
-            self._config.smtp_instance.send_message(email_message)
+            with self.smtp_lock:
+                # Read under the lock, as a probe may reconnect meanwhile.
+                self._config.smtp_instance.send_message(email_message)
         except Exception as exc:
             self.log.error(f"Error sending email notification: {exc}")
+            return False
+        return True
+
+    def publish(self, event: Dict[str, Any], username: Optional[str] = None) -> None:
+        """
+        Push an event to the connected browsers of a user.
+
+        Notification events are also kept in the user's event buffer, so that
+        browsers that are not connected can replay them.
+
+        Args:
+            event: The event to push.
+            username: The user the event is for, or None for every user.
+        """
+        if event["type"] == "notification":
+            event = self.events.append(event, username)
+        for socket in list(self.sockets):
+            if username is None or socket.username in (None, username):
+                socket.push(event)
+
+    def deliver(
+        self,
+        message: str,
+        channels: List[str],
+        entry_id: Optional[str] = None,
+        recipients: Optional[Dict[str, Optional[List[str]]]] = None,
+        cell_id: Optional[str] = None,
+        username: Optional[str] = None,
+        trace: Any = NOOP_TRACE,
+        priority: int = PRIORITY_SUCCESS,
+        notebook: Optional[str] = None,
+    ) -> Dict[str, Union[bool, str]]:
+        """
+        Deliver a formatted message on the given channels.
+
+        The message is journaled in the outbox before the attempt, sent on all
+        channels and to all recipients concurrently, and each channel is
+        acknowledged once it succeeds. Channels that failed are retried with
+        backoff; channels that are not configured are not journaled. With a
+        notification gateway, the message is forwarded to it instead, with
+        the outbox entry ID as idempotency key, and a channel succeeds once
+        the gateway accepted it. The gateway works out the recipients from its
+        own configuration.
+
+        Deliveries wait for a slot of the delivery gate, the most urgent first.
+        When too many are waiting, the least urgent are folded into a digest
+        that is sent once the backlog is gone; their outbox entries are
+        acknowledged with the digest.
+
+        Args:
+            message: The formatted notification message.
+            channels: Backend names, e.g. "slack" or "email".
+            entry_id: Outbox entry being replayed, if any.
+            recipients: Optional recipients by channel.
+            cell_id: Cell the notification is about, reported with the outcome.
+            username: User the outcome is reported to.
+            trace: Trace of the notification.
+            priority: Delivery priority, e.g. PRIORITY_FAILURE.
+            notebook: Path of the notebook, for the gateway's routing rules.
+
+        Returns:
+            Whether the message was delivered, by channel, or DEFERRED for
+            the channels of a message folded into a digest.
+        """
+        if not channels:
+            return {}
+        with trace.span("deliver", channels=",".join(channels)):
+            if self.outbox and entry_id is None:
+                # Without a gateway, retrying an unconfigured channel cannot succeed.
+                journaled = [
+                    channel
+                    for channel in channels
+                    if self.gateway is not None or self._channel_available(channel)
+                ]
+                if journaled:
+                    entry_id = self.outbox.put(
+                        message, journaled, recipients, notebook=notebook
+                    )
+            with self.delivery_gate.slot(priority) as admitted:
+                if admitted:
+                    results = self._forward(message, channels, entry_id, notebook)
+                    if results is None:
+                        results = self.backends.deliver(
+                            message, channels, recipients, trace
+                        )
+                else:
+                    results = {channel: DEFERRED for channel in channels}
+
+        self.publish(
+            {"type": "delivery", "cell_id": cell_id, "results": results}, username
+        )
+        if not admitted:
+            self.log.debug(f"Delivery queue full; folding notification of {cell_id}")
+            self.digests.fold(message, channels, recipients, entry_id)
+            return results
+
+        if self.outbox and entry_id is not None:
+            failed = False
+            for channel, delivered in results.items():
+                if delivered:
+                    self.outbox.ack(entry_id, channel)
+                else:
+                    failed = True
+            if failed and entry_id in self.outbox:
+                self._schedule_retry(entry_id)
+        if len(self.digests) and self.delivery_gate.idle:
+            self.send_digests()
+        return results
+
+    def submit_delivery(self, func: Any, *args: Any) -> "Future[Any]":
+        """
+        Run a function that may deliver notifications in the delivery executor.
+
+        For callers on the IOLoop that do not wait for the outcome; errors are
+        logged.
+        """
+        future = self.delivery_executor.submit(func, *args)
+        future.add_done_callback(self._log_delivery_error)
+        return future
+
+    def _log_delivery_error(self, future: "Future[Any]") -> None:
+        if future.exception() is not None:
+            self.log.error(f"Error sending notification: {future.exception()}")
+
+    def flush_pending_notifications(self) -> None:
+        """Send failure summaries, Slack run summaries and digests now; blocking."""
+        # Report suppressed failures now rather than lose their counts.
+        self.failure_fingerprints.close_all()
+        self.slack_summaries.flush_all()
+        self.send_digests()
+
+    def send_digests(self) -> None:
+        """Deliver the notifications folded while the delivery queue was full."""
+        for message, channels, recipients, entry_ids in self.digests.pop_all():
+            results = self.deliver(message, channels, recipients=recipients)
+            if self.outbox:
+                for channel, delivered in results.items():
+                    # A deferred digest is journaled itself, and so covers
+                    # the notifications it folds.
+                    if delivered:
+                        for folded_id in entry_ids:
+                            self.outbox.ack(folded_id, channel)
+
+    def _forward(
+        self,
+        message: str,
+        channels: List[str],
+        key: Optional[str] = None,
+        notebook: Optional[str] = None,
+    ) -> Optional[Dict[str, bool]]:
+        """
+        Hand a message over to the notification gateway, if one is configured.
+
+        The message is only sent directly when the gateway could not be
+        connected to. If it may have received the message without answering,
+        the channels are reported as failed, to be forwarded again under the
+        same idempotency key by the outbox retries.
+
+        Returns:
+            Whether the gateway accepted the message, by channel, or None if
+            the message must be sent directly.
+        """
+        gateway = self.gateway
+        if gateway is None or not gateway.available:
+            return None
+        try:
+            return gateway.forward(message, channels, notebook=notebook, key=key)
+        except GatewayUnavailable as exc:
+            self.log.warning(
+                f"Notification gateway unavailable; sending directly: {exc}"
+            )
+            return None
+        except Exception as exc:
+            self.log.warning(
+                f"Notification gateway did not answer; retrying later: {exc}"
+            )
+            return {channel: False for channel in channels}
+
+    def send_resource_notification(
+        self, params: NotificationParams, reason: str
+    ) -> None:
+        """
+        Send a notification for a cell whose kernel exceeded a resource threshold.
+
+        Args:
+            params: Notification parameters of the watched cell.
+            reason: Description of the exceeded threshold.
+        """
+        params.resource_alert = reason
+        self.send_notification(params)
+
+    def _send_failure_summary(self, occurrences: FailureOccurrences) -> None:
+        """Send one summary for failures suppressed during a window."""
+        count = occurrences.suppressed
+        message_parts = []
+        if occurrences.notebook_name:
+            message_parts.append(occurrences.notebook_name)
+        message_parts.extend(
+            [
+                "Execution Status: Failed",
+                f"Details: {count} more occurrence{'s' if count != 1 else ''} "
+                f"of this error:\n{occurrences.summary}",
+            ]
+        )
+        self.deliver(
+            "\n".join(message_parts),
+            occurrences.channels,
+            recipients=occurrences.recipients,
+            priority=PRIORITY_FAILURE,
+            notebook=occurrences.notebook_name,
+        )
+
+    def complete_run_cell(
+        self, params: NotificationParams, success: bool, end_time: Optional[str] = None
+    ) -> None:
+        """
+        Count a finished cell towards its run.
+
+        Args:
+            params: Notification parameters of the cell, with ``run_id`` set.
+            success: Whether the cell succeeded.
+            end_time: ISO timestamp of the end of execution, if known.
+        """
+        duration = params.duration
+        if params.start_time and end_time:
+            duration = (
+                datetime.fromisoformat(end_time)
+                - datetime.fromisoformat(params.start_time)
+            ).total_seconds()
+        self.runs.complete(params, bool(success), duration)
+        self.end_trace(
+            params,
+            status="Success" if success else "Failed",
+            decision="counted in run",
+            run_id=params.run_id,
+        )
+
+    def send_run_notification(self, run: RunState) -> None:
+        """
+        Send the single notification of a run.
+
+        Args:
+            run: The run that failed or finished.
+        """
+        params = run.params
+        trace = self.trace(params)
+        trace.begin("decision")
+        status = "Failed" if run.failure else "Completed"
+        if params.mode == "on-error" and not run.failure:
+            self._record_history(params, status, "skipped: mode")
+            return
+        # Runs faster than the threshold are skipped, as single cells are
+        if params.mode == "default" and run.ended is not None:
+            if run.ended - run.started < params.threshold:
+                self._record_history(params, status, "skipped: below threshold")
+                return
+        if not self.sent_keys.add(f"run:{run.run_id}:{status}"):
+            self._record_history(params, status, "skipped: duplicate")
+            return
+        started = time.time()
+
+        cells = f"Cells: {run.finished} of {run.size} finished"
+        if run.failed:
+            cells += f", {run.failed} failed"
+        message_parts = []
+        if params.notebook_name:
+            message_parts.append(params.notebook_name)
+        message_parts.extend(
+            [
+                f"Run Status: {status}",
+                cells,
+                f"Total runtime: {format_duration(run.ended - run.started)}",
+            ]
+        )
+        slowest = run.slowest_cells()
+        if slowest:
+            message_parts.append("Slowest cells:")
+            message_parts.extend(
+                f"  {label}: {format_duration(duration)}" for duration, label in slowest
+            )
+        if run.failure:
+            failure = run.failure
+            cell_info = (
+                f"Cell {failure.execution_count}"
+                if failure.execution_count is not None
+                else f"Cell id {failure.cell_id}"
+            )
+            details = f"Details: {cell_info} failed"
+            if failure.error:
+                details += f"\nError:\n{failure.error}"
+            message_parts.append(details)
+
+        self.publish(
+            {
+                "type": "notification",
+                "cell_id": (run.failure or params).cell_id,
+                "run_id": run.run_id,
+                "notebook_name": params.notebook_name,
+                "notebook_id": params.notebookId,
+                "status": status,
+                "message": cells,
+                "execution_count": None,
+            },
+            params.username,
+        )
+        channels, recipients = self._resolve_channels(params)
+        trace.finish("decision", status=status)
+        results = self.deliver(
+            "\n".join(message_parts),
+            channels,
+            recipients=recipients,
+            cell_id=params.cell_id,
+            username=params.username,
+            trace=trace,
+            priority=delivery_priority(status),
+            notebook=params.notebook_path or params.notebook_name,
+        )
+        self._record_history(
+            params, status, delivery_decision(results), results, time.time() - started
+        )
+
+    def _record_history(
+        self,
+        params: NotificationParams,
+        status: str,
+        decision: str,
+        channels: Optional[Dict[str, Union[bool, str]]] = None,
+        latency: Optional[float] = None,
+    ) -> None:
+        """Record a notification decision in the history and end its trace."""
+        self.end_trace(params, status=status, decision=decision)
+        if self.history is None:
+            return
+        self.history.append(
+            notebook=params.notebook_path or params.notebook_name,
+            cell_id=params.cell_id,
+            mode=params.mode,
+            status=status,
+            decision=decision,
+            channels=channels,
+            latency=latency,
+            username=params.username,
+        )
+
+    def _resolve_channels(
+        self, params: NotificationParams
+    ) -> Tuple[List[str], Dict[str, Optional[List[str]]]]:
+        """Return the channels and recipients selected for a notification."""
+        channels = list(params.channels or [])
+        if params.slackEnabled and "slack" not in channels:
+            channels.append("slack")
+        if params.emailEnabled and "email" not in channels:
+            channels.append("email")
+        return resolve_recipients(self._config, params, channels)
 
     def send_notification(
         self, params: NotificationParams, end_time: Optional[str] = None
@@ -173,12 +1219,18 @@ class NotifyExtension(ExtensionApp):
             params: Notification parameters including mode, messages, and status.
         """
         self.log.debug(f"Preparing to send notification with params: {params}")
+        started = time.time()
+        trace = self.trace(params)
+        trace.begin("decision")
 
         # Determine status and message based on cell execution
         if params.timer and params.timer.is_alive():
             params.timer.cancel()
             status = "Timeout"
             message = "Cell execution timed out!"
+        elif params.resource_alert:
+            status = "Resource Limit Exceeded"
+            message = params.resource_alert
         else:
             status = "Success" if params.success else "Failed"
             message = params.successMessage if params.success else params.failureMessage
@@ -186,10 +1238,19 @@ class NotifyExtension(ExtensionApp):
                 message += f"\nError:\n{params.error}"
 
         # Decide whether to send the notification based on mode
-        if params.mode == "never" or (params.mode == "on-error" and params.success):
+        if (
+            params.mode == "never"
+            or (params.mode == "on-error" and params.success)
+            or (
+                params.mode == "resource-threshold"
+                and params.success
+                and not params.resource_alert
+            )
+        ):
             self.log.debug(
                 "Notification mode conditions not met; skipping notification."
             )
+            self._record_history(params, status, "skipped: mode")
             return
 
         # Skip notification if execution time is below the threshold in default mode
@@ -198,6 +1259,35 @@ class NotifyExtension(ExtensionApp):
             end_time_dt = datetime.fromisoformat(end_time)
 
             if (end_time_dt - start_time_dt) < timedelta(seconds=params.threshold):
+                self._record_history(params, status, "skipped: below threshold")
+                return
+
+        # Skip outcomes already delivered through another path
+        params.idempotency_key = idempotency_key(params, status)
+        if not self.sent_keys.add(params.idempotency_key):
+            self.log.debug(
+                f"Duplicate notification {params.idempotency_key}; skipping."
+            )
+            params.notification_sent = True
+            self._record_history(params, status, "skipped: duplicate")
+            return
+
+        channels, recipients = self._resolve_channels(params)
+
+        # Suppress repeats of the same failure within the suppression window
+        if status == "Failed" and params.error:
+            error = str(params.error)
+            fingerprint = error_fingerprint(error)
+            if not self.failure_fingerprints.record(
+                (params.notebook_name, fingerprint),
+                params.notebook_name,
+                error.strip().splitlines()[0],
+                channels,
+                recipients,
+            ):
+                self.log.debug(f"Suppressing repeated failure {fingerprint}.")
+                params.notification_sent = True
+                self._record_history(params, status, "suppressed: repeated failure")
                 return
 
         # Build formatted message with status, cell info, and details
@@ -216,10 +1306,39 @@ class NotifyExtension(ExtensionApp):
         formatted_message = "\n".join(message_parts)
         self.log.debug(f"Formatted notification message: {formatted_message}")
 
-        if params.slackEnabled:
-            self.send_slack_notification(formatted_message)
-        if params.emailEnabled:
-            self.send_email_notification(formatted_message)
+        # Fold Slack messages into the run's live summary instead of posting each one
+        if self._config.slack_run_summary and "slack" in channels:
+            channels = [c for c in channels if c != "slack"]
+            for target in recipients.pop("slack", None) or [None]:
+                self.slack_summaries.record(params, status, formatted_message, target)
+
+        trace.finish("decision", status=status)
+        self.publish(
+            {
+                "type": "notification",
+                "cell_id": params.cell_id,
+                "run_id": params.run_id,
+                "notebook_name": params.notebook_name,
+                "notebook_id": params.notebookId,
+                "status": status,
+                "message": message,
+                "execution_count": params.execution_count,
+            },
+            params.username,
+        )
+        results = self.deliver(
+            formatted_message,
+            channels,
+            recipients=recipients,
+            cell_id=params.cell_id,
+            username=params.username,
+            trace=trace,
+            priority=delivery_priority(status),
+            notebook=params.notebook_path or params.notebook_name,
+        )
+        self._record_history(
+            params, status, delivery_decision(results), results, time.time() - started
+        )
 
         # Mark notification as sent to prevent duplicates
         params.notification_sent = True
@@ -0,0 +1,558 @@
+import asyncio
+import hmac
+import http.client
+import json
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import unquote, urlsplit
+
+from tornado import web
+
+from .dedup import RecentKeys
+from .routing import gateway_recipients
+
+GATEWAY_PATH = "/api/jupyter-notify/gateway"
+
+# Notifications of a channel waiting for a token: (outbox entry ID, message)
+_Queue = List[Tuple[Optional[str], str]]
+
+
+class TokenBucket:
+    """
+    Rate limiter allowing ``rate`` operations per second on average, with
+    bursts of up to ``burst`` operations. A rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def take(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            0 if a token was taken, otherwise the seconds until one is.
+        """
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+
+class GatewayUnavailable(OSError):
+    """The gateway could not be connected to, so it received nothing."""
+
+
+def format_digest(messages: List[str]) -> str:
+    """Fold several notifications into a single message."""
+    return f"{len(messages)} notifications\n\n" + "\n\n".join(messages)
+
+
+class NotificationGateway:
+    """
+    Delivery queue shared by the single-user servers of a deployment.
+
+    Accepted notifications are journaled in the outbox of ``app`` and sent
+    with its backends, so every user shares one Slack client, one SMTP
+    connection and the backends' connection pools. Each channel is rate
+    limited across all users; the notifications that arrive while a channel
+    has no token left are folded into one digest of at most ``digest_max``
+    notifications, sent as soon as a token is available.
+
+    Recipients are worked out from the gateway's own configuration: the
+    ``recipients`` of the forwarding user and the routing rules. Channels
+    without a recipient of the user's are dropped rather than sent to the
+    gateway's own recipients. Each forwarded notification carries an
+    idempotency key; a key seen among the last ``seen_keys`` is accepted
+    again without being sent, so that servers can safely retry a forward
+    that timed out. Failed sends go back to their queue, and are retried
+    after the outbox retry interval, doubled after each further failure.
+
+    Sends run in a thread pool; everything else runs on the event loop.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        rate_limit: float = 0.0,
+        rate_burst: int = 1,
+        digest_max: int = 50,
+        recipients: Optional[Dict[str, Dict[str, Any]]] = None,
+        seen_keys: int = 10000,
+        log: Any = None,
+    ) -> None:
+        self.app = app
+        self.rate_limit = rate_limit
+        self.rate_burst = rate_burst
+        self.digest_max = max(digest_max, 1)
+        self.recipients = recipients or {}
+        self.log = log or app.log
+        self._seen = RecentKeys(seen_keys)
+        # (channel, recipients) -> notifications waiting for a token
+        self._queues: Dict[Tuple[str, Optional[Tuple[str, ...]]], _Queue] = {}
+        self._waiting: Set[Tuple[str, Optional[Tuple[str, ...]]]] = set()
+        self._buckets: Dict[str, TokenBucket] = {}
+        # Consecutive failed sends by channel
+        self._failures: Dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor = ThreadPoolExecutor(thread_name_prefix="notify-gateway")
+        self._lock = threading.Lock()
+        self.stats = {
+            "accepted": 0,
+            "duplicates": 0,
+            "dropped": 0,
+            "sent": 0,
+            "digests": 0,
+            "failed": 0,
+        }
+
+    @property
+    def queued(self) -> int:
+        """Number of notifications waiting for a token, counted per channel."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    def accept(
+        self,
+        message: str,
+        channels: List[str],
+        user: Optional[str] = None,
+        notebook: Optional[str] = None,
+        key: Optional[str] = None,
+    ) -> bool:
+        """
+        Journal a forwarded notification and queue it on each of its channels.
+
+        Args:
+            message: The formatted notification message.
+            channels: Channels selected by the forwarding server.
+            user: Authenticated user of the forwarding server, whose
+                recipients apply, or None for the gateway's owner.
+            notebook: Path of the notebook, matched by the routing rules.
+            key: Idempotency key of the notification.
+
+        Returns:
+            False if the key was seen before and the notification dropped.
+        """
+        if key is not None and not self._seen.add(key):
+            with self._lock:
+                self.stats["duplicates"] += 1
+            return False
+        selected = channels
+        channels, recipients = self.resolve(channels, user, notebook)
+        dropped = [channel for channel in selected if channel not in channels]
+        if dropped:
+            self.log.warning(
+                f"No recipients of user {user} on {', '.join(dropped)}; "
+                "dropping the notification there."
+            )
+            with self._lock:
+                self.stats["dropped"] += len(dropped)
+        if not channels:
+            return True
+        outbox = self.app.outbox
+        entry_id = outbox.put(message, channels, recipients) if outbox else None
+        with self._lock:
+            self.stats["accepted"] += 1
+        self.submit(message, channels, recipients, entry_id)
+        return True
+
+    def resolve(
+        self, channels: List[str], user: Optional[str], notebook: Optional[str]
+    ) -> Tuple[List[str], Dict[str, Optional[List[str]]]]:
+        """Return the channels and recipients of a forwarded notification."""
+        user_rule = None if user is None else self.recipients.get(user, {})
+        return gateway_recipients(self.app._config, user_rule, notebook, channels)
+
+    def submit(
+        self,
+        message: str,
+        channels: List[str],
+        recipients: Optional[Dict[str, Optional[List[str]]]] = None,
+        entry_id: Optional[str] = None,
+    ) -> None:
+        """Queue an already journaled notification."""
+        self._loop = asyncio.get_running_loop()
+        for channel in channels:
+            targets = (recipients or {}).get(channel)
+            key = (channel, tuple(targets) if targets is not None else None)
+            self._queues.setdefault(key, []).append((entry_id, message))
+            self._dispatch(key)
+
+    def restore(self) -> None:
+        """Queue the notifications the outbox still holds from a previous run."""
+        outbox = self.app.outbox
+        if not outbox:
+            return
+        max_age = self.app._config.outbox_max_age
+        for entry in outbox.pending():
+            if time.time() - entry.created > max_age:
+                self.log.warning(f"Dropping stale journaled notification {entry.id}")
+                outbox.discard(entry.id)
+                continue
+            self.submit(entry.message, entry.remaining, entry.recipients, entry.id)
+
+    def close(self) -> None:
+        """Wait for the sends in progress; queued notifications stay journaled."""
+        self._executor.shutdown(wait=True)
+
+    def _dispatch(self, key: Tuple[str, Optional[Tuple[str, ...]]]) -> None:
+        if key in self._waiting:
+            return
+        channel, targets = key
+        bucket = self._buckets.get(channel)
+        if bucket is None:
+            bucket = self._buckets[channel] = TokenBucket(
+                self.rate_limit, self.rate_burst
+            )
+        queue = self._queues.get(key)
+        while queue:
+            wait = bucket.take()
+            if wait > 0:
+                self._waiting.add(key)
+                asyncio.get_running_loop().call_later(wait, self._wake, key)
+                return
+            batch = queue[: self.digest_max]
+            del queue[: self.digest_max]
+            self._executor.submit(self._send, channel, targets, batch)
+        self._queues.pop(key, None)
+
+    def _wake(self, key: Tuple[str, Optional[Tuple[str, ...]]]) -> None:
+        self._waiting.discard(key)
+        self._dispatch(key)
+
+    def _send(
+        self, channel: str, targets: Optional[Tuple[str, ...]], batch: _Queue
+    ) -> None:
+        messages = [message for _, message in batch]
+        message = messages[0] if len(messages) == 1 else format_digest(messages)
+        recipients = {channel: list(targets)} if targets is not None else None
+        delivered = self.app.backends.deliver(message, [channel], recipients)[channel]
+        with self._lock:
+            if delivered:
+                self.stats["sent"] += len(batch)
+                self.stats["digests"] += len(batch) > 1
+            else:
+                self.stats["failed"] += len(batch)
+        if not delivered:
+            self._retry(channel, targets, batch)
+            return
+        with self._lock:
+            self._failures.pop(channel, None)
+        outbox = self.app.outbox
+        if outbox:
+            for entry_id, _ in batch:
+                if entry_id is not None:
+                    outbox.ack(entry_id, channel)
+
+    def _retry(
+        self, channel: str, targets: Optional[Tuple[str, ...]], batch: _Queue
+    ) -> None:
+        """Put a batch that failed to send back in its queue, after a backoff."""
+        config = self.app._config
+        if config.outbox_retry_interval <= 0 or self._loop is None:
+            self.log.warning(
+                f"Failed to send {len(batch)} notification(s) on {channel}; "
+                "they will be replayed when the gateway restarts."
+            )
+            return
+        with self._lock:
+            failures = self._failures.get(channel, 0)
+            self._failures[channel] = failures + 1
+        delay = min(
+            config.outbox_retry_interval * 2**failures,
+            config.outbox_retry_max_interval,
+        )
+        self.log.warning(
+            f"Failed to send {len(batch)} notification(s) on {channel}; "
+            f"retrying in {delay:g} s."
+        )
+        self._loop.call_soon_threadsafe(
+            self._loop.call_later, delay, self._requeue, (channel, targets), batch
+        )
+
+    def _requeue(
+        self, key: Tuple[str, Optional[Tuple[str, ...]]], batch: _Queue
+    ) -> None:
+        self._queues.setdefault(key, [])[:0] = batch
+        self._dispatch(key)
+
+
+class GatewayHandler(web.RequestHandler):
+    """
+    Accepts notifications forwarded by single-user servers.
+
+    ``POST`` takes ``{"deliveries": [{"message", "channels", "notebook",
+    "key"}]}`` and answers, for each delivery, the channels it was accepted
+    on; ``GET`` returns the gateway's counters.
+
+    ``tokens`` maps each user's token to their name. When set, requests must
+    carry a token in an ``Authorization: token <token>`` header, and are
+    from its user, who must have recipients on the gateway. When not, the
+    requests are from the gateway's owner.
+    """
+
+    def initialize(
+        self, gateway: NotificationGateway, tokens: Optional[Dict[str, str]] = None
+    ) -> None:
+        self.gateway = gateway
+        self.tokens = tokens or {}
+        self.user: Optional[str] = None
+
+    def prepare(self) -> None:
+        if not self.tokens:
+            return
+        scheme, _, token = self.request.headers.get("Authorization", "").partition(" ")
+        user = None
+        # Compare with every token, so that timing does not tell them apart.
+        for candidate, name in self.tokens.items():
+            if hmac.compare_digest(token.encode("utf-8"), candidate.encode("utf-8")):
+                user = name
+        if scheme.lower() != "token" or user is None:
+            raise web.HTTPError(403)
+        if user not in self.gateway.recipients:
+            raise web.HTTPError(403, f"No recipients configured for user {user}")
+        self.user = user
+
+    def get(self) -> None:
+        self.finish({**self.gateway.stats, "queued": self.gateway.queued})
+
+    def post(self) -> None:
+        try:
+            deliveries = [
+                (
+                    str(d["message"]),
+                    [str(channel) for channel in d.get("channels") or []],
+                    _optional_str(d.get("notebook")),
+                    _optional_str(d.get("key")),
+                )
+                for d in json.loads(self.request.body)["deliveries"]
+            ]
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            self.set_status(400)
+            self.finish({"error": f"Invalid deliveries: {exc}"})
+            return
+        results = []
+        for message, channels, notebook, key in deliveries:
+            # A repeated key was accepted before; channels without recipients
+            # are dropped for good, so neither is forwarded again.
+            self.gateway.accept(message, channels, self.user, notebook, key)
+            results.append({channel: True for channel in channels})
+        self.finish({"results": results})
+
+
+def _optional_str(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket."""
+
+    def __init__(self, socket_path: str, timeout: float = 10.0) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class GatewayClient:
+    """
+    Forwards notifications to a gateway, batching those sent together.
+
+    The first notification of a batch waits ``batch_window`` seconds for
+    others, then the batch is posted in one request over a kept-alive
+    connection. If the gateway cannot be reached, it is not tried again for
+    ``retry_interval`` seconds.
+
+    Args:
+        url: ``http://127.0.0.1:<port>`` or ``unix:///path/to/socket``.
+        token: The user's token on the gateway, if it requires one.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        token: Optional[str] = None,
+        batch_window: float = 0.05,
+        timeout: float = 5.0,
+        retry_interval: float = 30.0,
+        log: Any = None,
+    ) -> None:
+        target = urlsplit(url)
+        self.url = url
+        self.token = token
+        self.batch_window = batch_window
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.log = log
+        if target.scheme == "unix":
+            self._socket_path: Optional[str] = unquote(target.path)
+            self._path = GATEWAY_PATH
+        else:
+            self._socket_path = None
+            self._path = target.path.rstrip("/") + GATEWAY_PATH
+        self._target = target
+        self._batch: List[Tuple[Dict[str, Any], Future]] = []
+        self._lock = threading.Lock()
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._conn_lock = threading.Lock()
+        self._retry_at = 0.0
+
+    @property
+    def available(self) -> bool:
+        """Whether the gateway is worth trying, i.e. it did not fail recently."""
+        return time.monotonic() >= self._retry_at
+
+    def forward(
+        self,
+        message: str,
+        channels: List[str],
+        notebook: Optional[str] = None,
+        key: Optional[str] = None,
+    ) -> Dict[str, bool]:
+        """
+        Hand a notification over to the gateway; blocking.
+
+        The gateway works out the recipients itself, from the user its token
+        belongs to and the notebook path. Forwarding again with the same
+        ``key`` is safe: the gateway drops keys it has seen.
+
+        Args:
+            message: The formatted notification message.
+            channels: Channels selected for the notification.
+            notebook: Path of the notebook, for the gateway's routing rules.
+            key: Idempotency key; a new one when None.
+
+        Returns:
+            Whether the gateway accepted the notification, by channel.
+
+        Raises:
+            GatewayUnavailable if the gateway could not be connected to.
+            OSError or http.client.HTTPException if it may have received the
+            notification but did not answer.
+        """
+        future: Future = Future()
+        delivery = {
+            "message": message,
+            "channels": channels,
+            "notebook": notebook,
+            "key": key or uuid.uuid4().hex,
+        }
+        with self._lock:
+            self._batch.append((delivery, future))
+            if len(self._batch) == 1:
+                timer = threading.Timer(self.batch_window, self._flush)
+                timer.daemon = True
+                timer.start()
+        return future.result(self.batch_window + 2 * self.timeout)
+
+    def close(self) -> None:
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _flush(self) -> None:
+        with self._lock:
+            batch, self._batch = self._batch, []
+        if not batch:
+            return
+        try:
+            results = self._post([delivery for delivery, _ in batch])
+            if len(results) != len(batch):
+                raise http.client.HTTPException("Gateway answered a different batch")
+        except Exception as exc:
+            self._retry_at = time.monotonic() + self.retry_interval
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _post(self, deliveries: List[Dict[str, Any]]) -> List[Dict[str, bool]]:
+        body = json.dumps({"deliveries": deliveries}).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"token {self.token}"
+        with self._conn_lock:
+            reused = self._conn is not None
+            if self._conn is None:
+                self._conn = self._connect()
+            try:
+                response = self._request(body, headers)
+            except (OSError, http.client.HTTPException):
+                self._conn.close()
+                self._conn = None
+                if not reused:
+                    raise
+                # The gateway may have closed the idle connection; retry once.
+                # Should it have received the request, it drops the repeated keys.
+                try:
+                    self._conn = self._connect()
+                except GatewayUnavailable as exc:
+                    # The first attempt may have been received all the same.
+                    raise ConnectionError(str(exc)) from exc
+                try:
+                    response = self._request(body, headers)
+                except (OSError, http.client.HTTPException):
+                    self._conn.close()
+                    self._conn = None
+                    raise
+            data = response.read()
+            if response.will_close:
+                self._conn.close()
+                self._conn = None
+        if response.status in (400, 403):
+            # Rejected before any delivery was accepted.
+            raise GatewayUnavailable(
+                f"Gateway returned {response.status} {response.reason}"
+            )
+        if response.status != 200:
+            raise http.client.HTTPException(
+                f"Gateway returned {response.status} {response.reason}"
+            )
+        return json.loads(data)["results"]
+
+    def _request(self, body: bytes, headers: Dict[str, str]) -> Any:
+        self._conn.request("POST", self._path, body=body, headers=headers)
+        return self._conn.getresponse()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        """Open a connection, so that failing to reach the gateway is told apart."""
+        if self._socket_path is not None:
+            conn: http.client.HTTPConnection = UnixHTTPConnection(
+                self._socket_path, timeout=self.timeout
+            )
+        elif self._target.scheme == "https":
+            conn = http.client.HTTPSConnection(
+                self._target.hostname, self._target.port, timeout=self.timeout
+            )
+        else:
+            conn = http.client.HTTPConnection(
+                self._target.hostname, self._target.port, timeout=self.timeout
+            )
+        try:
+            conn.connect()
+        except OSError as exc:
+            conn.close()
+            raise GatewayUnavailable(f"Cannot connect to {self.url}: {exc}") from exc
+        return conn
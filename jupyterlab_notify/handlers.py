@@ -1,14 +1,18 @@
+import asyncio
 import json
 import logging
 import threading
 from http import HTTPStatus
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 
 import tornado.web
 from jupyter_server.base.handlers import JupyterHandler
+from tornado import websocket
+from tornado.ioloop import IOLoop
 from jupyter_server.extension.handler import ExtensionHandlerMixin
 
 from .config import NotificationParams, notification_params_from_dict
+from .registry import params_to_dict
 
 
 def setup_logger(name: str) -> logging.Logger:
@@ -22,15 +26,113 @@ def setup_logger(name: str) -> logging.Logger:
     return logger
 
 
+def current_username(handler: JupyterHandler) -> Optional[str]:
+    """Return the name of the user making the request, if known."""
+    return getattr(handler.current_user, "username", None)
+
+
+def drop_registration(extension_app: Any, cell_id: str) -> Optional[NotificationParams]:
+    """
+    Remove the server-side registration of a cell and disarm its watches.
+
+    Returns:
+        The removed registration, or None if the cell was not registered.
+    """
+    registered = extension_app.cell_ids.pop(cell_id, None)
+    if registered:
+        if registered.timer:
+            registered.timer.cancel()
+        if registered.mode == "resource-threshold":
+            extension_app.resource_sampler.unwatch(
+                registered.cell_id, registered.kernel_id
+            )
+        if registered.msg_id and extension_app.kernel_tap:
+            extension_app.kernel_tap.unwatch(registered.msg_id, registered.kernel_id)
+    return registered
+
+
+def record_request(
+    extension_app: Any, kind: str, data: Union[NotificationParams, Dict[str, Any]]
+) -> None:
+    """Record a browser request if the extension records its events."""
+    recorder = getattr(extension_app, "recorder", None)
+    if recorder is None or not recorder.enabled:
+        return
+    if isinstance(data, NotificationParams):
+        # Browsers set ``timer`` to report a timeout.
+        data = {**params_to_dict(data), "timer": bool(data.timer)}
+    recorder.record(kind, data)
+
+
+def cancel_registration(extension_app: Any, cell_id: str) -> None:
+    """Drop the registration of a cell that will not be notified."""
+    record_request(extension_app, "cancel", {"cell_id": cell_id})
+    registered = drop_registration(extension_app, cell_id)
+    if registered and registered.trace:
+        registered.trace.end(decision="cancelled")
+
+
+def run_delivery(extension_app: Any, func: Any, *args: Any) -> "asyncio.Future[Any]":
+    """
+    Run a function that may deliver notifications in the delivery executor.
+
+    Deliveries block until the delivery gate admits them, so they must not run
+    on the IOLoop.
+    """
+    return IOLoop.current().run_in_executor(
+        getattr(extension_app, "delivery_executor", None), func, *args
+    )
+
+
+def trigger_notification(
+    extension_app: Any, params: NotificationParams
+) -> Optional["asyncio.Future[Any]"]:
+    """
+    Send the notification of a cell whose completion the browser reports.
+
+    Returns:
+        The pending delivery, or None if nothing is sent.
+    """
+    record_request(extension_app, "trigger", params)
+    # Drop any server-side registration now that the browser reports completion.
+    registered = drop_registration(extension_app, params.cell_id)
+    if registered and registered.notification_sent:
+        extension_app.log.debug(
+            f"Notification already sent for cell_id {params.cell_id}, skipping"
+        )
+        if registered.trace:
+            registered.trace.end(decision="skipped: already sent")
+        return None
+    if registered:
+        params.trace = registered.trace
+
+    if params.run_id:
+        return run_delivery(
+            extension_app, extension_app.complete_run_cell, params, params.success
+        )
+
+    # If timer is true, it is due to timout!
+    if params.timer:
+        # Starting a dummy timer as placeholder
+        params.timer = threading.Timer(10, lambda *args: None)
+        params.timer.start()
+
+    return run_delivery(extension_app, extension_app.send_notification, params)
+
+
 class NotifyHandler(ExtensionHandlerMixin, JupyterHandler):
     """
     Handler to register cell IDs for notifications.
 
     GET:
-        Returns the status of nbmodel event listening and notification configurations.
+        Returns the status of nbmodel event listening and notification
+        configurations, with an ETag for conditional requests.
 
     POST:
         Registers a cell ID and schedules a notification if a threshold is set.
+
+    DELETE:
+        Cancels the registration of the cell given by the ``cell_id`` argument.
     """
 
     def initialize(self, extension_app: Any, *args: Any, **kwargs: Any) -> None:
@@ -39,29 +141,17 @@ class NotifyHandler(ExtensionHandlerMixin, JupyterHandler):
 
     @tornado.web.authenticated
     def get(self) -> None:
-        """Check if the extension is listening for nbmodel events and verify configuration."""
-        self.extension_app.log.debug(
-            f"Checking nbmodel listener: {self.extension_app.is_listening}"
-        )
-        slack_configured = bool(
-            self.extension_app.slack_client
-            and (
-                self.extension_app.slack_user_id
-                or self.extension_app.slack_channel_name
-            )
-        )
-        email_configured = bool(self.extension_app.email)
-        smtp_server_running = bool(self.extension_app._config.smtp_instance)
-
+        """Return the capability snapshot, or 304 if the client's copy is current."""
+        self.extension_app.capabilities.request_probe()
+        etag, capabilities = self.extension_app.capabilities.snapshot()
+        self.set_header("ETag", etag)
+        self.set_header("Cache-Control", "no-cache")
+        if self.check_etag_header():
+            self.set_status(HTTPStatus.NOT_MODIFIED)
+            self.finish()
+            return
         self.set_status(HTTPStatus.OK)
-        self.finish(
-            {
-                "nbmodel_installed": self.extension_app.is_listening,
-                "slack_configured": slack_configured,
-                "email_configured": email_configured,
-                "smtp_server_running": smtp_server_running,
-            }
-        )
+        self.finish(capabilities)
 
     @tornado.web.authenticated
     async def post(self) -> None:
@@ -76,18 +166,19 @@ class NotifyHandler(ExtensionHandlerMixin, JupyterHandler):
             f"Registering notification for cell_id: {params.cell_id}"
         )
 
-        # If a timeout threshold is configured, schedule a timer to trigger notification.
-        if params.mode == "custom-timeout":
-            timer = threading.Timer(
-                params.threshold, self.extension_app.send_notification, args=(params,)
-            )
-            params.timer = timer
-            timer.start()
-
-        self.extension_app.cell_ids[params.cell_id] = params
+        params.username = current_username(self)
+        self.extension_app.register_notification(params)
         self.set_status(HTTPStatus.OK)
         self.finish({"accepted": True})
 
+    @tornado.web.authenticated
+    def delete(self) -> None:
+        """Cancel the registration of a cell."""
+        cell_id = self.get_query_argument("cell_id")
+        cancel_registration(self.extension_app, cell_id)
+        self.set_status(HTTPStatus.OK)
+        self.finish({"cancelled": True})
+
     def _parse_request_body(
         self, body: bytes
     ) -> tuple[Optional[NotificationParams], str]:
@@ -128,13 +219,10 @@ class NotifyTriggerHandler(ExtensionHandlerMixin, JupyterHandler):
             self.finish({"error": error})
             return
 
-        # If timer is true, it is due to timout!
-        if params.timer:
-            # Starting a dummy timer as placeholder
-            params.timer = threading.Timer(10, lambda *args: None)
-            params.timer.start()
-
-        self.extension_app.send_notification(params)
+        params.username = current_username(self)
+        pending = trigger_notification(self.extension_app, params)
+        if pending is not None:
+            await pending
         self.set_status(HTTPStatus.OK)
         self.finish({"done": True})
 
@@ -155,3 +243,224 @@ class NotifyTriggerHandler(ExtensionHandlerMixin, JupyterHandler):
             return None, "Invalid JSON in request"
         except ValueError as exc:
             return None, str(exc)
+
+
+class NotifyHistoryHandler(ExtensionHandlerMixin, JupyterHandler):
+    """
+    Handler to query the log of sent and skipped notifications.
+
+    GET:
+        Returns the current user's entries, newest first. Filters: ``notebook``,
+        ``cell_id``, ``status``, ``since`` and ``until`` (epoch seconds).
+        ``limit`` sets the page size and ``before`` takes the ``next`` cursor
+        of the previous page.
+    """
+
+    max_limit = 500
+
+    def initialize(self, extension_app: Any, *args: Any, **kwargs: Any) -> None:
+        self.extension_app = extension_app
+        super().initialize(*args, **kwargs)
+
+    @tornado.web.authenticated
+    def get(self) -> None:
+        """Return a page of matching history entries."""
+        history = self.extension_app.history
+        if history is None:
+            self.set_status(HTTPStatus.NOT_FOUND)
+            self.finish({"error": "Notification history is disabled"})
+            return
+        try:
+            since = self._number("since", float)
+            until = self._number("until", float)
+            before = self._number("before", int)
+            limit = min(self._number("limit", int) or 50, self.max_limit)
+        except ValueError as exc:
+            self.set_status(HTTPStatus.BAD_REQUEST)
+            self.finish({"error": str(exc)})
+            return
+
+        entries, cursor = history.query(
+            notebook=self.get_query_argument("notebook", None),
+            cell_id=self.get_query_argument("cell_id", None),
+            status=self.get_query_argument("status", None),
+            since=since,
+            until=until,
+            before=before,
+            limit=limit,
+            username=current_username(self),
+        )
+        self.set_status(HTTPStatus.OK)
+        self.finish({"entries": entries, "next": cursor})
+
+    def _number(self, name: str, kind: Any) -> Any:
+        value = self.get_query_argument(name, None)
+        if value is None:
+            return None
+        try:
+            return kind(value)
+        except ValueError:
+            raise ValueError(f"{name} must be a number")
+
+
+class NotifyEventsHandler(ExtensionHandlerMixin, JupyterHandler):
+    """
+    Handler to replay notification events a browser missed while disconnected.
+
+    GET:
+        Returns the current user's events after the ``after`` sequence number.
+        If ``epoch`` is given and differs, the server restarted since and all
+        retained events are returned.
+    """
+
+    def initialize(self, extension_app: Any, *args: Any, **kwargs: Any) -> None:
+        self.extension_app = extension_app
+        super().initialize(*args, **kwargs)
+
+    @tornado.web.authenticated
+    def get(self) -> None:
+        """Return the events after the given sequence number."""
+        events = self.extension_app.events
+        username = current_username(self)
+        try:
+            after = int(self.get_query_argument("after", "0"))
+        except ValueError:
+            self.set_status(HTTPStatus.BAD_REQUEST)
+            self.finish({"error": "after must be an integer"})
+            return
+        if self.get_query_argument("epoch", events.epoch) != events.epoch:
+            after = 0
+
+        missed, truncated = events.since(after, username)
+        self.set_status(HTTPStatus.OK)
+        self.finish(
+            {
+                "epoch": events.epoch,
+                "seq": events.seq(username),
+                "events": missed,
+                "truncated": truncated,
+            }
+        )
+
+
+class NotifyConfigHandler(ExtensionHandlerMixin, JupyterHandler):
+    """
+    Handler reporting and reloading the notification configuration.
+
+    GET:
+        Returns the generation of the configuration in use, when it was
+        loaded and the error of the last failed reload, if any.
+    POST:
+        Re-reads the config files now and returns the same status.
+    """
+
+    def initialize(self, extension_app: Any, *args: Any, **kwargs: Any) -> None:
+        self.extension_app = extension_app
+        super().initialize(*args, **kwargs)
+
+    @tornado.web.authenticated
+    def get(self) -> None:
+        """Return the status of the configuration."""
+        self.set_status(HTTPStatus.OK)
+        self.finish(self._status())
+
+    @tornado.web.authenticated
+    async def post(self) -> None:
+        """Reload the configuration."""
+        loop = asyncio.get_running_loop()
+        reloaded = await loop.run_in_executor(None, self.extension_app.reload_config)
+        self.set_status(HTTPStatus.OK if reloaded else HTTPStatus.INTERNAL_SERVER_ERROR)
+        self.finish(dict(self._status(), reloaded=reloaded))
+
+    def _status(self) -> Dict[str, Any]:
+        app = self.extension_app
+        return {
+            "generation": app.config_generation,
+            "loaded_at": app.config_loaded_at,
+            "error": app.config_error,
+        }
+
+
+class NotifySocketHandler(
+    ExtensionHandlerMixin, JupyterHandler, websocket.WebSocketHandler
+):
+    """
+    WebSocket carrying registrations, cancellations and triggers.
+
+    Requests are JSON objects ``{"id": ..., "type": ..., "payload": ...}``
+    where type is "register", "cancel" or "trigger" and the payload is the
+    body of the equivalent HTTP request (``{"cell_id": ...}`` for "cancel").
+    Each one is acknowledged with ``{"type": "ack", "id": ..., "ok": ...}``.
+    The server pushes "notification" events for notifications it sends and
+    "delivery" events with the outcome per channel.
+    """
+
+    def initialize(self, extension_app: Any, *args: Any, **kwargs: Any) -> None:
+        self.extension_app = extension_app
+        self._loop: Optional[IOLoop] = None
+        self.username: Optional[str] = None
+        super().initialize(*args, **kwargs)
+
+    async def get(self, *args: Any, **kwargs: Any) -> None:
+        """Authenticate once, when the socket is opened."""
+        if self.current_user is None:
+            raise tornado.web.HTTPError(HTTPStatus.FORBIDDEN)
+        res = super().get(*args, **kwargs)
+        if res is not None:
+            await res
+
+    def open(self, *args: Any, **kwargs: Any) -> None:
+        self._loop = IOLoop.current()
+        self.username = current_username(self)
+        self.extension_app.sockets.add(self)
+
+    def on_close(self) -> None:
+        self.extension_app.sockets.discard(self)
+
+    def on_message(self, message: Any) -> None:
+        """Handle a request and acknowledge it."""
+        request_id = None
+        try:
+            request = json.loads(message)
+            request_id = request.get("id")
+            self._handle(request.get("type"), request.get("payload") or {})
+        except Exception as exc:
+            self.extension_app.log.error(f"Invalid notification request: {exc}")
+            self._write(
+                {"type": "ack", "id": request_id, "ok": False, "error": str(exc)}
+            )
+            return
+        self._write({"type": "ack", "id": request_id, "ok": True})
+
+    def push(self, event: Dict[str, Any]) -> None:
+        """Send an event to the browser; safe to call from any thread."""
+        if self._loop is not None:
+            self._loop.add_callback(self._write, event)
+
+    def _handle(self, request_type: Optional[str], payload: Dict[str, Any]) -> None:
+        if request_type == "cancel":
+            cancel_registration(self.extension_app, payload["cell_id"])
+            return
+        params = notification_params_from_dict(payload)
+        params.username = self.username
+        if request_type == "register":
+            self.extension_app.register_notification(params)
+        elif request_type == "trigger":
+            # Acknowledged once accepted; the outcome is pushed as an event.
+            pending = trigger_notification(self.extension_app, params)
+            if pending is not None:
+                pending.add_done_callback(self._log_failure)
+        else:
+            raise ValueError(f"Unknown request type {request_type!r}")
+
+    def _log_failure(self, future: "asyncio.Future[Any]") -> None:
+        if future.exception() is not None:
+            self.extension_app.log.error(
+                f"Failed to send notification: {future.exception()}"
+            )
+
+    def _write(self, message: Dict[str, Any]) -> None:
+        try:
+            self.write_message(json.dumps(message))
+        except websocket.WebSocketClosedError:
+            self.extension_app.sockets.discard(self)
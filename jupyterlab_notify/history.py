@@ -0,0 +1,226 @@
+import json
+import os
+import sqlite3
+import threading
+from time import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Rotation runs once per this many appended entries.
+_ROTATE_EVERY = 100
+
+_COLUMNS = (
+    "id",
+    "created",
+    "notebook",
+    "cell_id",
+    "mode",
+    "status",
+    "decision",
+    "channels",
+    "latency",
+    "username",
+)
+
+
+class NotificationHistory:
+    """
+    Append-only log of the notification decisions of the extension.
+
+    Every notification that was sent or skipped is recorded with its
+    notebook, cell, mode, status, outcome per channel and delivery latency
+    in a SQLite database indexed by notebook and time. The log is rotated by
+    dropping entries older than ``max_age`` seconds and the oldest entries
+    beyond ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 10000,
+        max_age: float = 30 * 24 * 3600,
+        log: Any = None,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.log = log
+        self._lock = threading.Lock()
+        self._appended = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._open(path)
+
+    def append(
+        self,
+        notebook: Optional[str],
+        cell_id: Optional[str],
+        mode: Optional[str],
+        status: str,
+        decision: str,
+        channels: Optional[Dict[str, Union[bool, str]]] = None,
+        latency: Optional[float] = None,
+        username: Optional[str] = None,
+    ) -> None:
+        """
+        Record a notification decision.
+
+        Args:
+            notebook: Path or name of the notebook.
+            cell_id: The cell the notification is about.
+            mode: Notification mode of the cell.
+            status: Execution status, e.g. "Success" or "Timeout".
+            decision: "sent", "deferred" if it was folded into a digest, or
+                why the notification was not sent.
+            channels: Delivery outcome per channel: true, false or "deferred".
+            latency: Seconds between the decision to notify and the end of delivery.
+            username: The user who registered the cell.
+        """
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT INTO history (created, notebook, cell_id, mode, "
+                        "status, decision, channels, latency, username) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            time(),
+                            notebook,
+                            cell_id,
+                            mode,
+                            status,
+                            decision,
+                            json.dumps(channels or {}),
+                            latency,
+                            username,
+                        ),
+                    )
+                self._appended += 1
+                if self._appended % _ROTATE_EVERY == 0:
+                    self._rotate()
+            except sqlite3.Error as exc:
+                self.log.error(f"Failed to record notification history: {exc}")
+
+    def query(
+        self,
+        notebook: Optional[str] = None,
+        cell_id: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        before: Optional[int] = None,
+        limit: int = 50,
+        username: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Return matching entries, newest first.
+
+        Args:
+            notebook: Only entries of this notebook.
+            cell_id: Only entries of this cell.
+            status: Only entries with this status.
+            since: Only entries created at or after this epoch time.
+            until: Only entries created before this epoch time.
+            before: Cursor returned by the previous page.
+            limit: Maximum number of entries.
+            username: Only entries of this user, or without a user.
+
+        Returns:
+            Tuple of (entries, cursor of the next page or None).
+        """
+        clauses = []
+        args: List[Any] = []
+        for column, value in (
+            ("notebook", notebook),
+            ("cell_id", cell_id),
+            ("status", status),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        if since is not None:
+            clauses.append("created >= ?")
+            args.append(since)
+        if until is not None:
+            clauses.append("created < ?")
+            args.append(until)
+        if before is not None:
+            clauses.append("id < ?")
+            args.append(before)
+        if username is not None:
+            clauses.append("(username = ? OR username IS NULL)")
+            args.append(username)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+
+        with self._lock:
+            if self._conn is None:
+                return [], None
+            try:
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM history {where}"
+                    "ORDER BY id DESC LIMIT ?",
+                    (*args, limit + 1),
+                ).fetchall()
+            except sqlite3.Error as exc:
+                self.log.error(f"Failed to query notification history: {exc}")
+                return [], None
+
+        entries = []
+        for row in rows[:limit]:
+            entry = dict(zip(_COLUMNS, row))
+            entry["channels"] = json.loads(entry["channels"])
+            entries.append(entry)
+        cursor = entries[-1]["id"] if len(rows) > limit else None
+        return entries, cursor
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _rotate(self) -> None:
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM history WHERE created < ?", (time() - self.max_age,)
+            )
+            self._conn.execute(
+                "DELETE FROM history WHERE id <= "
+                "(SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def _open(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, created REAL NOT NULL, "
+                "notebook TEXT, cell_id TEXT, mode TEXT, status TEXT NOT NULL, "
+                "decision TEXT NOT NULL, channels TEXT NOT NULL, latency REAL, "
+                "username TEXT)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS history_notebook "
+                "ON history (notebook, created)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS history_created ON history (created)"
+            )
+            conn.commit()
+        except (OSError, sqlite3.Error) as exc:
+            self.log.error(
+                f"Failed to open notification history at {path}; "
+                f"notifications will not be recorded: {exc}"
+            )
+            return
+        self._conn = conn
+        with self._lock:
+            try:
+                self._rotate()
+            except sqlite3.Error as exc:
+                self.log.error(f"Failed to rotate notification history: {exc}")
@@ -0,0 +1,228 @@
+import json
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+KERNEL_ACTIONS_SCHEMA_ID = "https://events.jupyter.org/jupyter_server/kernel_actions/v1"
+
+_DELIM = b"<IDS|MSG>"
+# Matched against the raw header frame so that the bulk of iopub traffic
+# (streams, display data, comms) is dropped without being decoded.
+_RELEVANT_HEADER = re.compile(rb'"msg_type":\s*"(?:status|execute_input|error)"')
+
+
+@dataclass
+class _Execution:
+    """What the tap has seen of one execute_request."""
+
+    cell_id: Optional[str] = None
+    started: Optional[str] = None
+    ended: Optional[str] = None
+    execution_count: Optional[int] = None
+    error: Optional[str] = None
+
+
+def _timestamp(header: Dict[str, Any]) -> Optional[str]:
+    date = header.get("date")
+    if isinstance(date, str) and date.endswith("Z"):
+        # datetime.fromisoformat() only accepts "Z" from Python 3.11
+        date = date[:-1] + "+00:00"
+    return date
+
+
+class KernelTap:
+    """
+    Detect cell completion on the server from kernel iopub messages.
+
+    Without ``jupyter_server_nbmodel`` the server does not execute cells
+    itself, so it cannot tell when they finish; the browser has to report
+    it. The tap subscribes to the iopub channel of every kernel instead and
+    follows the executions whose ``execute_request`` msg_id was registered:
+    ``execute_input`` marks the start, ``error`` the failure and the
+    ``idle`` status for that request the end. They are reported to
+    ``on_event`` in the shape of ``jupyter_server_nbmodel`` events.
+
+    Executions are followed from the moment the kernel is subscribed, so a
+    cell finishing before its registration reaches the server is still
+    reported. Only the last ``history`` unregistered executions per kernel
+    are remembered.
+    """
+
+    def __init__(
+        self,
+        kernel_manager: Any,
+        on_event: Callable[[Dict[str, Any]], None],
+        history: int = 256,
+        log: Any = None,
+    ) -> None:
+        self.kernel_manager = kernel_manager
+        self.on_event = on_event
+        self.history = history
+        self.log = log
+        self._streams: Dict[str, Any] = {}
+        # kernel_id -> {msg_id: execution} for registered cells
+        self._watched: Dict[str, Dict[str, _Execution]] = {}
+        # kernel_id -> recent executions not registered (yet)
+        self._recent: Dict[str, "OrderedDict[str, _Execution]"] = {}
+
+    def attach(self, kernel_id: str) -> None:
+        """Subscribe to the iopub channel of a kernel."""
+        if kernel_id in self._streams:
+            return
+        try:
+            stream = self.kernel_manager.get_kernel(kernel_id).connect_iopub()
+        except Exception as exc:
+            self.log.warning(f"Cannot subscribe to kernel {kernel_id}: {exc}")
+            return
+        stream.on_recv(lambda frames: self.feed(kernel_id, frames))
+        self._streams[kernel_id] = stream
+
+    def detach(self, kernel_id: str, reason: Optional[str] = None) -> None:
+        """
+        Unsubscribe from a kernel.
+
+        Args:
+            kernel_id: The kernel to stop following.
+            reason: If given, registered executions still running are reported
+                as failed with this error, e.g. when the kernel shuts down.
+        """
+        stream = self._streams.pop(kernel_id, None)
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception as exc:
+                self.log.debug(f"Error closing iopub stream of {kernel_id}: {exc}")
+        self._recent.pop(kernel_id, None)
+        watched = self._watched.pop(kernel_id, {})
+        if reason is None:
+            return
+        for execution in watched.values():
+            execution.error = execution.error or reason
+            self._emit_end(execution)
+
+    def close(self) -> None:
+        """Unsubscribe from all kernels."""
+        for kernel_id in list(self._streams):
+            self.detach(kernel_id)
+
+    def watch(self, kernel_id: str, msg_id: str, cell_id: str) -> None:
+        """
+        Follow the execution of a cell.
+
+        Args:
+            kernel_id: The kernel the cell was sent to.
+            msg_id: The msg_id of the cell's execute_request.
+            cell_id: The cell reported in the emitted events.
+        """
+        self.attach(kernel_id)
+        execution = self._recent.get(kernel_id, {}).pop(msg_id, None)
+        if execution is None:
+            execution = _Execution()
+        execution.cell_id = cell_id
+        if execution.started is not None:
+            self._emit_start(execution)
+        if execution.ended is not None:
+            self._emit_end(execution)
+            return
+        self._watched.setdefault(kernel_id, {})[msg_id] = execution
+
+    def unwatch(self, msg_id: str, kernel_id: Optional[str] = None) -> None:
+        """Stop following an execution, e.g. once the browser reported it."""
+        kernel_ids = [kernel_id] if kernel_id else list(self._watched)
+        for kid in kernel_ids:
+            self._watched.get(kid, {}).pop(msg_id, None)
+
+    def feed(self, kernel_id: str, frames: List[bytes]) -> None:
+        """
+        Process one iopub message given as raw ZMQ frames.
+
+        Args:
+            kernel_id: The kernel that published the message.
+            frames: The frames as received: identities, delimiter, signature,
+                header, parent header, metadata, content and buffers.
+        """
+        try:
+            index = frames.index(_DELIM)
+            header_frame = frames[index + 2]
+            if not _RELEVANT_HEADER.search(header_frame):
+                return
+            header = json.loads(header_frame)
+            parent_id = json.loads(frames[index + 3]).get("msg_id")
+            if not parent_id:
+                return
+            msg_type = header["msg_type"]
+            execution = self._watched.get(kernel_id, {}).get(parent_id)
+            if execution is None:
+                execution = self._recent.get(kernel_id, {}).get(parent_id)
+            if execution is None and msg_type != "execute_input":
+                return
+            content = json.loads(frames[index + 5])
+        except (ValueError, IndexError, KeyError, AttributeError) as exc:
+            self.log.debug(f"Skipping malformed iopub message from {kernel_id}: {exc}")
+            return
+
+        if msg_type == "execute_input":
+            if execution is None:
+                execution = self._remember(kernel_id, parent_id)
+            execution.started = _timestamp(header)
+            execution.execution_count = content.get("execution_count")
+            if execution.cell_id is not None:
+                self._emit_start(execution)
+        elif msg_type == "error":
+            execution.error = f"{content.get('ename')}: {content.get('evalue')}"
+        elif content.get("execution_state") == "idle":
+            execution.ended = _timestamp(header)
+            if execution.cell_id is not None:
+                self._watched[kernel_id].pop(parent_id, None)
+                self._emit_end(execution)
+
+    async def kernel_action_listener(
+        self, logger: Any, schema_id: str, data: dict
+    ) -> None:
+        """Follow kernels as they are started, restarted and shut down."""
+        kernel_id = data.get("kernel_id")
+        if not kernel_id or data.get("status") != "success":
+            return
+        action = data.get("action")
+        if action == "start":
+            self.attach(kernel_id)
+        elif action == "restart":
+            self.detach(kernel_id, reason="The kernel was restarted")
+            self.attach(kernel_id)
+        elif action == "shutdown":
+            self.detach(kernel_id, reason="The kernel was shut down")
+
+    def _remember(self, kernel_id: str, msg_id: str) -> _Execution:
+        recent = self._recent.setdefault(kernel_id, OrderedDict())
+        execution = recent[msg_id] = _Execution()
+        if len(recent) > self.history:
+            recent.popitem(last=False)
+        return execution
+
+    def _emit_start(self, execution: _Execution) -> None:
+        self._emit(
+            {
+                "event_type": "execution_start",
+                "cell_id": execution.cell_id,
+                "execution_count": execution.execution_count,
+                "timestamp": execution.started,
+            }
+        )
+
+    def _emit_end(self, execution: _Execution) -> None:
+        self._emit(
+            {
+                "event_type": "execution_end",
+                "cell_id": execution.cell_id,
+                "success": execution.error is None,
+                "kernel_error": execution.error,
+                "timestamp": execution.ended,
+            }
+        )
+
+    def _emit(self, data: Dict[str, Any]) -> None:
+        try:
+            self.on_event(data)
+        except Exception as exc:
+            self.log.error(f"Error handling kernel event: {exc}")
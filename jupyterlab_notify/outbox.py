@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import uuid
+from dataclasses import dataclass, field
+from time import time
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class OutboxEntry:
+    id: str
+    message: str
+    channels: List[str]
+    created: float
+    delivered: List[str] = field(default_factory=list)
+    recipients: Optional[Dict[str, Optional[List[str]]]] = None
+    notebook: Optional[str] = None
+
+    @property
+    def remaining(self) -> List[str]:
+        return [c for c in self.channels if c not in self.delivered]
+
+
+class Outbox:
+    """
+    Append-only journal of notifications awaiting delivery.
+
+    A notification is journaled before the delivery attempt and every channel
+    that succeeds is acknowledged afterwards, so anything still pending after a
+    crash or shutdown can be replayed. Acknowledged entries are dropped by
+    rewriting the file once enough of them have accumulated.
+    """
+
+    def __init__(
+        self, path: str, compact_threshold: int = 500, log: Any = None
+    ) -> None:
+        self.path = path
+        self.compact_threshold = compact_threshold
+        self.log = log
+        self._entries: Dict[str, OutboxEntry] = {}
+        self._completed = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._load()
+
+    def put(
+        self,
+        message: str,
+        channels: List[str],
+        recipients: Optional[Dict[str, Optional[List[str]]]] = None,
+        notebook: Optional[str] = None,
+    ) -> str:
+        """Journal a notification and return its entry ID."""
+        entry = OutboxEntry(
+            id=uuid.uuid4().hex,
+            message=message,
+            channels=channels,
+            created=time(),
+            recipients=recipients,
+            notebook=notebook,
+        )
+        with self._lock:
+            self._entries[entry.id] = entry
+            self._append(self._put_record(entry))
+        return entry.id
+
+    def ack(self, entry_id: str, channel: str) -> None:
+        """Record that the notification was delivered on a channel."""
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                return
+            self._append({"op": "ack", "id": entry_id, "channel": channel})
+            entry.delivered.append(channel)
+            if not entry.remaining:
+                self._complete(entry_id)
+
+    def discard(self, entry_id: str) -> None:
+        """Drop a notification without delivering it."""
+        with self._lock:
+            if entry_id in self._entries:
+                self._append({"op": "done", "id": entry_id})
+                self._complete(entry_id)
+
+    def __contains__(self, entry_id: object) -> bool:
+        with self._lock:
+            return entry_id in self._entries
+
+    def pending(self) -> List[OutboxEntry]:
+        """Return entries with channels still awaiting delivery, oldest first."""
+        with self._lock:
+            return sorted(self._entries.values(), key=lambda e: e.created)
+
+    def compact(self) -> None:
+        """Rewrite the journal with only the pending entries."""
+        with self._lock:
+            self._compact()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def _complete(self, entry_id: str) -> None:
+        del self._entries[entry_id]
+        self._completed += 1
+        if self._completed >= self.compact_threshold:
+            self._compact()
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+        except OSError as exc:
+            self.log.error(f"Failed to write notification outbox: {exc}")
+
+    def _compact(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as tmp:
+                for entry in self._entries.values():
+                    record = self._put_record(entry)
+                    record["channels"] = entry.remaining
+                    tmp.write(json.dumps(record) + "\n")
+            if self._file:
+                self._file.close()
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            self.log.error(f"Failed to compact notification outbox: {exc}")
+        finally:
+            self._file = open(self.path, "a")
+            self._completed = 0
+        for entry in self._entries.values():
+            entry.channels = entry.remaining
+            entry.delivered = []
+
+    def _put_record(self, entry: OutboxEntry) -> Dict[str, Any]:
+        record = {
+            "op": "put",
+            "id": entry.id,
+            "message": entry.message,
+            "channels": entry.channels,
+            "created": entry.created,
+        }
+        if entry.recipients:
+            record["recipients"] = entry.recipients
+        if entry.notebook:
+            record["notebook"] = entry.notebook
+        return record
+
+    def _load(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            if os.path.exists(self.path):
+                with open(self.path) as journal:
+                    for line in journal:
+                        self._replay_record(line)
+        except OSError as exc:
+            self.log.error(f"Failed to read notification outbox: {exc}")
+
+        with self._lock:
+            # Start every session from a compact journal.
+            self._compact()
+
+    def _replay_record(self, line: str) -> None:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            # A torn write from a crash; skip it.
+            return
+
+        op = record.get("op")
+        entry_id = record.get("id")
+        if op == "put":
+            self._entries[entry_id] = OutboxEntry(
+                id=entry_id,
+                message=record["message"],
+                channels=list(record["channels"]),
+                created=record.get("created", time()),
+                recipients=record.get("recipients"),
+                notebook=record.get("notebook"),
+            )
+        elif op == "ack" and entry_id in self._entries:
+            entry = self._entries[entry_id]
+            entry.delivered.append(record["channel"])
+            if not entry.remaining:
+                del self._entries[entry_id]
+        elif op == "done":
+            self._entries.pop(entry_id, None)
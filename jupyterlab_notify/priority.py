@@ -0,0 +1,215 @@
+import heapq
+import itertools
+import json
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from prometheus_client import Counter
+
+    SHED_NOTIFICATIONS: Any = Counter(
+        "jupyterlab_notify_shed_notifications",
+        "Notifications folded into a digest because the delivery queue was full",
+        ["priority"],
+    )
+except ImportError:
+    SHED_NOTIFICATIONS = None
+
+# Delivery priorities, most urgent first
+PRIORITY_FAILURE = 0
+PRIORITY_TIMEOUT = 1
+PRIORITY_SUCCESS = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_FAILURE: "failure",
+    PRIORITY_TIMEOUT: "timeout",
+    PRIORITY_SUCCESS: "success",
+}
+
+# Delivery outcome of a channel whose notification was folded into a digest
+DEFERRED = "deferred"
+
+# Lines of each folded notification listed in a digest
+_DIGEST_LISTED = 20
+
+
+def delivery_priority(status: str) -> int:
+    """
+    Return the delivery priority of a notification status.
+
+    Failures, including cells whose kernel died, come first, then timeouts
+    and resource alerts, then successes.
+    """
+    if status == "Failed":
+        return PRIORITY_FAILURE
+    if status in ("Timeout", "Resource Limit Exceeded"):
+        return PRIORITY_TIMEOUT
+    return PRIORITY_SUCCESS
+
+
+def delivery_decision(results: Dict[str, Any]) -> str:
+    """
+    Return the history decision of a delivery: "deferred" if the notification
+    was folded into a digest, otherwise "sent".
+    """
+    return "deferred" if DEFERRED in results.values() else "sent"
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    shed: bool = field(default=False, compare=False)
+
+
+class PriorityGate:
+    """
+    Admits at most ``slots`` deliveries at once, the most urgent first.
+
+    Deliveries of the same priority are admitted in arrival order. At most
+    ``max_waiting`` deliveries wait for a slot; when another one arrives, the
+    least urgent and most recent of them all is shed, and counted in ``shed``
+    by priority. Safe to use from any thread.
+    """
+
+    def __init__(self, slots: int = 8, max_waiting: int = 64) -> None:
+        self.slots = max(slots, 1)
+        self.max_waiting = max(max_waiting, 0)
+        self.shed = {priority: 0 for priority in PRIORITY_NAMES}
+        self._active = 0
+        self._waiting: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    @property
+    def idle(self) -> bool:
+        """Whether no delivery is waiting for a slot."""
+        with self._cond:
+            return not self._waiting
+
+    @contextmanager
+    def slot(self, priority: int) -> Iterator[bool]:
+        """
+        Hold a slot for the duration of a delivery; blocking.
+
+        Yields:
+            True once a slot is held, or False if the delivery was shed.
+        """
+        admitted = self._acquire(priority)
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                with self._cond:
+                    self._active -= 1
+                    self._cond.notify_all()
+
+    def _acquire(self, priority: int) -> bool:
+        with self._cond:
+            if self._active < self.slots and not self._waiting:
+                self._active += 1
+                return True
+
+            waiter = _Waiter(priority, next(self._seq))
+            if len(self._waiting) >= self.max_waiting:
+                worst = max(self._waiting, default=None)
+                if worst is None or worst.priority <= priority:
+                    self._count_shed(priority)
+                    return False
+                self._waiting.remove(worst)
+                heapq.heapify(self._waiting)
+                worst.shed = True
+                self._cond.notify_all()
+            heapq.heappush(self._waiting, waiter)
+
+            while True:
+                if waiter.shed:
+                    self._count_shed(priority)
+                    return False
+                if self._active < self.slots and self._waiting[0] is waiter:
+                    heapq.heappop(self._waiting)
+                    self._active += 1
+                    # The next waiter may fit in another free slot.
+                    self._cond.notify_all()
+                    return True
+                self._cond.wait()
+
+    def _count_shed(self, priority: int) -> None:
+        self.shed[priority] += 1
+        if SHED_NOTIFICATIONS is not None:
+            SHED_NOTIFICATIONS.labels(PRIORITY_NAMES[priority]).inc()
+
+
+@dataclass
+class _Digest:
+    channels: List[str]
+    recipients: Optional[Dict[str, Optional[List[str]]]]
+    summaries: List[str] = field(default_factory=list)
+    entry_ids: List[str] = field(default_factory=list)
+    count: int = 0
+
+
+class DigestBuffer:
+    """
+    Notifications shed by the PriorityGate, folded by destination.
+
+    Each destination, i.e. set of channels and recipients, gets one digest
+    listing the first lines of its notifications. The outbox entries of the
+    folded notifications are acknowledged once the digest is delivered.
+    """
+
+    def __init__(self) -> None:
+        self._digests: Dict[str, _Digest] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(digest.count for digest in self._digests.values())
+
+    def fold(
+        self,
+        message: str,
+        channels: List[str],
+        recipients: Optional[Dict[str, Optional[List[str]]]] = None,
+        entry_id: Optional[str] = None,
+    ) -> None:
+        """Add a notification to the digest of its destination."""
+        key = json.dumps([channels, recipients], sort_keys=True)
+        with self._lock:
+            digest = self._digests.get(key)
+            if digest is None:
+                digest = self._digests[key] = _Digest(list(channels), recipients)
+            digest.count += 1
+            if len(digest.summaries) < _DIGEST_LISTED:
+                digest.summaries.append(" | ".join(message.splitlines()[:3]))
+            if entry_id is not None:
+                digest.entry_ids.append(entry_id)
+
+    def pop_all(
+        self,
+    ) -> List[
+        Tuple[str, List[str], Optional[Dict[str, Optional[List[str]]]], List[str]]
+    ]:
+        """
+        Take the pending digests.
+
+        Returns:
+            (message, channels, recipients, folded outbox entry IDs) tuples.
+        """
+        with self._lock:
+            digests, self._digests = list(self._digests.values()), {}
+        result = []
+        for digest in digests:
+            lines = [
+                f"{digest.count} notification{'s' if digest.count != 1 else ''} "
+                "held back during a burst:"
+            ]
+            lines.extend(f"- {summary}" for summary in digest.summaries)
+            if digest.count > len(digest.summaries):
+                lines.append(f"... and {digest.count - len(digest.summaries)} more")
+            result.append(
+                ("\n".join(lines), digest.channels, digest.recipients, digest.entry_ids)
+            )
+        return result
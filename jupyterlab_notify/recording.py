@@ -0,0 +1,52 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class EventRecorder:
+    """
+    Append what drives the notification pipeline to a JSONL file.
+
+    Each line is ``{"t": <epoch seconds>, "kind": ..., "data": ...}`` where
+    kind is ``register``, ``cancel`` or ``trigger`` for browser requests,
+    ``event`` for nbmodel and kernel tap events and ``timeout`` for expired
+    timeouts. When no path is set, ``record`` returns immediately.
+    """
+
+    def __init__(self, path: Optional[str] = None, log: Any = None) -> None:
+        self.path = path
+        self.log = log
+        self._file: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def record(self, kind: str, data: Dict[str, Any]) -> None:
+        """Append a record; safe to call from any thread."""
+        if not self.path:
+            return
+        line = json.dumps(
+            {"t": round(time.time(), 6), "kind": kind, "data": data},
+            separators=(",", ":"),
+            default=str,
+        )
+        with self._lock:
+            try:
+                if self._file is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write(line + "\n")
+                self._file.flush()
+            except OSError as exc:
+                self.log.error(f"Failed to record notification event: {exc}")
+
+    def close(self) -> None:
+        """Close the recording file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,183 @@
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from dataclasses import fields
+from time import time
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from .config import NotificationParams, notification_params_from_dict
+
+# Runtime-only state that cannot be serialized.
+_TRANSIENT_FIELDS = {"timer", "trace"}
+
+
+def params_to_dict(params: NotificationParams) -> Dict[str, Any]:
+    """Convert NotificationParams to a JSON-serializable dict."""
+    return {
+        f.name: getattr(params, f.name)
+        for f in fields(NotificationParams)
+        if f.name not in _TRANSIENT_FIELDS
+    }
+
+
+class NotificationRegistry(MutableMapping):
+    """
+    Registry of pending notifications keyed by cell ID.
+
+    Behaves like a dict. When a path is given, entries are mirrored to a
+    SQLite database in WAL mode so that they survive server restarts. Changes
+    are collected and written in a single transaction once per IOLoop tick.
+    """
+
+    def __init__(
+        self, path: Optional[str] = None, io_loop: Any = None, log: Any = None
+    ) -> None:
+        self.path = path
+        self.io_loop = io_loop
+        self.log = log
+        self._entries: Dict[str, NotificationParams] = {}
+        self._dirty: Set[str] = set()
+        self._flush_scheduled = False
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            self._open(path)
+
+    def __getitem__(self, cell_id: str) -> NotificationParams:
+        return self._entries[cell_id]
+
+    def __setitem__(self, cell_id: str, params: NotificationParams) -> None:
+        self._entries[cell_id] = params
+        self.touch(cell_id)
+
+    def __delitem__(self, cell_id: str) -> None:
+        del self._entries[cell_id]
+        self.touch(cell_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def touch(self, cell_id: str) -> None:
+        """Mark an entry as changed so it is written on the next flush."""
+        if self._conn is None:
+            return
+        with self._lock:
+            self._dirty.add(cell_id)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = self.io_loop is not None
+        if self.io_loop is not None:
+            # add_callback is safe to call from timer threads.
+            self.io_loop.add_callback(self.flush)
+        else:
+            self.flush()
+
+    def load(self, max_age: Optional[float] = None) -> List[NotificationParams]:
+        """
+        Load persisted entries into the registry and return them.
+
+        Args:
+            max_age: Entries without a kernel ID that were last written more
+                than this many seconds ago are deleted instead of loaded, since
+                no kernel can report their completion. None keeps them all.
+        """
+        if self._conn is None:
+            return []
+
+        with self._lock:
+            rows = self._conn.execute("SELECT params, updated FROM pending").fetchall()
+
+        restored = []
+        expired = []
+        now = time()
+        for data, updated in rows:
+            try:
+                params = notification_params_from_dict(json.loads(data))
+            except (TypeError, ValueError) as exc:
+                self.log.error(f"Skipping unreadable registry entry: {exc}")
+                continue
+            if (
+                max_age is not None
+                and params.kernel_id is None
+                and now - updated > max_age
+            ):
+                expired.append((params.cell_id,))
+                continue
+            self._entries[params.cell_id] = params
+            restored.append(params)
+
+        if expired:
+            self.log.info(f"Dropping {len(expired)} expired pending notification(s).")
+            with self._lock:
+                try:
+                    with self._conn:
+                        self._conn.executemany(
+                            "DELETE FROM pending WHERE cell_id = ?", expired
+                        )
+                except sqlite3.Error as exc:
+                    self.log.error(f"Failed to persist notification registry: {exc}")
+        return restored
+
+    def flush(self) -> None:
+        """Write all pending changes in a single transaction."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            self._flush_scheduled = False
+            if self._conn is None or not dirty:
+                return
+
+            upserts = []
+            deletes = []
+            for cell_id in dirty:
+                params = self._entries.get(cell_id)
+                if params is None:
+                    deletes.append((cell_id,))
+                else:
+                    upserts.append(
+                        (cell_id, json.dumps(params_to_dict(params)), time())
+                    )
+
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "DELETE FROM pending WHERE cell_id = ?", deletes
+                    )
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO pending (cell_id, params, updated) "
+                        "VALUES (?, ?, ?)",
+                        upserts,
+                    )
+            except sqlite3.Error as exc:
+                self.log.error(f"Failed to persist notification registry: {exc}")
+
+    def close(self) -> None:
+        """Flush outstanding changes and close the database."""
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _open(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pending ("
+                "cell_id TEXT PRIMARY KEY, params TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+            conn.commit()
+        except (OSError, sqlite3.Error) as exc:
+            self.log.error(
+                f"Failed to open notification registry at {path}; "
+                f"pending notifications will not survive restarts: {exc}"
+            )
+            return
+        self._conn = conn
@@ -0,0 +1,83 @@
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tornado.ioloop import PeriodicCallback
+
+try:
+    from prometheus_client import Gauge
+
+    CONFIG_GENERATION: Any = Gauge(
+        "jupyterlab_notify_config_generation",
+        "Generation of the notification configuration in use; "
+        "incremented by every successful reload",
+    )
+except ImportError:
+    CONFIG_GENERATION = None
+
+# (modification time, size) of each watched file, None while it does not exist
+_Snapshot = Dict[str, Optional[Tuple[float, int]]]
+
+
+class ConfigWatcher:
+    """
+    Poll configuration files for changes and report them once they settle.
+
+    Every ``interval`` seconds the files are stat'ed; a file that is created,
+    deleted or rewritten is reported after it has not changed again for
+    ``debounce`` seconds, so that an editor saving a file in several steps
+    triggers a single reload.
+    """
+
+    def __init__(
+        self,
+        paths: List[str],
+        on_change: Callable[[], Any],
+        interval: float = 2.0,
+        debounce: float = 1.0,
+        log: Any = None,
+    ) -> None:
+        self.paths = paths
+        self.on_change = on_change
+        self.interval = interval
+        self.debounce = debounce
+        self.log = log
+        self._snapshot = self._stat()
+        self._changed_at: Optional[float] = None
+        self._callback: Optional[PeriodicCallback] = None
+
+    def start(self) -> None:
+        """Start polling on the current IOLoop."""
+        if self._callback is None:
+            self._callback = PeriodicCallback(self.poll, self.interval * 1000)
+            self._callback.start()
+
+    def stop(self) -> None:
+        """Stop polling."""
+        if self._callback is not None:
+            self._callback.stop()
+            self._callback = None
+
+    def poll(self) -> None:
+        """Check the files once and report a change that has settled."""
+        snapshot = self._stat()
+        now = time.monotonic()
+        if snapshot != self._snapshot:
+            self._snapshot = snapshot
+            self._changed_at = now
+            return
+        if self._changed_at is not None and now - self._changed_at >= self.debounce:
+            self._changed_at = None
+            self.log.info("Notification config files changed; reloading.")
+            self.on_change()
+
+    def _stat(self) -> _Snapshot:
+        snapshot: _Snapshot = {}
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                snapshot[path] = None
+            else:
+                snapshot[path] = (stat.st_mtime, stat.st_size)
+        return snapshot
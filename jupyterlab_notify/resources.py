@@ -0,0 +1,185 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from tornado.ioloop import PeriodicCallback
+
+from .config import NotificationParams
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+_BYTES_PER_MB = 1024 * 1024
+
+
+class ResourceSampler:
+    """
+    Poll memory and CPU usage of the kernels running watched cells.
+
+    A single periodic callback samples every kernel that has at least one
+    watched cell, so the polling cost grows with the number of busy kernels
+    rather than with the number of registered cells. The callback only runs
+    while something is being watched.
+    """
+
+    def __init__(
+        self,
+        kernel_manager: Any,
+        on_exceeded: Callable[[NotificationParams, str], None],
+        interval: float = 5.0,
+        memory_threshold: Optional[float] = None,
+        cpu_threshold: Optional[float] = None,
+        log: Any = None,
+    ) -> None:
+        self.kernel_manager = kernel_manager
+        self.on_exceeded = on_exceeded
+        self.interval = interval
+        self.memory_threshold = memory_threshold
+        self.cpu_threshold = cpu_threshold
+        self.log = log
+        # kernel_id -> {cell_id: params}
+        self._watched: Dict[str, Dict[str, NotificationParams]] = {}
+        # Process handles are cached so cpu_percent() measures the interval
+        # between two consecutive samples.
+        self._processes: Dict[int, Any] = {}
+        self._callback: Optional[PeriodicCallback] = None
+
+    @property
+    def available(self) -> bool:
+        """Whether resource sampling is supported (requires psutil)."""
+        return psutil is not None
+
+    def watch(self, params: NotificationParams) -> None:
+        """Start sampling the kernel running the given cell."""
+        if not self.available:
+            self.log.warning(
+                "psutil is not installed; resource-threshold notifications are disabled."
+            )
+            return
+        if not params.kernel_id:
+            self.log.debug(
+                f"No kernel_id for cell_id {params.cell_id}; skipping resource sampling."
+            )
+            return
+        self._watched.setdefault(params.kernel_id, {})[params.cell_id] = params
+        self._ensure_running()
+
+    def unwatch(self, cell_id: str, kernel_id: Optional[str] = None) -> None:
+        """Stop sampling for the given cell."""
+        kernel_ids = [kernel_id] if kernel_id else list(self._watched)
+        for kid in kernel_ids:
+            cells = self._watched.get(kid)
+            if cells and cells.pop(cell_id, None) is not None and not cells:
+                del self._watched[kid]
+        if not self._watched:
+            self.stop()
+
+    def stop(self) -> None:
+        """Stop the periodic callback and forget cached process handles."""
+        if self._callback:
+            self._callback.stop()
+            self._callback = None
+        self._processes.clear()
+
+    def sample(self) -> None:
+        """Sample every watched kernel once and fire alerts for exceeded thresholds."""
+        for kernel_id, cells in list(self._watched.items()):
+            usage = self.measure(kernel_id)
+            if usage is None:
+                # The kernel is gone; its cells will be reported by the completion path.
+                self._watched.pop(kernel_id, None)
+                continue
+
+            rss_mb, cpu_percent = usage
+            for cell_id, params in list(cells.items()):
+                reason = self._exceeded(params, rss_mb, cpu_percent)
+                if not reason:
+                    continue
+                # Alert once per cell execution.
+                del cells[cell_id]
+                try:
+                    self.on_exceeded(params, reason)
+                except Exception as exc:
+                    self.log.error(f"Error sending resource notification: {exc}")
+            if not cells:
+                self._watched.pop(kernel_id, None)
+
+        if not self._watched:
+            self.stop()
+
+    def measure(self, kernel_id: str) -> Optional[Tuple[float, float]]:
+        """
+        Measure the kernel process tree.
+
+        Returns:
+            Tuple of (resident memory in MB, CPU percent), or None if the kernel
+            process cannot be found.
+        """
+        pid = self._kernel_pid(kernel_id)
+        if pid is None:
+            return None
+
+        try:
+            root = self._process(pid)
+            processes = [root] + [
+                self._process(child.pid) for child in root.children(recursive=True)
+            ]
+        except psutil.Error:
+            self._processes.pop(pid, None)
+            return None
+
+        rss = 0
+        cpu = 0.0
+        for process in processes:
+            try:
+                rss += process.memory_info().rss
+                cpu += process.cpu_percent(interval=None)
+            except psutil.Error:
+                self._processes.pop(process.pid, None)
+        return rss / _BYTES_PER_MB, cpu
+
+    def _exceeded(
+        self, params: NotificationParams, rss_mb: float, cpu_percent: float
+    ) -> Optional[str]:
+        memory_threshold = (
+            params.memory_threshold
+            if params.memory_threshold is not None
+            else self.memory_threshold
+        )
+        cpu_threshold = (
+            params.cpu_threshold
+            if params.cpu_threshold is not None
+            else self.cpu_threshold
+        )
+        if memory_threshold is not None and rss_mb > memory_threshold:
+            return (
+                f"Kernel memory usage {rss_mb:.0f} MB exceeded "
+                f"the threshold of {memory_threshold:.0f} MB"
+            )
+        if cpu_threshold is not None and cpu_percent > cpu_threshold:
+            return (
+                f"Kernel CPU usage {cpu_percent:.0f}% exceeded "
+                f"the threshold of {cpu_threshold:.0f}%"
+            )
+        return None
+
+    def _kernel_pid(self, kernel_id: str) -> Optional[int]:
+        try:
+            kernel = self.kernel_manager.get_kernel(kernel_id)
+        except KeyError:
+            return None
+        provisioner = getattr(kernel, "provisioner", None)
+        return getattr(provisioner, "pid", None)
+
+    def _process(self, pid: int) -> Any:
+        process = self._processes.get(pid)
+        if process is None:
+            process = self._processes[pid] = psutil.Process(pid)
+            # Prime the CPU counter; the first call always reports 0.0.
+            process.cpu_percent(interval=None)
+        return process
+
+    def _ensure_running(self) -> None:
+        if self._callback is None:
+            self._callback = PeriodicCallback(self.sample, self.interval * 1000)
+            self._callback.start()
@@ -0,0 +1,152 @@
+from fnmatch import fnmatch
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import NotificationParams
+
+# Rule keys holding recipients, by the channel they address.
+_RECIPIENT_KEYS = {
+    "email": "email",
+    "slack_users": "slack",
+    "slack_channels": "slack",
+    "webhook_urls": "webhook",
+}
+
+
+def _slack_channel(name: str) -> str:
+    return name if name.startswith("#") else f"#{name}"
+
+
+def _add(recipients: Dict[str, List[str]], channel: str, values: Any) -> None:
+    if isinstance(values, str):
+        values = [values]
+    targets = recipients.setdefault(channel, [])
+    for value in values or []:
+        if value and value not in targets:
+            targets.append(value)
+
+
+def _default_recipients(config: Any) -> Dict[str, Optional[str]]:
+    return {
+        "email": config.email,
+        "slack": config.slack_user_id
+        or (config.slack_channel_name and _slack_channel(config.slack_channel_name)),
+    }
+
+
+def matching_rules(
+    rules: List[Dict[str, Any]], params: NotificationParams
+) -> List[Dict[str, Any]]:
+    """Return the routing rules whose notebook pattern matches the notebook."""
+    return _rules_for_path(rules, params.notebook_path or params.notebook_name)
+
+
+def _rules_for_path(
+    rules: List[Dict[str, Any]], path: Optional[str]
+) -> List[Dict[str, Any]]:
+    if not path:
+        return []
+    return [rule for rule in rules if fnmatch(path, rule.get("notebook", "*"))]
+
+
+def _configured_recipients(config: Any) -> Dict[str, List[str]]:
+    extra: Dict[str, List[str]] = {}
+    _add(extra, "email", config.email_recipients)
+    _add(extra, "slack", config.slack_user_ids)
+    _add(extra, "slack", [_slack_channel(c) for c in config.slack_channel_names])
+    return extra
+
+
+def _apply_rules(
+    rules: List[Dict[str, Any]], channels: List[str], extra: Dict[str, List[str]]
+) -> None:
+    for rule in rules:
+        for channel in rule.get("channels", []):
+            if channel not in channels:
+                channels.append(channel)
+        for key, channel in _RECIPIENT_KEYS.items():
+            values = rule.get(key)
+            if key == "slack_channels" and values:
+                values = [_slack_channel(c) for c in values]
+            _add(extra, channel, values)
+
+
+def resolve_recipients(
+    config: Any, params: NotificationParams, channels: List[str]
+) -> Tuple[List[str], Dict[str, Optional[List[str]]]]:
+    """
+    Work out every channel and recipient a notification goes to.
+
+    The configured single recipients (``email``, ``slack_user_id`` or
+    ``slack_channel_name``) are always included, followed by the configured
+    recipient lists and those of the routing rules matching the notebook path.
+    Rules may also add channels the user did not select.
+
+    Args:
+        config: The NotificationConfig.
+        params: Notification parameters of the cell.
+        channels: Channels selected for the notification.
+
+    Returns:
+        Tuple of (channels, recipients by channel). A channel maps to None
+        when only its default recipient applies, so backends can keep their
+        single-recipient path.
+    """
+    return _resolve(config, params.notebook_path or params.notebook_name, channels)
+
+
+def _resolve(
+    config: Any, notebook: Optional[str], channels: List[str]
+) -> Tuple[List[str], Dict[str, Optional[List[str]]]]:
+    channels = list(channels)
+    extra = _configured_recipients(config)
+    _apply_rules(_rules_for_path(config.routing_rules, notebook), channels, extra)
+
+    defaults = _default_recipients(config)
+    recipients: Dict[str, Optional[List[str]]] = {}
+    for channel in channels:
+        targets = extra.get(channel)
+        if not targets:
+            recipients[channel] = None
+            continue
+        default = defaults.get(channel)
+        recipients[channel] = ([default] if default else []) + [
+            t for t in targets if t != default
+        ]
+    return channels, recipients
+
+
+def gateway_recipients(
+    config: Any,
+    user_rule: Optional[Dict[str, Any]],
+    notebook: Optional[str],
+    channels: List[str],
+) -> Tuple[List[str], Dict[str, Optional[List[str]]]]:
+    """
+    Work out the recipients of a notification forwarded to a gateway.
+
+    Only the gateway's own configuration applies. For a user, that is the
+    recipients the gateway has for them and the routing rules matching the
+    notebook path; the gateway's own recipients are never added, so a
+    channel without any recipient of the user's is left out. Without a
+    user, the notification comes from the gateway's owner and is routed as
+    resolve_recipients would.
+
+    Args:
+        config: The gateway's NotificationConfig.
+        user_rule: Recipients of the forwarding user, with the keys of a
+            routing rule, or None for the gateway's owner.
+        notebook: Path of the notebook, if known.
+        channels: Channels selected for the notification.
+
+    Returns:
+        Tuple of (channels, recipients by channel).
+    """
+    if user_rule is None:
+        return _resolve(config, notebook, channels)
+    channels = list(channels)
+    extra: Dict[str, List[str]] = {}
+    _apply_rules(
+        [user_rule] + _rules_for_path(config.routing_rules, notebook), channels, extra
+    )
+    channels = [channel for channel in channels if extra.get(channel)]
+    return channels, {channel: extra[channel] for channel in channels}
@@ -0,0 +1,149 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Tuple
+
+from .config import NotificationParams
+
+
+@dataclass
+class RunState:
+    """Progress of a group of cells scheduled together, e.g. by "Run All"."""
+
+    run_id: str
+    size: int
+    params: NotificationParams
+    started: float
+    finished: int = 0
+    failed: int = 0
+    ended: Optional[float] = None
+    # Min-heap of (duration, cell label) holding the slowest cells.
+    slowest: List[Tuple[float, str]] = field(default_factory=list)
+    failure: Optional[NotificationParams] = None
+    notified: bool = False
+
+    @property
+    def done(self) -> bool:
+        return self.finished >= self.size
+
+    def slowest_cells(self) -> List[Tuple[float, str]]:
+        return sorted(self.slowest, reverse=True)
+
+
+class RunTracker:
+    """
+    Track completion of notebook runs in O(1) per cell event.
+
+    ``on_notify`` is called once per run: when its first cell fails or, if
+    none fails, when its last cell finishes. Only counters and a bounded heap
+    of the ``top_k`` slowest cells are kept per run, and the least recently
+    active runs are evicted beyond ``maxsize``, e.g. when cells of an
+    interrupted run never report completion.
+
+    A run starts when its first cell is registered, by the server's clock,
+    so that its runtime does not depend on the browser's. The start sent by
+    the browser only applies to runs first seen when a cell completes.
+    """
+
+    def __init__(
+        self,
+        on_notify: Callable[[RunState], None],
+        top_k: int = 5,
+        maxsize: int = 1024,
+        log: Any = None,
+    ) -> None:
+        self.on_notify = on_notify
+        self.top_k = top_k
+        self.maxsize = maxsize
+        self.log = log
+        self._runs: "OrderedDict[str, RunState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, run_id: str) -> bool:
+        return run_id in self._runs
+
+    def __len__(self) -> int:
+        return len(self._runs)
+
+    def add(self, params: NotificationParams) -> None:
+        """Register a cell of a run; the run is created by its first cell."""
+        with self._lock:
+            self._get_or_create(params, started=time.time())
+
+    def complete(
+        self,
+        params: NotificationParams,
+        success: bool,
+        duration: Optional[float] = None,
+    ) -> None:
+        """
+        Count a finished cell of a run.
+
+        Args:
+            params: Notification parameters of the cell, with ``run_id`` set.
+            success: Whether the cell succeeded.
+            duration: Execution time of the cell in seconds, if known.
+        """
+        notify = None
+        with self._lock:
+            run = self._get_or_create(params)
+            run.finished += 1
+            if duration is not None:
+                label = (
+                    f"Cell {params.execution_count}"
+                    if params.execution_count is not None
+                    else f"Cell id {params.cell_id}"
+                )
+                if len(run.slowest) < self.top_k:
+                    heapq.heappush(run.slowest, (duration, label))
+                elif duration > run.slowest[0][0]:
+                    heapq.heapreplace(run.slowest, (duration, label))
+            if not success:
+                run.failed += 1
+                if run.failure is None:
+                    run.failure = params
+            if run.done:
+                del self._runs[run.run_id]
+            if not run.notified and (run.done or not success):
+                run.notified = True
+                run.ended = time.time()
+                notify = run
+
+        if notify is not None:
+            try:
+                self.on_notify(notify)
+            except Exception as exc:
+                self.log.error(f"Error sending run notification: {exc}")
+
+    def _get_or_create(
+        self, params: NotificationParams, started: Optional[float] = None
+    ) -> RunState:
+        run = self._runs.get(params.run_id)
+        if run is None:
+            run = self._runs[params.run_id] = RunState(
+                run_id=params.run_id,
+                size=max(params.run_size or 1, 1),
+                params=params,
+                started=started or params.run_started or time.time(),
+            )
+            if len(self._runs) > self.maxsize:
+                self._runs.popitem(last=False)
+        else:
+            self._runs.move_to_end(params.run_id)
+        return run
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration as e.g. "1h 2m 3s"."""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    parts = []
+    if hours:
+        parts.append(f"{hours}h")
+    if hours or minutes:
+        parts.append(f"{minutes}m")
+    parts.append(f"{seconds}s")
+    return " ".join(parts)
@@ -0,0 +1,199 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import NotificationParams
+
+# Statuses whose details are posted as thread replies.
+_REPLY_STATUSES = {"Failed", "Resource Limit Exceeded"}
+
+
+@dataclass
+class RunSummary:
+    """Slack summary message of one notebook run for one destination."""
+
+    notebook_name: str
+    started: float
+    updated: float
+    counts: Dict[str, int] = field(default_factory=dict)
+    last_cell: Optional[str] = None
+    channel: Optional[str] = None
+    ts: Optional[str] = None
+    replies: List[str] = field(default_factory=list)
+    dirty: bool = False
+    timer: Optional[threading.Timer] = None
+    # Consecutive failed flushes, which back the next attempt off
+    failures: int = 0
+    flush_lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def render(self) -> str:
+        started = datetime.fromtimestamp(self.started).strftime("%H:%M:%S")
+        counts = " · ".join(
+            f"{status}: {count}" for status, count in sorted(self.counts.items())
+        )
+        lines = [f"{self.notebook_name} (run started {started})", counts]
+        if self.last_cell:
+            lines.append(f"Last: {self.last_cell}")
+        return "\n".join(lines)
+
+
+class SlackRunSummaries:
+    """
+    One Slack message per notebook run, edited in place as cells finish.
+
+    Outcomes are folded into the run's summary and the Slack API is called
+    at most once per debounce interval per run: the first flush posts the
+    summary, later ones ``chat.update`` it. Failure details collected during
+    the interval are posted together as one reply in the summary's thread.
+    A notebook's run ends once no outcome arrives for ``idle_timeout``
+    seconds; the next outcome starts a new summary message. A flush that
+    fails keeps its failure details and is tried again, after twice the
+    previous wait.
+
+    Summaries bypass the outbox, the gateway and the delivery gate: they
+    edit one live message rather than sending a new one, so a missed edit
+    is repaired by the next flush.
+    """
+
+    def __init__(
+        self,
+        get_client: Callable[[], Any],
+        resolve_channel: Callable[[Optional[str]], Optional[str]],
+        debounce: float = 2.0,
+        idle_timeout: float = 600.0,
+        log: Any = None,
+    ) -> None:
+        self.get_client = get_client
+        self.resolve_channel = resolve_channel
+        self.debounce = debounce
+        self.idle_timeout = idle_timeout
+        self.log = log
+        self._runs: Dict[Tuple[str, Optional[str]], RunSummary] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        params: NotificationParams,
+        status: str,
+        message: str,
+        target: Optional[str] = None,
+    ) -> None:
+        """
+        Fold a cell outcome into its run's summary.
+
+        Args:
+            params: Notification parameters of the cell.
+            status: Execution status, e.g. "Success" or "Failed".
+            message: Formatted notification message, posted in the thread for failures.
+            target: Slack destination, or None for the configured default.
+        """
+        notebook = params.notebook_path or params.notebook_name or "Notebook"
+        key = (notebook, target)
+        now = time.time()
+        with self._lock:
+            run = self._runs.get(key)
+            if run is None or now - run.updated > self.idle_timeout:
+                run = self._runs[key] = RunSummary(
+                    notebook_name=params.notebook_name or notebook,
+                    started=now,
+                    updated=now,
+                )
+            run.updated = now
+            run.counts[status] = run.counts.get(status, 0) + 1
+            cell = (
+                f"Cell {params.execution_count}"
+                if params.execution_count is not None
+                else f"Cell id {params.cell_id}"
+            )
+            run.last_cell = f"{cell}: {status}"
+            if status in _REPLY_STATUSES:
+                run.replies.append(message)
+            run.dirty = True
+            if run.timer is None:
+                run.timer = threading.Timer(self.debounce, self._flush, args=(key,))
+                run.timer.daemon = True
+                run.timer.start()
+        self._expire(now)
+
+    def flush_all(self) -> None:
+        """Post pending updates of every run immediately."""
+        with self._lock:
+            keys = list(self._runs)
+        for key in keys:
+            self._flush(key)
+
+    def _flush(self, key: Tuple[str, Optional[str]]) -> None:
+        with self._lock:
+            run = self._runs.get(key)
+        if run is None:
+            return
+        # The debounce timer and flush_all may flush the same run at once;
+        # only one of them may post the initial message.
+        with run.flush_lock:
+            self._flush_run(run, key)
+
+    def _flush_run(self, run: RunSummary, key: Tuple[str, Optional[str]]) -> None:
+        with self._lock:
+            if run.timer is not None:
+                run.timer.cancel()
+                run.timer = None
+            if not run.dirty:
+                return
+            run.dirty = False
+            text = run.render()
+            replies, run.replies = run.replies, []
+            channel, ts = run.channel, run.ts
+
+        client = self.get_client()
+        if client is None:
+            self.log.error("Slack client not initialized; dropping run summary.")
+            return
+        try:
+            if ts is None:
+                channel = self.resolve_channel(key[1])
+                if channel is None:
+                    self._retry(run, key, replies)
+                    return
+                response = client.chat_postMessage(channel=channel, text=text)
+                # chat.update needs the channel ID, not a "#name".
+                channel, ts = response["channel"], response["ts"]
+                with self._lock:
+                    run.channel, run.ts = channel, ts
+            else:
+                client.chat_update(channel=channel, ts=ts, text=text)
+            if replies:
+                client.chat_postMessage(
+                    channel=channel, thread_ts=ts, text="\n\n".join(replies)
+                )
+        except Exception as exc:
+            self.log.error(f"Error updating Slack run summary: {exc}")
+            self._retry(run, key, replies)
+            return
+        with self._lock:
+            run.failures = 0
+
+    def _retry(
+        self, run: RunSummary, key: Tuple[str, Optional[str]], replies: List[str]
+    ) -> None:
+        """Restore what a failed flush took and flush the run again later."""
+        with self._lock:
+            run.replies[:0] = replies
+            run.dirty = True
+            delay = min(self.debounce * 2**run.failures, self.idle_timeout)
+            run.failures = min(run.failures + 1, 16)
+            if run.timer is None:
+                run.timer = threading.Timer(delay, self._flush, args=(key,))
+                run.timer.daemon = True
+                run.timer.start()
+
+    def _expire(self, now: float) -> None:
+        with self._lock:
+            expired = [
+                key
+                for key, run in self._runs.items()
+                if not run.dirty and now - run.updated > self.idle_timeout
+            ]
+            for key in expired:
+                del self._runs[key]
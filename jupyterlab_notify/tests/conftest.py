@@ -0,0 +1,46 @@
+import pytest
+from traitlets.config import Config
+
+from jupyterlab_notify import extension
+from jupyterlab_notify.config import NotificationParams
+
+
+@pytest.fixture
+def make_params():
+    """Factory of NotificationParams; keyword arguments override the defaults."""
+
+    def make(cell_id="cell1", **overrides):
+        fields = {
+            "mode": "default",
+            "slackEnabled": False,
+            "emailEnabled": False,
+            "successMessage": "Success",
+            "failureMessage": "Failure",
+            "threshold": 0,
+            **overrides,
+        }
+        return NotificationParams(cell_id=cell_id, **fields)
+
+    return make
+
+
+@pytest.fixture
+def make_extension():
+    """
+    Factory of initialized NotifyExtension instances.
+
+    Keyword arguments are NotificationConfig options; ``config`` holds the
+    sections of other classes. Backends are closed after the test.
+    """
+    extensions = []
+
+    def make(config=None, **options):
+        ext = extension.NotifyExtension()
+        ext.update_config(Config({**(config or {}), "NotificationConfig": options}))
+        ext._init_config()
+        extensions.append(ext)
+        return ext
+
+    yield make
+    for ext in extensions:
+        ext.backends.close()
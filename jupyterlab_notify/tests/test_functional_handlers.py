@@ -1,11 +1,17 @@
 import json
 import logging
+import threading
 from unittest.mock import MagicMock
 from tornado.web import Application
-from tornado.testing import AsyncHTTPTestCase
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.websocket import websocket_connect
 from jupyter_server.auth import IdentityProvider
 from jupyterlab_notify import handlers
+from jupyterlab_notify.backends import BackendRegistry
+from jupyterlab_notify.capabilities import CapabilityMonitor
+from jupyterlab_notify.events import EventBuffer
 from jupyter_server.base.handlers import JupyterHandler
+from traitlets.config import Configurable
 
 
 def disable_xsrf(self):
@@ -26,19 +32,33 @@ class DummyConfig:  # Mock config
     def __init__(self):
         self.smtp_instance = True
 
+    def ping_smtp(self):
+        return True
 
-class DummyExtensionApp:
+
+class DummyExtensionApp(Configurable):
     def __init__(self):
+        super().__init__()
         self.is_listening = True
         self.email = "test@example.com"
         self.slack_client = MagicMock()
         self.slack_user_id = "U12345678"
         self.slack_channel_name = "general"
         self.cell_ids = {}
+        self.resource_sampler = None
+        self.kernel_tap = None
+        self.sockets = set()
+        self.smtp_lock = threading.Lock()
+        self.events = EventBuffer()
         self._config = DummyConfig()
         # Add a dummy logger
         self.log = logging.getLogger("DummyExtensionApp")
         self.log.setLevel(logging.DEBUG)
+        self.backends = BackendRegistry(self, log=self.log)
+        self.capabilities = CapabilityMonitor(self, interval=0, log=self.log)
+
+    def register_notification(self, params):
+        self.cell_ids[params.cell_id] = params
 
     def send_notification(self, params):
         self.notification_sent = True
@@ -66,8 +86,33 @@ class TestNotifyHandler(AsyncHTTPTestCase):
         self.assertEqual(response.code, 200)
         data = json.loads(response.body)
         self.assertTrue(data.get("nbmodel_installed"))
+        self.assertFalse(data.get("kernel_tap"))
         self.assertTrue(data.get("slack_configured"))
         self.assertTrue(data.get("email_configured"))
+        self.assertIn("slack", data.get("channels"))
+        self.assertIn("email", data.get("channels"))
+
+    def test_get_revalidates_with_etag(self):
+        response = self.fetch("/api/jupyter-notify/notify", method="GET")
+        etag = response.headers["ETag"]
+
+        response = self.fetch(
+            "/api/jupyter-notify/notify",
+            method="GET",
+            headers={"If-None-Match": etag},
+        )
+        self.assertEqual(response.code, 304)
+
+        self.dummy_app.slack_client.auth_test.side_effect = Exception("invalid_auth")
+        self.dummy_app.capabilities.probe()
+        response = self.fetch(
+            "/api/jupyter-notify/notify",
+            method="GET",
+            headers={"If-None-Match": etag},
+        )
+        self.assertEqual(response.code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertFalse(json.loads(response.body)["slack_configured"])
 
     def test_post_valid(self):
         payload = {
@@ -87,6 +132,12 @@ class TestNotifyHandler(AsyncHTTPTestCase):
         self.assertTrue(data.get("accepted"))
         self.assertIn("cell42", self.dummy_app.cell_ids)
 
+        response = self.fetch(
+            "/api/jupyter-notify/notify?cell_id=cell42", method="DELETE"
+        )
+        self.assertEqual(response.code, 200)
+        self.assertNotIn("cell42", self.dummy_app.cell_ids)
+
 
 class TestNotifyTriggerHandler(AsyncHTTPTestCase):
     def get_app(self):
@@ -127,3 +178,92 @@ class TestNotifyTriggerHandler(AsyncHTTPTestCase):
             hasattr(self.dummy_app, "notification_sent")
             and self.dummy_app.notification_sent
         )
+
+
+class TestNotifyEventsHandler(AsyncHTTPTestCase):
+    def get_app(self):
+        self.dummy_app = DummyExtensionApp()
+        settings = {
+            "identity_provider": DummyIdentityProvider(),
+        }
+        return Application(
+            [
+                (
+                    r"/api/jupyter-notify/events",
+                    handlers.NotifyEventsHandler,
+                    {"extension_app": self.dummy_app, "name": "test"},
+                ),
+            ],
+            **settings,
+        )
+
+    def test_get_events_after(self):
+        events = self.dummy_app.events
+        for index in range(3):
+            events.append({"type": "notification", "cell_id": f"cell{index}"})
+
+        response = self.fetch(
+            f"/api/jupyter-notify/events?after=1&epoch={events.epoch}"
+        )
+        self.assertEqual(response.code, 200)
+        data = json.loads(response.body)
+        self.assertEqual([event["seq"] for event in data["events"]], [2, 3])
+        self.assertEqual(data["seq"], 3)
+
+        # After a server restart, everything retained is replayed
+        response = self.fetch("/api/jupyter-notify/events?after=3&epoch=old")
+        self.assertEqual(len(json.loads(response.body)["events"]), 3)
+
+
+class TestNotifySocketHandler(AsyncHTTPTestCase):
+    def get_app(self):
+        self.dummy_app = DummyExtensionApp()
+        settings = {
+            "identity_provider": DummyIdentityProvider(),
+        }
+        return Application(
+            [
+                (
+                    r"/api/jupyter-notify/ws",
+                    handlers.NotifySocketHandler,
+                    {"extension_app": self.dummy_app, "name": "test"},
+                ),
+            ],
+            **settings,
+        )
+
+    @gen_test
+    async def test_requests_are_acknowledged_and_events_pushed(self):
+        url = self.get_url("/api/jupyter-notify/ws").replace("http", "ws", 1)
+        socket = await websocket_connect(url)
+        payload = {
+            "cell_id": "cell7",
+            "mode": "default",
+            "slackEnabled": True,
+            "emailEnabled": False,
+            "successMessage": "Ok",
+            "failureMessage": "Not Ok",
+            "threshold": 1,
+        }
+
+        socket.write_message(
+            json.dumps({"id": 1, "type": "register", "payload": payload})
+        )
+        ack = json.loads(await socket.read_message())
+        self.assertEqual(ack, {"type": "ack", "id": 1, "ok": True})
+        self.assertIn("cell7", self.dummy_app.cell_ids)
+
+        socket.write_message(
+            json.dumps({"id": 2, "type": "cancel", "payload": {"cell_id": "cell7"}})
+        )
+        self.assertTrue(json.loads(await socket.read_message())["ok"])
+        self.assertNotIn("cell7", self.dummy_app.cell_ids)
+
+        socket.write_message(json.dumps({"id": 3, "type": "trigger", "payload": {}}))
+        self.assertFalse(json.loads(await socket.read_message())["ok"])
+
+        (server_socket,) = self.dummy_app.sockets
+        server_socket.push({"type": "delivery", "cell_id": "cell7", "results": {}})
+        event = json.loads(await socket.read_message())
+        self.assertEqual(event["type"], "delivery")
+        socket.close()
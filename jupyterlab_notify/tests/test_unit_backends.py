@@ -0,0 +1,107 @@
+import asyncio
+import logging
+
+import pytest
+from traitlets.config import Config
+
+from jupyterlab_notify import extension
+from jupyterlab_notify.backends import BackendRegistry, NotifierBackend
+from jupyterlab_notify.config import NotificationParams
+
+
+class RecordingBackend(NotifierBackend):
+    name = "recording"
+    instances = 0
+
+    def __init__(self, app, **kwargs):
+        super().__init__(app, **kwargs)
+        RecordingBackend.instances += 1
+        self.messages = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def send(self, message, recipients=None):
+        async with self.semaphore:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+        self.messages.append(message)
+        return True
+
+
+@pytest.fixture
+def notify_extension():
+    ext = extension.NotifyExtension()
+    ext.update_config(Config({"RecordingBackend": {"max_concurrency": 2}}))
+    ext._init_config()
+    # Register the test backend as an entry point would.
+    ext.backends._sources["recording"] = f"{__name__}:RecordingBackend"
+    RecordingBackend.instances = 0
+    yield ext
+    ext.backends.close()
+
+
+def test_backends_load_lazily(notify_extension):
+    """Backends are discovered at startup but only instantiated on first use."""
+    assert "recording" in notify_extension.backends.names()
+    assert RecordingBackend.instances == 0
+
+    backend = notify_extension.backends.get("recording")
+    assert notify_extension.backends.get("recording") is backend
+    assert RecordingBackend.instances == 1
+
+
+def test_channels_list_selects_backends(notify_extension, monkeypatch):
+    """Channels listed in the params are delivered alongside the legacy flags."""
+    slack_messages = []
+    monkeypatch.setattr(
+        notify_extension, "send_slack_notification", slack_messages.append
+    )
+    params = NotificationParams(
+        cell_id="cell_channels",
+        mode="on-error",
+        slackEnabled=True,
+        emailEnabled=False,
+        successMessage="Success",
+        failureMessage="Failure",
+        threshold=0,
+        success=False,
+        channels=["recording", "pager"],
+    )
+
+    notify_extension.send_notification(params)
+
+    backend = notify_extension.backends.get("recording")
+    assert len(backend.messages) == 1
+    assert len(slack_messages) == 1
+    assert params.notification_sent
+
+
+def test_send_batch_respects_concurrency(notify_extension):
+    """send_batch fans out but never exceeds the configured concurrency."""
+    backend = notify_extension.backends.get("recording")
+    assert backend.max_concurrency == 2
+
+    results = asyncio.run(backend.send_batch([f"m{i}" for i in range(6)]))
+
+    assert results == [True] * 6
+    assert len(backend.messages) == 6
+    assert backend.peak == 2
+
+
+def test_unknown_and_failing_backends():
+    """Unknown channels are dropped; exceptions count as failed deliveries."""
+
+    class Broken(NotifierBackend):
+        async def send(self, message, recipients=None):
+            raise RuntimeError("boom")
+
+    registry = BackendRegistry(app=None, log=logging.getLogger("test"))
+    registry._sources = {"broken": "unused"}
+    registry._backends["broken"] = Broken(None)
+
+    results = registry.deliver("hello", ["broken", "missing"])
+    registry.close()
+
+    assert results == {"broken": False, "missing": True}
@@ -0,0 +1,89 @@
+import asyncio
+import smtplib
+import threading
+import time
+from unittest.mock import MagicMock
+
+
+class FakeSMTP:
+    """SMTP stand-in whose connections can be dropped."""
+
+    instances = []
+
+    def __init__(self, host):
+        self.dropped = False
+        self.closed = False
+        self.sent = []
+        FakeSMTP.instances.append(self)
+
+    def connect(self):
+        pass
+
+    def noop(self):
+        if self.dropped:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        return (250, b"OK")
+
+    def send_message(self, message):
+        if self.closed:
+            raise smtplib.SMTPServerDisconnected("please run connect() first")
+        self.sent.append(message)
+
+    def close(self):
+        self.closed = True
+
+
+def test_failed_smtp_probe_reconnects(make_extension):
+    FakeSMTP.instances = []
+    ext = make_extension(smtp_class=f"{__name__}.FakeSMTP", smtp_args=["mail"])
+    first = ext._config.smtp_instance
+    first.dropped = True
+
+    ext.capabilities.probe()
+
+    assert ext._config.smtp_instance is FakeSMTP.instances[1]
+    assert first.closed
+    assert ext.capabilities.snapshot()[1]["smtp_server_running"]
+
+
+async def test_failed_probes_back_off(make_extension):
+    ext = make_extension(capability_probe_interval=60)
+    ext.slack_client = MagicMock()
+    ext.slack_client.auth_test.side_effect = Exception("invalid_auth")
+    monitor = ext.capabilities
+
+    async def probe():
+        monitor.request_probe()
+        while monitor._probing:
+            await asyncio.sleep(0.01)
+
+    for wait in (120, 240):
+        await probe()
+        assert abs(monitor._next_probe - time.monotonic() - wait) < 1
+        monitor._next_probe = 0.0
+    await probe()
+    # Until the wait is over, clients get the last result without a new probe.
+    await probe()
+
+    assert ext.slack_client.auth_test.call_count == 3
+    assert not monitor.snapshot()[1]["slack_configured"]
+
+
+def test_send_waiting_for_a_reconnect_uses_the_new_connection(make_extension):
+    FakeSMTP.instances = []
+    ext = make_extension(smtp_class=f"{__name__}.FakeSMTP", smtp_args=["mail"])
+    ext.email = "me@example.com"
+    results = []
+
+    with ext.smtp_lock:
+        sender = threading.Thread(
+            target=lambda: results.append(ext.send_email_notification("done"))
+        )
+        sender.start()
+        time.sleep(0.05)
+        ext._config.reconnect_smtp()
+    sender.join()
+
+    assert results == [True]
+    assert FakeSMTP.instances[0].closed
+    assert len(FakeSMTP.instances[1].sent) == 1
@@ -0,0 +1,194 @@
+import json
+import smtplib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from traitlets.config import Config
+
+from jupyterlab_notify.cli import NotifyBenchApp, NotifyCheckApp
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Stand-in for the Slack Web API and a webhook endpoint."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.paths.append(self.path)
+        body = json.dumps({"ok": True, "channel": "C1", "ts": "1.0"}).encode()
+        self.send_response(self.server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInSMTP:
+    """SMTP stand-in that accepts one password."""
+
+    logins = []
+    sent = []
+
+    def __init__(self, host):
+        pass
+
+    def connect(self):
+        pass
+
+    def ehlo(self):
+        return (250, b"stand-in")
+
+    def login(self, user, password):
+        StandInSMTP.logins.append(user)
+        if password != "secret":
+            raise smtplib.SMTPAuthenticationError(535, b"bad credentials")
+
+    def send_message(self, message):
+        StandInSMTP.sent.append(message)
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def stand_in():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.paths = []
+    server.status = 200
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def stand_in_config(server, **options):
+    url = f"http://127.0.0.1:{server.server_port}"
+    return Config(
+        {
+            "NotificationConfig": {
+                "slack_token": "xoxb-test",
+                "slack_channel_name": "alerts",
+                "slack_api_url": f"{url}/api/",
+            },
+            "WebhookBackend": {"url": f"{url}/hook"},
+            **options,
+        }
+    )
+
+
+def test_check_reports_each_step(stand_in, capsys):
+    """A test notification is sent on each channel after its connection check."""
+    app = NotifyCheckApp(config=stand_in_config(stand_in))
+    app.channels = ["slack", "webhook"]
+    app.start()
+
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split()[:2] for line in lines] == [
+        ["slack", "auth"],
+        ["slack", "send"],
+        ["webhook", "connect"],
+        ["webhook", "send"],
+    ]
+    assert all(line.endswith("ok") for line in lines)
+    assert stand_in.paths == ["/api/auth.test", "/api/chat.postMessage", "/hook"]
+
+
+def test_check_logs_in_to_smtp(capsys):
+    """The email check runs the real SMTP login when credentials are configured."""
+    StandInSMTP.logins, StandInSMTP.sent = [], []
+    config = {
+        "smtp_class": f"{__name__}.StandInSMTP",
+        "smtp_username": "notify",
+        "smtp_password": "secret",
+    }
+    app = NotifyCheckApp(config=Config({"NotificationConfig": config}))
+    app.channels = ["email"]
+    app.start()
+
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split()[:2] for line in lines] == [
+        ["email", "connect"],
+        ["email", "ehlo"],
+        ["email", "login"],
+        ["email", "send"],
+    ]
+    assert all(line.endswith("ok") for line in lines)
+    # The server's connection and the check's own connection both log in.
+    assert StandInSMTP.logins == ["notify", "notify"]
+    assert len(StandInSMTP.sent) == 1
+
+    config["smtp_password"] = "wrong"
+    app = NotifyCheckApp(config=Config({"NotificationConfig": config}))
+    app.channels = ["email"]
+    with pytest.raises(SystemExit):
+        app.start()
+
+    assert capsys.readouterr().out.splitlines()[-1].split()[1:2] == ["login"]
+    assert len(StandInSMTP.sent) == 1
+
+
+def test_bench_sends_through_send_notification(stand_in, capsys):
+    """Every notification of the benchmark is delivered and counted."""
+    app = NotifyBenchApp(config=stand_in_config(stand_in))
+    app.channels = ["webhook"]
+    app.count = 20
+    app.concurrency = 4
+    app.start()
+
+    out = capsys.readouterr().out
+    assert "Sent 20 notifications on webhook with concurrency 4" in out
+    assert "webhook    20 delivered, 0 failed" in out
+    assert stand_in.paths == ["/hook"] * 20
+
+
+def test_bench_fails_on_undelivered(stand_in, capsys):
+    stand_in.status = 500
+    app = NotifyBenchApp(config=stand_in_config(stand_in))
+    app.channels = ["webhook"]
+    app.count = 3
+
+    with pytest.raises(SystemExit) as exc_info:
+        app.start()
+
+    assert exc_info.value.code == 1
+    assert "webhook    0 delivered, 3 failed" in capsys.readouterr().out
+
+
+def test_server_config_overrides_notify_config(tmp_path, monkeypatch):
+    """Config files are layered as the server layers them."""
+    (tmp_path / "jupyter_notify_config.json").write_text(
+        json.dumps(
+            {
+                "NotificationConfig": {
+                    "slack_channel_name": "notify",
+                    "email": "notify@example.com",
+                }
+            }
+        )
+    )
+    (tmp_path / "jupyter_server_config.json").write_text(
+        json.dumps(
+            {
+                "NotificationConfig": {
+                    "email": "server@example.com",
+                    "slack_user_id": "U0SERVER",
+                }
+            }
+        )
+    )
+    monkeypatch.setenv("JUPYTER_CONFIG_DIR", str(tmp_path))
+    monkeypatch.setenv("JUPYTER_CONFIG_PATH", "")
+
+    app = NotifyCheckApp()
+    app.initialize(["--NotificationConfig.slack_user_id=U0CLI"])
+
+    config = app.config.NotificationConfig
+    assert config.slack_channel_name == "notify"
+    assert config.email == "server@example.com"
+    assert config.slack_user_id == "U0CLI"
@@ -0,0 +1,20 @@
+from jupyterlab_notify.events import EventBuffer
+
+
+def test_events_after_sequence_are_replayed():
+    buffer = EventBuffer(size=3)
+    for index in range(5):
+        buffer.append({"type": "notification", "cell_id": f"cell{index}"}, "alice")
+    buffer.append({"type": "notification", "cell_id": "other"}, "bob")
+
+    events, truncated = buffer.since(3, "alice")
+    assert [event["seq"] for event in events] == [4, 5]
+    assert not truncated
+
+    # Events 2 and 3 were dropped from the buffer of 3
+    events, truncated = buffer.since(1, "alice")
+    assert [event["cell_id"] for event in events] == ["cell2", "cell3", "cell4"]
+    assert truncated
+
+    assert buffer.since(0, "bob")[0][0]["seq"] == 1
+    assert buffer.since(5, "alice") == ([], False)
@@ -0,0 +1,275 @@
+import asyncio
+import socket
+
+import pytest
+from tornado.httpserver import HTTPServer
+from tornado.netutil import bind_unix_socket
+from tornado.web import Application
+from traitlets.config import Config
+
+from jupyterlab_notify.backends import NotifierBackend
+from jupyterlab_notify.cli import NotifyGatewayApp
+from jupyterlab_notify.gateway import GATEWAY_PATH, GatewayHandler, NotificationGateway
+from jupyterlab_notify.outbox import Outbox
+
+
+class RecordingBackend(NotifierBackend):
+    name = "recording"
+    sent = []
+
+    async def send(self, message, recipients=None):
+        RecordingBackend.sent.append((message, recipients))
+        return True
+
+
+class FlakyBackend(NotifierBackend):
+    """Fails its first send, like a channel during a short outage."""
+
+    name = "flaky"
+    attempts = 0
+
+    async def send(self, message, recipients=None):
+        FlakyBackend.attempts += 1
+        return FlakyBackend.attempts > 1
+
+
+class CountingHandler(GatewayHandler):
+    posts = 0
+
+    def post(self):
+        CountingHandler.posts += 1
+        super().post()
+
+
+@pytest.fixture
+def make_extension(make_extension):
+    def make(**options):
+        ext = make_extension(**options)
+        ext.backends._sources["recording"] = f"{__name__}:RecordingBackend"
+        return ext
+
+    return make
+
+
+def serve_gateway(gateway, socket_path, tokens=None):
+    tokens = {"secret": "alice"} if tokens is None else tokens
+    server = HTTPServer(
+        Application(
+            [(GATEWAY_PATH, CountingHandler, {"gateway": gateway, "tokens": tokens})]
+        )
+    )
+    server.add_socket(bind_unix_socket(socket_path))
+    return server
+
+
+@pytest.fixture(autouse=True)
+def reset_recordings():
+    RecordingBackend.sent = []
+    FlakyBackend.attempts = 0
+    CountingHandler.posts = 0
+
+
+async def test_rate_limited_notifications_are_folded_into_a_digest(
+    tmp_path, make_extension
+):
+    """Notifications held back by the rate limit are sent as one digest."""
+    ext = make_extension()
+    ext.outbox = Outbox(str(tmp_path / "outbox.jsonl"))
+    gateway = NotificationGateway(ext, rate_limit=20, rate_burst=2)
+
+    for i in range(10):
+        gateway.accept(f"message {i}", ["recording"])
+    assert gateway.queued == 8
+    await asyncio.sleep(0.2)
+    gateway.close()
+    ext.backends.close()
+
+    messages = sorted(message for message, _ in RecordingBackend.sent)
+    assert messages[-2:] == ["message 0", "message 1"]
+    assert messages[0].startswith("8 notifications\n\nmessage 2")
+    assert gateway.stats == {
+        "accepted": 10,
+        "duplicates": 0,
+        "dropped": 0,
+        "sent": 10,
+        "digests": 1,
+        "failed": 0,
+    }
+    assert ext.outbox.pending() == []
+
+
+async def test_notifications_are_forwarded_in_batches(tmp_path, make_extension):
+    """Servers forward notifications over the gateway's Unix socket."""
+    socket_path = str(tmp_path / "gateway.sock")
+    gateway_ext = make_extension()
+    gateway_ext.backends._sources["email"] = f"{__name__}:RecordingBackend"
+    gateway = NotificationGateway(
+        gateway_ext, recipients={"alice": {"email": "alice@example.com"}}
+    )
+    server = serve_gateway(gateway, socket_path)
+    ext = make_extension(
+        gateway_url=f"unix://{socket_path}",
+        gateway_token="secret",
+        gateway_batch_window=0.05,
+    )
+
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(
+        *(
+            loop.run_in_executor(None, ext.deliver, f"message {i}", ["email"])
+            for i in range(5)
+        )
+    )
+    await asyncio.sleep(0.1)
+    server.stop()
+    gateway.close()
+    ext.gateway.close()
+    gateway_ext.backends.close()
+
+    assert results == [{"email": True}] * 5
+    assert CountingHandler.posts == 1
+    # The token's user is sent the notifications.
+    assert sorted(RecordingBackend.sent) == [
+        (f"message {i}", ["alice@example.com"]) for i in range(5)
+    ]
+    # The server's own backend was not loaded.
+    assert "email" not in ext.backends._backends
+
+
+def test_unavailable_gateway_falls_back_to_direct_sends(tmp_path, make_extension):
+    ext = make_extension(
+        gateway_url=f"unix://{tmp_path / 'missing.sock'}", gateway_batch_window=0
+    )
+
+    assert ext.deliver("hello", ["recording"]) == {"recording": True}
+    assert RecordingBackend.sent == [("hello", None)]
+    assert not ext.gateway.available
+    ext.backends.close()
+
+
+@pytest.mark.parametrize(
+    "token, tokens",
+    [("guess", {"secret": "alice"}), ("secret", {"secret": "bob"})],
+    ids=["wrong token", "user without recipients"],
+)
+async def test_refused_requests_fall_back_to_direct_sends(
+    tmp_path, token, tokens, make_extension
+):
+    """A server the gateway refuses sends its notifications itself."""
+    socket_path = str(tmp_path / "gateway.sock")
+    gateway_ext = make_extension()
+    gateway = NotificationGateway(
+        gateway_ext, recipients={"alice": {"email": "alice@example.com"}}
+    )
+    server = serve_gateway(gateway, socket_path, tokens)
+    ext = make_extension(
+        gateway_url=f"unix://{socket_path}",
+        gateway_token=token,
+        gateway_batch_window=0,
+    )
+
+    loop = asyncio.get_running_loop()
+    results = await loop.run_in_executor(None, ext.deliver, "hello", ["recording"])
+    server.stop()
+    ext.gateway.close()
+    ext.backends.close()
+    gateway_ext.backends.close()
+
+    assert results == {"recording": True}
+    assert gateway.stats["accepted"] == 0
+    assert RecordingBackend.sent == [("hello", None)]
+
+
+def test_unanswered_forward_is_not_sent_directly(tmp_path, make_extension):
+    """A gateway that may have received a notification keeps it to itself."""
+    socket_path = str(tmp_path / "gateway.sock")
+    # Connections are accepted by the kernel but never answered.
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen()
+    ext = make_extension(
+        gateway_url=f"unix://{socket_path}",
+        gateway_batch_window=0,
+        gateway_timeout=0.1,
+    )
+
+    assert ext.deliver("hello", ["recording"]) == {"recording": False}
+    listener.close()
+    ext.gateway.close()
+    ext.backends.close()
+
+    assert RecordingBackend.sent == []
+
+
+async def test_repeated_keys_are_sent_once(make_extension):
+    """A forward retried after a timeout is not delivered twice."""
+    ext = make_extension()
+    gateway = NotificationGateway(ext)
+
+    assert gateway.accept("hello", ["recording"], key="entry-1")
+    assert not gateway.accept("hello", ["recording"], key="entry-1")
+    await asyncio.sleep(0.05)
+    gateway.close()
+    ext.backends.close()
+
+    assert RecordingBackend.sent == [("hello", None)]
+    assert gateway.stats["duplicates"] == 1
+
+
+async def test_gateway_resolves_recipients(make_extension):
+    """Recipients come from the gateway's configuration, by user and notebook."""
+    ext = make_extension(
+        routing_rules=[
+            {"notebook": "reports/*", "webhook_urls": ["https://hooks.example.com/r"]}
+        ]
+    )
+    ext.backends._sources["email"] = f"{__name__}:RecordingBackend"
+    ext.backends._sources["webhook"] = f"{__name__}:RecordingBackend"
+    gateway = NotificationGateway(
+        ext, recipients={"alice": {"email": "alice@example.com"}}
+    )
+
+    gateway.accept("report", ["email", "webhook"], "alice", "reports/q1.ipynb")
+    # Without recipients of alice's, the gateway's own webhook is not used.
+    gateway.accept("scratch", ["email", "webhook"], "alice", "scratch.ipynb")
+    # The gateway's owner is sent notifications at the default recipients.
+    gateway.accept("owner", ["email"], None, "scratch.ipynb")
+    await asyncio.sleep(0.05)
+    gateway.close()
+    ext.backends.close()
+
+    assert sorted(RecordingBackend.sent, key=str) == [
+        ("owner", None),
+        ("report", ["alice@example.com"]),
+        ("report", ["https://hooks.example.com/r"]),
+        ("scratch", ["alice@example.com"]),
+    ]
+    assert gateway.stats["dropped"] == 1
+
+
+async def test_failed_sends_are_retried(tmp_path, make_extension):
+    """A channel outage delays notifications instead of parking them until restart."""
+    ext = make_extension(outbox_retry_interval=0.05)
+    ext.backends._sources["flaky"] = f"{__name__}:FlakyBackend"
+    ext.outbox = Outbox(str(tmp_path / "outbox.jsonl"))
+    gateway = NotificationGateway(ext)
+
+    gateway.accept("hello", ["flaky"])
+    await asyncio.sleep(0.3)
+    gateway.close()
+    ext.backends.close()
+
+    assert FlakyBackend.attempts == 2
+    assert gateway.stats["failed"] == 1
+    assert gateway.stats["sent"] == 1
+    assert ext.outbox.pending() == []
+
+
+def test_gateway_requires_tokens():
+    """Without tokens, the gateway only listens on an owner-only socket."""
+    app = NotifyGatewayApp(config=Config())
+
+    with pytest.raises(SystemExit) as exc_info:
+        app.start()
+
+    assert exc_info.value.code == 1
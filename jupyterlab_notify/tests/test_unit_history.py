@@ -0,0 +1,78 @@
+import logging
+
+import pytest
+from traitlets.config import Config
+
+from jupyterlab_notify import extension
+from jupyterlab_notify.config import NotificationParams
+from jupyterlab_notify.history import NotificationHistory
+
+
+@pytest.fixture
+def history(tmp_path):
+    log = NotificationHistory(
+        str(tmp_path / "history.db"),
+        max_entries=150,
+        log=logging.getLogger("test"),
+    )
+    yield log
+    log.close()
+
+
+def test_query_filters_and_pages(history):
+    for index in range(120):
+        history.append(
+            notebook="a.ipynb" if index % 2 else "b.ipynb",
+            cell_id=f"cell{index}",
+            mode="default",
+            status="Failed" if index % 10 == 0 else "Success",
+            decision="sent",
+            channels={"slack": True},
+        )
+
+    entries, cursor = history.query(notebook="a.ipynb", limit=50)
+    assert len(entries) == 50 and cursor is not None
+    assert entries[0]["cell_id"] == "cell119"
+    assert entries[0]["channels"] == {"slack": True}
+    rest, cursor = history.query(notebook="a.ipynb", before=cursor, limit=50)
+    assert len(rest) == 10 and cursor is None
+
+    failed, _ = history.query(status="Failed")
+    assert [entry["cell_id"] for entry in failed][:2] == ["cell110", "cell100"]
+
+
+def test_rotation_caps_entries(history):
+    for index in range(300):
+        history.append("a.ipynb", f"cell{index}", "default", "Success", "sent")
+    entries, _ = history.query(limit=500)
+    assert len(entries) <= 150
+    assert entries[0]["cell_id"] == "cell299"
+
+
+def test_extension_records_sent_and_skipped(history, monkeypatch):
+    ext = extension.NotifyExtension()
+    ext.update_config(Config({"NotificationConfig": {"slack_channel_name": "x"}}))
+    ext._init_config()
+    ext.history = history
+    monkeypatch.setattr(ext, "send_slack_notification", lambda message: True)
+
+    for cell_id, success in (("ok", True), ("bad", False)):
+        ext.send_notification(
+            NotificationParams(
+                cell_id=cell_id,
+                mode="on-error",
+                slackEnabled=True,
+                emailEnabled=False,
+                successMessage="Success",
+                failureMessage="Failure",
+                threshold=0,
+                success=success,
+                notebook_name="run.ipynb",
+            )
+        )
+    ext.backends.close()
+
+    sent, skipped = history.query(notebook="run.ipynb")[0]
+    assert (sent["cell_id"], sent["decision"]) == ("bad", "sent")
+    assert sent["channels"] == {"slack": True} and sent["latency"] >= 0
+    assert (skipped["cell_id"], skipped["decision"]) == ("ok", "skipped: mode")
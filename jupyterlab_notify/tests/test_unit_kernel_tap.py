@@ -0,0 +1,138 @@
+import asyncio
+import logging
+from unittest.mock import MagicMock
+
+import pytest
+from jupyter_client.session import Session
+from traitlets.config import Config
+
+from jupyterlab_notify import extension
+from jupyterlab_notify.config import NotificationParams
+from jupyterlab_notify.kernel_tap import KernelTap
+from jupyterlab_notify.registry import NotificationRegistry
+
+session = Session(key=b"")
+
+
+def iopub(msg_type, content, parent):
+    msg = session.msg(msg_type, content, parent=parent)
+    return session.serialize(msg, ident=[f"kernel.k1.{msg_type}".encode()])
+
+
+def execution_frames(request, error=None):
+    frames = [
+        iopub("status", {"execution_state": "busy"}, request),
+        iopub("execute_input", {"code": "1/0", "execution_count": 7}, request),
+        iopub("stream", {"name": "stdout", "text": "error\n"}, request),
+    ]
+    if error:
+        frames.append(iopub("error", {"ename": error[0], "evalue": error[1]}, request))
+    frames.append(iopub("status", {"execution_state": "idle"}, request))
+    return frames
+
+
+@pytest.fixture
+def tap():
+    events = []
+    kernel_tap = KernelTap(
+        kernel_manager=MagicMock(),
+        on_event=events.append,
+        log=logging.getLogger("test"),
+    )
+    kernel_tap.events = events
+    return kernel_tap
+
+
+def test_watched_execution_reports_start_and_failure(tap):
+    request = session.msg("execute_request", {"code": "1/0"})
+    tap.watch("k1", request["header"]["msg_id"], "cell1")
+    for frames in execution_frames(request, error=("ZeroDivisionError", "boom")):
+        tap.feed("k1", frames)
+
+    start, end = tap.events
+    assert start["event_type"] == "execution_start"
+    assert (start["cell_id"], start["execution_count"]) == ("cell1", 7)
+    assert end["event_type"] == "execution_end"
+    assert end["success"] is False
+    assert end["kernel_error"] == "ZeroDivisionError: boom"
+    assert end["timestamp"].endswith("+00:00")
+    assert not tap._watched["k1"]
+
+
+def test_execution_finished_before_registration(tap):
+    """A fast cell may finish before its registration reaches the server."""
+    tap.attach("k1")
+    request = session.msg("execute_request", {"code": "1"})
+    for frames in execution_frames(request):
+        tap.feed("k1", frames)
+    assert tap.events == []
+
+    tap.watch("k1", request["header"]["msg_id"], "cell1")
+    assert [event["event_type"] for event in tap.events] == [
+        "execution_start",
+        "execution_end",
+    ]
+    assert tap.events[1]["success"] is True
+
+
+def test_unrelated_messages_are_ignored(tap):
+    tap.watch("k1", "some-msg-id", "cell1")
+    other = session.msg("kernel_info_request", {})
+    tap.feed("k1", iopub("status", {"execution_state": "idle"}, other))
+    tap.feed("k1", iopub("stream", {"name": "stdout", "text": "x"}, other))
+    assert tap.events == []
+    assert not tap._recent.get("k1")
+
+
+def test_shutdown_fails_running_cells(tap):
+    tap.watch("k1", "some-msg-id", "cell1")
+    asyncio.run(
+        tap.kernel_action_listener(
+            None,
+            "",
+            {"kernel_id": "k1", "action": "shutdown", "status": "success"},
+        )
+    )
+    (end,) = tap.events
+    assert end["success"] is False
+    assert end["kernel_error"] == "The kernel was shut down"
+
+
+def test_extension_notifies_from_kernel_messages(monkeypatch):
+    ext = extension.NotifyExtension()
+    ext.update_config(Config({"NotificationConfig": {"slack_channel_name": "x"}}))
+    ext._init_config()
+    ext.cell_ids = NotificationRegistry()
+    ext.resource_sampler = None
+    ext.kernel_tap = KernelTap(MagicMock(), ext._on_kernel_event, log=ext.log)
+    messages = []
+    monkeypatch.setattr(ext, "send_slack_notification", messages.append)
+    request = session.msg("execute_request", {"code": "1/0"})
+
+    async def run_cell():
+        ext.register_notification(
+            NotificationParams(
+                cell_id="cell1",
+                mode="on-error",
+                slackEnabled=True,
+                emailEnabled=False,
+                successMessage="Success",
+                failureMessage="Failure",
+                threshold=0,
+                kernel_id="k1",
+                msg_id=request["header"]["msg_id"],
+            )
+        )
+        for frames in execution_frames(request, error=("ValueError", "bad")):
+            ext.kernel_tap.feed("k1", frames)
+        # The notification is sent in the delivery executor.
+        await asyncio.gather(*asyncio.all_tasks() - {asyncio.current_task()})
+
+    try:
+        asyncio.run(run_cell())
+    finally:
+        ext.backends.close()
+
+    assert len(messages) == 1
+    assert "ValueError: bad" in messages[0]
+    assert len(ext.cell_ids) == 0
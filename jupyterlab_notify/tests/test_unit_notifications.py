@@ -5,6 +5,7 @@ from email.message import EmailMessage
 from traitlets.config import Config
 from jupyterlab_notify import extension
 from jupyterlab_notify.config import NotificationParams
+from jupyterlab_notify.dedup import RecentKeys, error_fingerprint
 
 
 @pytest.fixture
@@ -110,6 +111,9 @@ def test_send_notification_modes(notify_extension, monkeypatch):
 
         monkeypatch.setattr(notify_extension, "send_slack_notification", fake_slack)
         monkeypatch.setattr(notify_extension, "send_email_notification", fake_email)
+        # Each case is an independent execution, not a repeat of the previous one
+        notify_extension.sent_keys = RecentKeys()
+        notify_extension.failure_fingerprints.close_all()
 
         notify_extension.send_notification(
             params, end_time="2025-03-21T12:00:10.123456"
@@ -183,3 +187,117 @@ def test_send_notification_with_timeout(notify_extension, monkeypatch):
 
     assert "Timeout" in messages.get("slack", "")
     assert "Timeout" in messages.get("email", "")
+
+
+def test_send_resource_notification(notify_extension, monkeypatch):
+    """Resource alerts are sent, while successful completions are skipped."""
+    params = NotificationParams(
+        cell_id="cell_resource",
+        mode="resource-threshold",
+        slackEnabled=True,
+        emailEnabled=False,
+        successMessage="Success",
+        failureMessage="Failure",
+        threshold=0,
+        success=True,
+    )
+    messages = []
+    monkeypatch.setattr(notify_extension, "send_slack_notification", messages.append)
+
+    notify_extension.send_notification(params)
+    assert messages == []
+
+    notify_extension.send_resource_notification(params, "Kernel memory too high")
+    assert len(messages) == 1
+    assert "Resource Limit Exceeded" in messages[0]
+    assert "Kernel memory too high" in messages[0]
+
+
+def test_duplicate_notifications_are_suppressed(notify_extension, monkeypatch):
+    """The same outcome of the same execution is delivered only once."""
+    messages = []
+    monkeypatch.setattr(notify_extension, "send_slack_notification", messages.append)
+
+    def completion(execution_count, success=False):
+        return NotificationParams(
+            cell_id="cell_dup",
+            mode="on-error",
+            slackEnabled=True,
+            emailEnabled=False,
+            successMessage="Success",
+            failureMessage="Failure",
+            threshold=0,
+            success=success,
+            notebook_name="nb.ipynb",
+            execution_count=execution_count,
+        )
+
+    # Server-side event and browser trigger for the same failure
+    notify_extension.send_notification(completion(3))
+    notify_extension.send_notification(completion(3))
+    # A later execution of the same cell is a new notification
+    notify_extension.send_notification(completion(4))
+
+    assert len(messages) == 2
+
+
+def test_recent_keys_bounded():
+    """RecentKeys evicts the least recently seen key once full."""
+    keys = RecentKeys(maxsize=2)
+    assert keys.add("a") and keys.add("b")
+    assert not keys.add("a")
+    assert keys.add("c")
+    assert len(keys) == 2 and "b" not in keys and "a" in keys
+
+
+def test_repeated_failures_are_summarized(notify_extension, monkeypatch):
+    """Identical failures are suppressed and summarized when the window closes."""
+    messages = []
+    monkeypatch.setattr(notify_extension, "send_slack_notification", messages.append)
+    notify_extension.failure_fingerprints.window = 300
+
+    for attempt in range(4):
+        params = NotificationParams(
+            cell_id="cell_retry",
+            mode="on-error",
+            slackEnabled=True,
+            emailEnabled=False,
+            successMessage="Success",
+            failureMessage="Failure",
+            threshold=0,
+            success=False,
+            error=(
+                f"ConnectionError: <socket object at 0x7f{attempt}a> failed\n"
+                f"Cell In[{attempt + 1}], line {attempt + 3}"
+            ),
+            notebook_name="etl.ipynb",
+            execution_count=attempt,
+        )
+        notify_extension.send_notification(params)
+
+    assert len(messages) == 1
+    notify_extension.failure_fingerprints.close_all()
+    assert len(messages) == 2
+    assert "3 more occurrences" in messages[1]
+
+
+def test_error_fingerprint_normalization():
+    """Fingerprints ignore volatile numbers but keep the exception type and values."""
+    first = error_fingerprint("KeyError: 'a' at line 10 (0xdeadbeef)")
+    second = error_fingerprint("KeyError: 'a' at line 12 (0x1234)")
+    other = error_fingerprint("ValueError: 'a' at line 10 (0xdeadbeef)")
+    assert first == second
+    assert first != other
+    assert first.startswith("KeyError:")
+
+    traceback = (
+        "ValueError: shapes (3,4) and (5,6) not aligned\n"
+        "Cell In[{count}], line {line}\n"
+        "----> {line} np.dot(a, b)  # id={count}00"
+    )
+    assert error_fingerprint(traceback.format(count=3, line=7)) == error_fingerprint(
+        traceback.format(count=4, line=9)
+    )
+    assert error_fingerprint(
+        "ValueError: shapes (3,4) and (5,6) not aligned"
+    ) != error_fingerprint("ValueError: shapes (3,4) and (7,8) not aligned")
@@ -0,0 +1,125 @@
+import time
+
+import pytest
+from unittest.mock import MagicMock
+from traitlets.config import Config
+from jupyterlab_notify import extension
+from jupyterlab_notify.outbox import Outbox
+
+
+def test_pending_entries_survive_reopen(tmp_path):
+    """Only channels that were not acknowledged are replayed after reopening."""
+    path = str(tmp_path / "outbox.jsonl")
+    outbox = Outbox(path, log=MagicMock())
+    partial = outbox.put("first", ["slack", "email"])
+    done = outbox.put("second", ["slack"])
+    outbox.ack(partial, "slack")
+    outbox.ack(done, "slack")
+    outbox.close()
+
+    reopened = Outbox(path, log=MagicMock())
+    pending = reopened.pending()
+
+    assert [(e.message, e.remaining) for e in pending] == [("first", ["email"])]
+
+
+def test_compaction_drops_completed_entries(tmp_path):
+    """The journal is rewritten once enough entries have completed."""
+    path = tmp_path / "outbox.jsonl"
+    outbox = Outbox(str(path), compact_threshold=10, log=MagicMock())
+    outbox.put("kept", ["email"])
+    for i in range(25):
+        outbox.ack(outbox.put(f"message {i}", ["slack"]), "slack")
+
+    lines = path.read_text().splitlines()
+    assert len(lines) < 25
+    assert len(outbox.pending()) == 1
+
+
+@pytest.fixture
+def notify_extension(tmp_path):
+    ext = extension.NotifyExtension()
+    ext.update_config(
+        Config(
+            {
+                "NotificationConfig": {
+                    "email": "test@example.com",
+                    "slack_channel_name": "general",
+                    "outbox_retry_interval": 0,
+                }
+            }
+        )
+    )
+    ext._init_config()
+    ext.slack_client = MagicMock()
+    ext._config.smtp_instance = MagicMock()
+    ext.outbox = Outbox(str(tmp_path / "outbox.jsonl"), log=MagicMock())
+    yield ext
+    ext.backends.close()
+
+
+def fake_senders(ext, monkeypatch, results):
+    sent = []
+
+    def fake_sender(channel):
+        def send(message):
+            sent.append((channel, message))
+            return results[channel]
+
+        return send
+
+    monkeypatch.setattr(ext, "send_slack_notification", fake_sender("slack"))
+    monkeypatch.setattr(ext, "send_email_notification", fake_sender("email"))
+    return sent
+
+
+def test_failed_channel_is_replayed(notify_extension, monkeypatch):
+    """A failed send stays journaled and is delivered by drain_outbox."""
+    results = {"slack": True, "email": False}
+    sent = fake_senders(notify_extension, monkeypatch, results)
+
+    notify_extension.deliver("hello", ["slack", "email"])
+    assert [e.remaining for e in notify_extension.outbox.pending()] == [["email"]]
+
+    results["email"] = True
+    notify_extension.drain_outbox()
+
+    assert sent == [("slack", "hello"), ("email", "hello"), ("email", "hello")]
+    assert notify_extension.outbox.pending() == []
+
+
+def test_unconfigured_channel_is_not_journaled(notify_extension, monkeypatch):
+    """A channel that cannot succeed is not retried."""
+    sent = fake_senders(notify_extension, monkeypatch, {"slack": True, "email": False})
+    notify_extension.outbox.put("old", ["slack", "email"])
+    notify_extension._config.smtp_instance = None
+
+    notify_extension.deliver("hello", ["slack", "email"])
+    assert [e.channels for e in notify_extension.outbox.pending()] == [
+        ["slack", "email"]
+    ]
+    notify_extension.drain_outbox()
+
+    assert ("email", "old") not in sent
+    assert notify_extension.outbox.pending() == []
+
+
+def test_failed_channel_is_retried_while_running(notify_extension, monkeypatch):
+    """Failed deliveries are retried by a timer, backing off while they fail."""
+    notify_extension._config.outbox_retry_interval = 0.05
+    results = {"slack": True, "email": False}
+    sent = fake_senders(notify_extension, monkeypatch, results)
+
+    notify_extension.deliver("hello", ["slack", "email"])
+    deadline = time.monotonic() + 5
+    while notify_extension._retry_failures < 2:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    results["email"] = True
+    while notify_extension._retry_ids:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    assert notify_extension.outbox.pending() == []
+    assert sent.count(("email", "hello")) >= 4
+    assert sent.count(("slack", "hello")) == 1
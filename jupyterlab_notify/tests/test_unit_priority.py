@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import time
+
+from jupyterlab_notify import extension
+from jupyterlab_notify.backends import NotifierBackend
+from jupyterlab_notify.outbox import Outbox
+from jupyterlab_notify.priority import (
+    DEFERRED,
+    PRIORITY_FAILURE,
+    PRIORITY_SUCCESS,
+    PRIORITY_TIMEOUT,
+    PriorityGate,
+    delivery_decision,
+    delivery_priority,
+)
+from jupyterlab_notify.registry import NotificationRegistry
+
+
+class RecordingBackend(NotifierBackend):
+    name = "recording"
+    sent = []
+
+    async def send(self, message, recipients=None):
+        RecordingBackend.sent.append(message)
+        return True
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def admit_in_background(gate, priority, admitted):
+    def run():
+        with gate.slot(priority) as ok:
+            admitted.append((priority, ok))
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_delivery_priority():
+    assert delivery_priority("Failed") == PRIORITY_FAILURE
+    assert delivery_priority("Timeout") == PRIORITY_TIMEOUT
+    assert delivery_priority("Resource Limit Exceeded") == PRIORITY_TIMEOUT
+    assert delivery_priority("Success") == PRIORITY_SUCCESS
+    assert delivery_decision({"slack": True, "email": False}) == "sent"
+    assert delivery_decision({"slack": DEFERRED}) == "deferred"
+
+
+def test_failures_overtake_waiting_successes():
+    gate = PriorityGate(slots=1)
+    admitted = []
+    threads = []
+    with gate.slot(PRIORITY_SUCCESS):
+        for priority in (PRIORITY_SUCCESS, PRIORITY_TIMEOUT, PRIORITY_FAILURE):
+            threads.append(admit_in_background(gate, priority, admitted))
+            wait_for(lambda: len(gate._waiting) == len(threads))
+    for thread in threads:
+        thread.join()
+
+    assert admitted == [
+        (PRIORITY_FAILURE, True),
+        (PRIORITY_TIMEOUT, True),
+        (PRIORITY_SUCCESS, True),
+    ]
+    assert gate.idle
+
+
+def test_least_urgent_waiter_is_shed():
+    gate = PriorityGate(slots=1, max_waiting=1)
+    admitted = []
+    with gate.slot(PRIORITY_SUCCESS):
+        success = admit_in_background(gate, PRIORITY_SUCCESS, admitted)
+        wait_for(lambda: len(gate._waiting) == 1)
+        failure = admit_in_background(gate, PRIORITY_FAILURE, admitted)
+        success.join()
+        # A success arriving now is not more urgent than the waiting failure.
+        with gate.slot(PRIORITY_SUCCESS) as ok:
+            assert not ok
+    failure.join()
+
+    assert admitted == [(PRIORITY_SUCCESS, False), (PRIORITY_FAILURE, True)]
+    assert gate.shed == {PRIORITY_FAILURE: 0, PRIORITY_TIMEOUT: 0, PRIORITY_SUCCESS: 2}
+
+
+def test_shed_notifications_are_sent_as_a_digest(tmp_path, make_extension):
+    RecordingBackend.sent = []
+    ext = make_extension(delivery_concurrency=1, delivery_queue_size=0)
+    ext.backends._sources["recording"] = f"{__name__}:RecordingBackend"
+    ext.outbox = Outbox(str(tmp_path / "outbox.jsonl"))
+
+    with ext.delivery_gate.slot(PRIORITY_FAILURE):
+        for i in range(3):
+            assert ext.deliver(f"cell {i}\nline", ["recording"]) == {
+                "recording": DEFERRED
+            }
+    assert RecordingBackend.sent == []
+    assert len(ext.outbox.pending()) == 3
+
+    ext.deliver("failure", ["recording"], priority=PRIORITY_FAILURE)
+    ext.backends.close()
+
+    assert RecordingBackend.sent == [
+        "failure",
+        "3 notifications held back during a burst:\n"
+        "- cell 0 | line\n- cell 1 | line\n- cell 2 | line",
+    ]
+    assert ext.outbox.pending() == []
+
+
+async def test_rerun_registered_during_delivery_is_kept(make_extension, make_params):
+    """A cell re-run while its notification waits keeps its new registration."""
+    ext = make_extension()
+    ext.cell_ids = NotificationRegistry()
+    ext.resource_sampler = None
+    release = threading.Event()
+    sent = []
+
+    def send_notification(params, end_time=None):
+        release.wait(5)
+        sent.append(params)
+
+    ext.send_notification = send_notification
+    first = make_params("cell1", mode="always")
+    ext.register_notification(first)
+    delivery = asyncio.ensure_future(
+        ext.event_listener(
+            None,
+            extension.NBMODEL_SCHEMA_ID,
+            {"event_type": "execution_end", "cell_id": "cell1", "success": True},
+        )
+    )
+    await asyncio.sleep(0.05)
+    second = make_params("cell1", mode="always")
+    ext.register_notification(second)
+    release.set()
+    await delivery
+
+    assert sent == [first]
+    assert ext.cell_ids["cell1"] is second
+
+
+def test_resource_alerts_are_sent_in_the_delivery_executor(make_extension, make_params):
+    """The resource sampler runs on the IOLoop, so its alerts are handed off."""
+    ext = make_extension()
+    threads = []
+    ext.send_notification = lambda params, end_time=None: threads.append(
+        threading.current_thread().name
+    )
+
+    future = ext.submit_delivery(
+        ext.send_resource_notification, make_params("cell1"), "Memory above 1 MB"
+    )
+    future.result(5)
+
+    assert threads[0].startswith("notify-delivery")
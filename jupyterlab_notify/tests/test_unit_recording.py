@@ -0,0 +1,94 @@
+import json
+
+from traitlets.config import Config
+
+from jupyterlab_notify import extension, handlers
+from jupyterlab_notify.cli import (
+    NotifyReplayApp,
+    ReplayExtension,
+    load_recording,
+    replay,
+)
+from jupyterlab_notify.registry import NotificationRegistry, params_to_dict
+
+# Cells notified whatever their outcome, on the webhook channel
+WEBHOOK = {"mode": "always", "channels": ["webhook"]}
+
+
+def execution_end(cell_id, success=True):
+    return {
+        "event_type": "execution_end",
+        "cell_id": cell_id,
+        "success": success,
+        "timestamp": "2026-01-01T00:00:01+00:00",
+    }
+
+
+async def record_session(path, make_extension, make_params):
+    ext = make_extension(event_record_file=str(path))
+    ext.cell_ids = NotificationRegistry()
+    ext.resource_sampler = None
+    ext.deliver = lambda *args, **kwargs: {}
+
+    ext.register_notification(make_params("ok", **WEBHOOK))
+    ext.register_notification(make_params("bad", **WEBHOOK))
+    ext.register_notification(
+        make_params("slow", mode="custom-timeout", threshold=0.2, channels=["webhook"])
+    )
+    ext.register_notification(make_params("gone", **WEBHOOK))
+    handlers.cancel_registration(ext, "gone")
+    await ext.event_listener(None, extension.NBMODEL_SCHEMA_ID, execution_end("ok"))
+    await ext.event_listener(
+        None, extension.NBMODEL_SCHEMA_ID, execution_end("bad", success=False)
+    )
+    # The timeout of "slow" fires from its timer.
+    ext.cell_ids["slow"].timer.join()
+    ext.recorder.close()
+
+
+async def test_recording_is_replayed(tmp_path, make_extension, make_params):
+    path = tmp_path / "events.jsonl"
+    await record_session(path, make_extension, make_params)
+
+    records = load_recording(str(path))
+    assert [record["kind"] for record in records] == [
+        "register",
+        "register",
+        "register",
+        "register",
+        "cancel",
+        "event",
+        "event",
+        "timeout",
+    ]
+    assert json.loads(path.read_text().splitlines()[0])["data"]["cell_id"] == "ok"
+
+    ext = ReplayExtension()
+    ext._init_config()
+    handled = []
+    await replay(ext, records, speed=0, on_done=lambda r, lag: handled.append(r))
+    ext.close()
+
+    assert len(handled) == len(records)
+    assert ext.statuses == {"Success": 1, "Failed": 1, "Timeout": 1}
+    assert ext.delivered == {"webhook": 3}
+
+
+def test_replay_command_reports(tmp_path, capsys, make_params):
+    path = tmp_path / "events.jsonl"
+    params = make_params("a", **WEBHOOK)
+    lines = [
+        {"t": 10.0, "kind": "register", "data": params_to_dict(params)},
+        {"t": 10.05, "kind": "event", "data": execution_end("a", success=False)},
+    ]
+    path.write_text("\n".join(json.dumps(line) for line in lines))
+
+    app = NotifyReplayApp(config=Config())
+    app.extra_args = [str(path)]
+    app.speed = 0
+    app.start()
+
+    out = capsys.readouterr().out
+    assert "Replayed 2 records of 0.1 s at maximum speed" in out
+    assert "Notifications: 1 Failed" in out
+    assert "webhook    1 delivered" in out
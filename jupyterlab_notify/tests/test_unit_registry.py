@@ -0,0 +1,112 @@
+import time
+import pytest
+from unittest.mock import MagicMock
+from jupyterlab_notify.registry import NotificationRegistry
+
+
+def test_entries_survive_reopen(tmp_path, make_params):
+    """Entries written to the registry are loaded back by a new instance."""
+    path = str(tmp_path / "registry.db")
+    registry = NotificationRegistry(path=path, log=MagicMock())
+    registry["cell1"] = make_params("cell1", kernel_id="k1")
+    registry["cell2"] = make_params("cell2")
+    del registry["cell2"]
+    registry.close()
+
+    reopened = NotificationRegistry(path=path, log=MagicMock())
+    restored = reopened.load()
+
+    assert [params.cell_id for params in restored] == ["cell1"]
+    assert reopened["cell1"].kernel_id == "k1"
+    assert "cell2" not in reopened
+
+
+def test_writes_batched_per_tick(tmp_path, make_params):
+    """Several changes in one tick schedule a single flush."""
+    io_loop = MagicMock()
+    registry = NotificationRegistry(
+        path=str(tmp_path / "registry.db"), io_loop=io_loop, log=MagicMock()
+    )
+    registry["cell1"] = make_params("cell1")
+    registry["cell2"] = make_params("cell2")
+    registry.touch("cell1")
+
+    io_loop.add_callback.assert_called_once_with(registry.flush)
+    registry.flush()
+
+    reopened = NotificationRegistry(path=str(tmp_path / "registry.db"), log=MagicMock())
+    assert sorted(p.cell_id for p in reopened.load()) == ["cell1", "cell2"]
+
+
+@pytest.fixture
+def notify_extension(tmp_path, make_extension):
+    ext = make_extension(email="test@example.com")
+    ext.serverapp = MagicMock()
+    ext.serverapp.kernel_manager.list_kernel_ids.return_value = ["alive"]
+    ext.resource_sampler = MagicMock()
+    ext.cell_ids = NotificationRegistry(
+        path=str(tmp_path / "registry.db"), log=MagicMock()
+    )
+    return ext
+
+
+def test_stale_entries_without_kernel_expire(tmp_path, make_params):
+    """Entries no kernel can complete are dropped once older than max_age."""
+    path = str(tmp_path / "registry.db")
+    registry = NotificationRegistry(path=path, log=MagicMock())
+    registry["browser"] = make_params("browser")
+    registry["kernel"] = make_params("kernel", kernel_id="k1")
+    registry["recent"] = make_params("recent")
+    registry.flush()
+    with registry._conn:
+        registry._conn.execute(
+            "UPDATE pending SET updated = ? WHERE cell_id != 'recent'",
+            (time.time() - 3600,),
+        )
+    registry.close()
+
+    reopened = NotificationRegistry(path=path, log=MagicMock())
+    restored = reopened.load(max_age=60)
+    reopened.close()
+
+    assert sorted(params.cell_id for params in restored) == ["kernel", "recent"]
+    again = NotificationRegistry(path=path, log=MagicMock())
+    assert sorted(params.cell_id for params in again.load()) == ["kernel", "recent"]
+    again.close()
+
+
+def test_state_files_are_keyed_by_root_dir(tmp_path, make_extension):
+    """A server restarted on another port finds the state of its root directory."""
+    paths = []
+    for port, root in ((8888, "work"), (8889, "work"), (8888, "other")):
+        ext = make_extension(state_dir=str(tmp_path))
+        ext.serverapp = MagicMock(port=port, root_dir=str(tmp_path / root))
+        paths.append(ext._state_path("registry.db"))
+
+    assert paths[0] == paths[1] != paths[2]
+    assert paths[0].startswith(str(tmp_path / "registry-"))
+    assert paths[0].endswith(".db")
+
+
+def test_restore_reconciles_with_running_kernels(
+    notify_extension, make_params, monkeypatch
+):
+    """Cells of dead kernels are reported as failed, others are re-armed."""
+    registry = notify_extension.cell_ids
+    registry["dead"] = make_params("dead", kernel_id="gone")
+    registry["timeout"] = make_params(
+        "timeout", mode="custom-timeout", kernel_id="alive", deadline=time.time() + 60
+    )
+    registry["unknown"] = make_params("unknown")
+    registry._entries.clear()
+
+    sent = []
+    monkeypatch.setattr(notify_extension, "send_notification", sent.append)
+    notify_extension.restore_pending_notifications()
+
+    assert [params.cell_id for params in sent] == ["dead"]
+    assert sent[0].success is False
+    assert sorted(registry) == ["timeout", "unknown"]
+    timer = registry["timeout"].timer
+    assert timer is not None and timer.is_alive()
+    timer.cancel()
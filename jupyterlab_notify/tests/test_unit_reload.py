@@ -0,0 +1,110 @@
+import json
+import logging
+import os
+
+import pytest
+from traitlets.config import Config
+
+from jupyterlab_notify import extension
+from jupyterlab_notify.reload import ConfigWatcher
+
+
+def test_watcher_reports_settled_changes_once(tmp_path):
+    path = tmp_path / "jupyter_notify_config.json"
+    changes = []
+    watcher = ConfigWatcher(
+        [str(path)],
+        on_change=lambda: changes.append(True),
+        debounce=0,
+        log=logging.getLogger("test"),
+    )
+    watcher.poll()
+    assert changes == []
+
+    path.write_text("{}")
+    watcher.poll()
+    assert changes == []  # Wait for the file to settle
+    watcher.poll()
+    watcher.poll()
+    assert changes == [True]
+
+    os.remove(path)
+    watcher.poll()
+    watcher.poll()
+    assert changes == [True, True]
+
+
+@pytest.fixture
+def ext(tmp_path, monkeypatch):
+    ext = extension.NotifyExtension()
+    ext.update_config(Config({"NotificationConfig": {"email": "old@example.com"}}))
+    ext._init_config()
+    monkeypatch.setattr(
+        ext, "_config_sources", lambda: [("jupyter_notify_config", [str(tmp_path)])]
+    )
+    yield ext
+    ext.backends.close()
+
+
+def write_config(tmp_path, text):
+    (tmp_path / "jupyter_notify_config.json").write_text(text)
+
+
+def test_reload_swaps_clients(ext, tmp_path):
+    old_config = ext._config
+    write_config(
+        tmp_path,
+        json.dumps(
+            {
+                "NotificationConfig": {
+                    "email": "new@example.com",
+                    "slack_token": "xoxb-new",
+                    "slack_channel_name": "alerts",
+                }
+            }
+        ),
+    )
+
+    assert ext.reload_config()
+    assert ext.config_generation == 2
+    assert ext._config is not old_config
+    assert ext.email == "new@example.com"
+    assert ext.slack_client.token == "xoxb-new"
+    assert ext.slack_channel_name == "alerts"
+
+
+def test_failed_reload_keeps_config(ext, tmp_path):
+    write_config(tmp_path, "{not json")
+
+    assert not ext.reload_config()
+    assert ext.config_generation == 1
+    assert ext.email == "old@example.com"
+    assert ext.config_error
+
+
+def test_smtp_misconfiguration_is_logged_after_reload(ext, tmp_path, caplog):
+    ext.log = logging.getLogger("test-reload")
+    write_config(
+        tmp_path,
+        json.dumps({"NotificationConfig": {"smtp_class": "missing_module.SMTP"}}),
+    )
+
+    with caplog.at_level(logging.ERROR, logger="test-reload"):
+        assert ext.reload_config()
+
+    assert ext._config.log is ext.log
+    assert "Could not import module: missing_module" in caplog.text
+
+
+def test_smtp_misconfiguration_is_logged_at_startup(caplog):
+    ext = extension.NotifyExtension()
+    ext.log = logging.getLogger("test-startup")
+    ext.update_config(
+        Config({"NotificationConfig": {"smtp_class": "missing_module.SMTP"}})
+    )
+
+    with caplog.at_level(logging.ERROR, logger="test-startup"):
+        ext._init_config()
+    ext.backends.close()
+
+    assert "Could not import module: missing_module" in caplog.text
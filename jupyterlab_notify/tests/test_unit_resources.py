@@ -0,0 +1,85 @@
+import functools
+import pytest
+from unittest.mock import MagicMock
+from jupyterlab_notify.resources import ResourceSampler
+
+
+@pytest.fixture
+def watched(make_params):
+    """Parameters of a resource-threshold cell on ``kernel-1`` by default."""
+    return functools.partial(
+        make_params, mode="resource-threshold", kernel_id="kernel-1"
+    )
+
+
+@pytest.fixture
+def sampler():
+    alerts = []
+    sampler = ResourceSampler(
+        kernel_manager=MagicMock(),
+        on_exceeded=lambda params, reason: alerts.append((params.cell_id, reason)),
+        memory_threshold=1024,
+        cpu_threshold=200,
+        log=MagicMock(),
+    )
+    sampler.alerts = alerts
+    # Avoid starting a periodic callback; samples are driven by the tests.
+    sampler._ensure_running = lambda: None
+    return sampler
+
+
+def test_alerts_once_when_memory_exceeded(sampler, watched, monkeypatch):
+    """A cell is alerted once when its kernel goes past the memory threshold."""
+    monkeypatch.setattr(sampler, "measure", lambda kernel_id: (2048.0, 10.0))
+    sampler.watch(watched("cell1"))
+
+    sampler.sample()
+    sampler.sample()
+
+    assert len(sampler.alerts) == 1
+    assert sampler.alerts[0][0] == "cell1"
+    assert "memory" in sampler.alerts[0][1]
+
+
+def test_cell_threshold_overrides_default(sampler, watched, monkeypatch):
+    """Per-cell thresholds take precedence over the configured defaults."""
+    monkeypatch.setattr(sampler, "measure", lambda kernel_id: (512.0, 50.0))
+    sampler.watch(watched("strict", cpu_threshold=25))
+    sampler.watch(watched("lenient"))
+
+    sampler.sample()
+
+    assert [cell_id for cell_id, _ in sampler.alerts] == ["strict"]
+    assert "CPU" in sampler.alerts[0][1]
+
+
+def test_one_measurement_per_kernel(sampler, watched, monkeypatch):
+    """Cells sharing a kernel are checked against a single measurement."""
+    measured = []
+
+    def fake_measure(kernel_id):
+        measured.append(kernel_id)
+        return (1.0, 1.0)
+
+    monkeypatch.setattr(sampler, "measure", fake_measure)
+    sampler.watch(watched("a"))
+    sampler.watch(watched("b"))
+    sampler.watch(watched("c", kernel_id="kernel-2"))
+
+    sampler.sample()
+
+    assert sorted(measured) == ["kernel-1", "kernel-2"]
+
+
+def test_unwatch_and_missing_kernel(sampler, watched, monkeypatch):
+    """Unwatched cells and cells of vanished kernels are no longer sampled."""
+    monkeypatch.setattr(sampler, "measure", lambda kernel_id: None)
+    sampler.watch(watched("a"))
+    sampler.watch(watched("b", kernel_id="kernel-2"))
+    sampler.unwatch("a", "kernel-1")
+    assert list(sampler._watched) == ["kernel-2"]
+
+    sampler.sample()
+
+    assert sampler._watched == {}
+    assert sampler.alerts == []
@@ -0,0 +1,136 @@
+import asyncio
+import time
+
+import pytest
+
+from jupyterlab_notify import extension
+from jupyterlab_notify.registry import NotificationRegistry
+from jupyterlab_notify.runs import RunState, RunTracker, format_duration
+
+
+@pytest.fixture
+def run_cell(make_params):
+    """Parameters of the cell at ``index`` of a run of ``analysis.ipynb``."""
+
+    def make(index, run_id="run-1", run_size=3, **overrides):
+        return make_params(
+            f"cell{index}",
+            slackEnabled=True,
+            notebook_name="analysis.ipynb",
+            execution_count=index,
+            run_id=run_id,
+            run_size=run_size,
+            **overrides,
+        )
+
+    return make
+
+
+def test_run_notifies_once_when_last_cell_finishes(run_cell):
+    """Thousands of cells produce one notification with the slowest cells."""
+    runs = []
+    tracker = RunTracker(on_notify=runs.append, top_k=3)
+    size = 5000
+    for index in range(size):
+        tracker.add(run_cell(index, run_size=size))
+    for index in range(size):
+        tracker.complete(run_cell(index, run_size=size), True, float(index % 100))
+
+    assert len(runs) == 1
+    run = runs[0]
+    assert run.finished == size and run.failed == 0
+    assert [duration for duration, _ in run.slowest_cells()] == [99.0, 99.0, 99.0]
+    assert len(tracker) == 0
+
+
+def test_run_notifies_on_first_failure_only(run_cell):
+    """The first failure notifies; later completions of the run do not."""
+    runs = []
+    tracker = RunTracker(on_notify=runs.append)
+    tracker.complete(run_cell(1), True, 1.0)
+    tracker.complete(run_cell(2, error="ValueError: bad"), False, 2.0)
+    tracker.complete(run_cell(3), False, 0.0)
+
+    assert len(runs) == 1
+    assert runs[0].failure.cell_id == "cell2"
+    assert "run-1" not in tracker
+
+
+def test_run_starts_by_the_server_clock(run_cell):
+    """A browser clock an hour ahead does not shorten the run."""
+    runs = []
+    tracker = RunTracker(on_notify=runs.append)
+    skewed = time.time() + 3600
+    before = time.time()
+    tracker.add(run_cell(1, run_size=1, run_started=skewed))
+    tracker.complete(run_cell(1, run_size=1, run_started=skewed), True, 1.0)
+
+    assert before <= runs[0].started <= runs[0].ended
+
+
+def test_format_duration():
+    assert format_duration(5) == "5s"
+    assert format_duration(125) == "2m 5s"
+    assert format_duration(3725) == "1h 2m 5s"
+
+
+@pytest.fixture
+def notify_extension(make_extension):
+    ext = make_extension(slack_channel_name="x")
+    ext.cell_ids = NotificationRegistry()
+    ext.resource_sampler = None
+    return ext
+
+
+def test_nbmodel_events_complete_run(notify_extension, run_cell, monkeypatch):
+    """execution_end events of a run send a single run notification."""
+    messages = []
+    monkeypatch.setattr(notify_extension, "send_slack_notification", messages.append)
+    for index in range(3):
+        notify_extension.register_notification(run_cell(index))
+
+    async def run_cells():
+        for index in range(3):
+            cell_id = f"cell{index}"
+            await notify_extension.event_listener(
+                None,
+                extension.NBMODEL_SCHEMA_ID,
+                {
+                    "event_type": "execution_start",
+                    "cell_id": cell_id,
+                    "timestamp": f"2025-03-21T12:0{index}:00",
+                },
+            )
+            await notify_extension.event_listener(
+                None,
+                extension.NBMODEL_SCHEMA_ID,
+                {
+                    "event_type": "execution_end",
+                    "cell_id": cell_id,
+                    "success": True,
+                    "timestamp": f"2025-03-21T12:0{index}:{10 * (index + 1)}",
+                },
+            )
+
+    asyncio.run(run_cells())
+
+    assert len(messages) == 1
+    assert "Run Status: Completed" in messages[0]
+    assert "Cells: 3 of 3 finished" in messages[0]
+    assert "Cell 2: 30s" in messages[0]
+    assert len(notify_extension.cell_ids) == 0
+
+
+def test_fast_run_below_threshold_is_skipped(notify_extension, run_cell, monkeypatch):
+    """Default mode applies the threshold to the run's total runtime."""
+    messages = []
+    monkeypatch.setattr(notify_extension, "send_slack_notification", messages.append)
+    now = time.time()
+    for run_id, runtime in (("fast", 5), ("slow", 120)):
+        params = run_cell(0, run_id=run_id)
+        params.threshold = 60
+        run = RunState(run_id, 1, params, started=now - runtime, finished=1, ended=now)
+        notify_extension.send_run_notification(run)
+
+    assert len(messages) == 1
+    assert "Total runtime: 2m 0s" in messages[0]
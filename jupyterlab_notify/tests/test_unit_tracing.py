@@ -0,0 +1,122 @@
+import asyncio
+import json
+import logging
+
+from traitlets.config import Config
+
+from jupyterlab_notify import extension
+from jupyterlab_notify.config import NotificationParams
+from jupyterlab_notify.registry import NotificationRegistry
+from jupyterlab_notify.tracing import NOOP_TRACE, Tracer
+
+
+def read_chrome(path):
+    # The array is left open so that traces can be appended.
+    return json.loads(path.read_text().rstrip().rstrip(",") + "]")
+
+
+def test_disabled_or_unsampled_tracer_is_noop(tmp_path):
+    assert Tracer().start("notification") is NOOP_TRACE
+    tracer = Tracer(str(tmp_path / "trace.json"), sample_rate=0)
+    assert tracer.start("notification") is NOOP_TRACE
+    with NOOP_TRACE.span("send slack"):
+        pass
+    assert not (tmp_path / "trace.json").exists()
+
+
+def test_chrome_export(tmp_path):
+    path = tmp_path / "trace.json"
+    tracer = Tracer(str(path), log=logging.getLogger("test"))
+    for cell_id in ("cell1", "cell2"):
+        trace = tracer.start("notification", cell_id=cell_id)
+        with trace.span("send slack", channel="slack"):
+            pass
+        trace.begin("decision")
+        trace.end(decision="sent")
+    tracer.close()
+
+    events = read_chrome(path)
+    assert [event["name"] for event in events[:3]] == [
+        "notification",
+        "send slack",
+        "decision",
+    ]
+    root, send = events[0], events[1]
+    assert root["ph"] == "X" and root["args"]["decision"] == "sent"
+    assert root["ts"] <= send["ts"] and root["dur"] >= send["dur"]
+    assert len({event["tid"] for event in events}) == 2
+
+
+def test_otlp_export(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    tracer = Tracer(str(path), format="otlp", log=logging.getLogger("test"))
+    trace = tracer.start("notification", cell_id="cell1")
+    trace.add_span("event receipt", trace.root.start, trace.root.start + 1000)
+    trace.end(status="Failed")
+    trace.end(status="ignored")
+    tracer.close()
+
+    (line,) = path.read_text().splitlines()
+    spans = json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    root, child = spans
+    assert child["parentSpanId"] == root["spanId"]
+    assert child["traceId"] == root["traceId"]
+    assert {"key": "status", "value": {"stringValue": "Failed"}} in root["attributes"]
+
+
+def test_extension_traces_notification(tmp_path, monkeypatch):
+    path = tmp_path / "trace.json"
+    ext = extension.NotifyExtension()
+    ext.update_config(
+        Config(
+            {
+                "NotificationConfig": {
+                    "slack_channel_name": "x",
+                    "trace_file": str(path),
+                }
+            }
+        )
+    )
+    ext._init_config()
+    ext.cell_ids = NotificationRegistry()
+    monkeypatch.setattr(ext, "send_slack_notification", lambda message: True)
+    params = NotificationParams(
+        cell_id="cell1",
+        mode="always",
+        slackEnabled=True,
+        emailEnabled=False,
+        successMessage="Done",
+        failureMessage="Failed",
+        threshold=0,
+    )
+    try:
+        ext.register_notification(params)
+
+        async def finish():
+            await ext.event_listener(
+                None,
+                extension.NBMODEL_SCHEMA_ID,
+                {
+                    "event_type": "execution_end",
+                    "cell_id": "cell1",
+                    "success": True,
+                    "timestamp": "2026-01-01T00:00:00+00:00",
+                },
+            )
+
+        asyncio.run(finish())
+    finally:
+        ext.backends.close()
+        ext.tracer.close()
+
+    events = read_chrome(path)
+    assert {event["name"] for event in events} == {
+        "notification",
+        "registration",
+        "event receipt",
+        "decision",
+        "deliver",
+        "send slack",
+    }
+    assert events[0]["args"]["decision"] == "sent"
+    assert params.trace is None
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append(
+            (self.client_address, self.headers.get("Authorization"), json.loads(body))
+        )
+        status = self.server.status
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def webhook_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RecordingHandler)
+    server.requests = []
+    server.status = 200
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def webhook_extension(make_extension, webhook_server):
+    def make(**options):
+        return make_extension(
+            config={
+                "WebhookBackend": {
+                    "url": f"http://127.0.0.1:{webhook_server.server_port}/hook",
+                    "headers": {"Authorization": "Bearer secret"},
+                    **options,
+                }
+            }
+        )
+
+    return make
+
+
+def test_posts_reuse_keepalive_connection(webhook_server, webhook_extension):
+    """Consecutive notifications are posted over one persistent connection."""
+    ext = webhook_extension()
+
+    for i in range(3):
+        assert ext.backends.deliver(f"message {i}", ["webhook"]) == {"webhook": True}
+    ext.backends.close()
+
+    requests = webhook_server.requests
+    assert [body for _, _, body in requests] == [
+        {"text": f"message {i}"} for i in range(3)
+    ]
+    assert all(auth == "Bearer secret" for _, auth, _ in requests)
+    assert len({address for address, _, _ in requests}) == 1
+
+
+def test_batch_posts_json_array(webhook_server, webhook_extension):
+    """With batching enabled, concurrent notifications become one request."""
+    ext = webhook_extension(batch=True, batch_window=0.05)
+    backend = ext.backends.get("webhook")
+
+    async def burst():
+        return await asyncio.gather(*(backend.send(f"m{i}") for i in range(5)))
+
+    results = asyncio.run(burst())
+    asyncio.run(backend.close())
+
+    assert results == [True] * 5
+    assert len(webhook_server.requests) == 1
+    assert webhook_server.requests[0][2] == [{"text": f"m{i}"} for i in range(5)]
+
+
+def test_error_status_is_a_failed_delivery(webhook_server, webhook_extension):
+    """Non-2xx responses and unreachable endpoints report failure."""
+    webhook_server.status = 503
+    ext = webhook_extension()
+    assert ext.backends.deliver("down", ["webhook"]) == {"webhook": False}
+    ext.backends.close()
+
+    unreachable = webhook_extension(timeout=1.0)
+    backend = unreachable.backends.get("webhook")
+    backend.url = "http://127.0.0.1:1/hook"
+    assert asyncio.run(backend.send("nowhere")) is False
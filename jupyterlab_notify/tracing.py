@@ -0,0 +1,274 @@
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+CHROME = "chrome"
+OTLP = "otlp"
+
+_NULL_CONTEXT = nullcontext()
+
+
+@dataclass
+class Span:
+    """A timed operation of a notification; times are in epoch nanoseconds."""
+
+    span_id: str
+    name: str
+    start: int
+    end: Optional[int] = None
+    parent_id: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+class Trace:
+    """
+    The spans of one notification, from registration to channel delivery.
+
+    The root span covers the whole notification; child spans are recorded
+    from any thread and the trace is exported once, when it ends.
+    """
+
+    sampled = True
+
+    def __init__(self, tracer: "Tracer", name: str, **attributes: Any) -> None:
+        self.tracer = tracer
+        self.trace_id = _new_id(16)
+        self.root = Span(_new_id(8), name, time.time_ns(), attributes=attributes)
+        self.spans: List[Span] = []
+        self._open: Dict[str, Span] = {}
+        self._lock = threading.Lock()
+        self._ended = False
+
+    def begin(self, name: str, **attributes: Any) -> None:
+        """Open a child span that is closed by ``finish`` or when the trace ends."""
+        self._open[name] = Span(
+            _new_id(8),
+            name,
+            time.time_ns(),
+            parent_id=self.root.span_id,
+            attributes=attributes,
+        )
+
+    def finish(self, name: str, **attributes: Any) -> None:
+        """Close a child span opened by ``begin``."""
+        span = self._open.pop(name, None)
+        if span is None:
+            return
+        span.end = time.time_ns()
+        span.attributes.update(attributes)
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Time the enclosed block as a child span."""
+        span = Span(
+            _new_id(8),
+            name,
+            time.time_ns(),
+            parent_id=self.root.span_id,
+            attributes=attributes,
+        )
+        try:
+            yield span
+        finally:
+            span.end = time.time_ns()
+            with self._lock:
+                self.spans.append(span)
+
+    def add_span(self, name: str, start: int, end: int, **attributes: Any) -> None:
+        """Record a child span measured by the caller, in epoch nanoseconds."""
+        with self._lock:
+            self.spans.append(
+                Span(
+                    _new_id(8),
+                    name,
+                    start,
+                    end,
+                    parent_id=self.root.span_id,
+                    attributes=attributes,
+                )
+            )
+
+    def end(self, **attributes: Any) -> None:
+        """End the root span and export the trace; later calls are ignored."""
+        for name in list(self._open):
+            self.finish(name)
+        with self._lock:
+            if self._ended:
+                return
+            self._ended = True
+            self.root.end = time.time_ns()
+            self.root.attributes.update(attributes)
+        self.tracer.export(self)
+
+
+class _NoopTrace:
+    """Stand-in for traces that are disabled or not sampled."""
+
+    sampled = False
+
+    def begin(self, name: str, **attributes: Any) -> None:
+        pass
+
+    def finish(self, name: str, **attributes: Any) -> None:
+        pass
+
+    def span(self, name: str, **attributes: Any) -> Any:
+        return _NULL_CONTEXT
+
+    def add_span(self, name: str, start: int, end: int, **attributes: Any) -> None:
+        pass
+
+    def end(self, **attributes: Any) -> None:
+        pass
+
+
+NOOP_TRACE = _NoopTrace()
+
+
+class Tracer:
+    """
+    Start notification traces and append finished ones to a file.
+
+    Traces are written as Chrome trace events (open the file in Perfetto
+    or ``chrome://tracing``) or as OTLP-JSON lines, one export request per
+    trace. Only a ``sample_rate`` fraction of notifications is traced. When
+    no path is set, ``start`` returns a shared no-op trace, so the
+    instrumentation costs one attribute lookup and call per span.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        format: str = CHROME,
+        sample_rate: float = 1.0,
+        log: Any = None,
+    ) -> None:
+        self.path = path
+        self.format = format
+        self.sample_rate = sample_rate
+        self.log = log
+        self._file: Any = None
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and self.sample_rate > 0
+
+    def start(self, name: str, **attributes: Any) -> Any:
+        """
+        Start the trace of a notification.
+
+        Returns:
+            A Trace, or a no-op trace if tracing is disabled or the
+            notification is not sampled.
+        """
+        if not self.enabled or random.random() >= self.sample_rate:
+            return NOOP_TRACE
+        return Trace(self, name, **attributes)
+
+    def export(self, trace: Trace) -> None:
+        """Append a finished trace to the trace file."""
+        if self.format == OTLP:
+            lines = [json.dumps(self._otlp(trace))]
+        else:
+            lines = [json.dumps(event) for event in self._chrome(trace)]
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._open()
+                for line in lines:
+                    self._file.write(line + (",\n" if self.format != OTLP else "\n"))
+                self._file.flush()
+            except OSError as exc:
+                self.log.error(f"Failed to write notification trace: {exc}")
+
+    def close(self) -> None:
+        """Close the trace file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, "a", encoding="utf-8")
+        if new and self.format != OTLP:
+            # The closing bracket of the JSON array format is optional.
+            self._file.write("[\n")
+
+    def _chrome(self, trace: Trace) -> List[Dict[str, Any]]:
+        # One row per trace in the viewer.
+        tid = int(trace.trace_id[:8], 16)
+        return [
+            {
+                "name": span.name,
+                "cat": "notify",
+                "ph": "X",
+                "ts": span.start / 1000,
+                "dur": (span.end - span.start) / 1000,
+                "pid": self._pid,
+                "tid": tid,
+                "args": dict(span.attributes, trace_id=trace.trace_id),
+            }
+            for span in [trace.root, *trace.spans]
+        ]
+
+    def _otlp(self, trace: Trace) -> Dict[str, Any]:
+        spans = []
+        for span in [trace.root, *trace.spans]:
+            otlp_span = {
+                "traceId": trace.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start),
+                "endTimeUnixNano": str(span.end),
+                "attributes": [
+                    {"key": key, "value": _otlp_value(value)}
+                    for key, value in span.attributes.items()
+                    if value is not None
+                ],
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            spans.append(otlp_span)
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": "jupyterlab-notify"},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {"scope": {"name": "jupyterlab_notify"}, "spans": spans}
+                    ],
+                }
+            ]
+        }
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
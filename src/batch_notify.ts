@@ -1,22 +1,35 @@
 import { IRenderMimeRegistry } from '@jupyterlab/rendermime';
 import { MimeModel } from '@jupyterlab/rendermime';
+import type { ReadonlyPartialJSONObject } from '@lumino/coreutils';
 import type { INotificationData, NotifyType } from './token';
 
 const MIME_TYPE = 'application/desktop-notify+json';
 
+/**
+ * Quiet period after which buffered notifications are shown, in milliseconds
+ */
+const BATCH_WINDOW = 3000;
+
+/**
+ * Longest a notification is held back while a burst goes on, in milliseconds
+ */
+const MAX_BATCH_WINDOW = 60000;
+
 interface IBatchState {
   buffer: INotificationData[];
   timer: number | null;
+  // When the current window opened, and when it closes unless extended
+  opened: number;
+  deadline: number;
 }
 
 export class BatchNotifier {
-  // States are now per type and per notebookId
-  private states: Record<NotifyType, Record<string, IBatchState>> = {
-    completed: {},
-    failed: {},
-    timeout: {},
+  // States per type and per notebookId, only while a window is open
+  private states: Record<NotifyType, Map<string, IBatchState>> = {
+    completed: new Map(),
+    failed: new Map(),
+    timeout: new Map(),
   };
-  private readonly batchWindow = 3000; // ms
 
   constructor(private rendermime: IRenderMimeRegistry) {}
 
@@ -26,47 +39,117 @@ export class BatchNotifier {
       // If somehow notebookId is missing.
       return;
     }
-    if (!this.states[type][notebookId]) {
-      this.states[type][notebookId] = { buffer: [], timer: null };
-    }
-    const state = this.states[type][notebookId];
+    const now = Date.now();
+    const state = this.states[type].get(notebookId);
 
-    if (state.timer === null) {
+    if (!state) {
       // first of its kind: show immediately
-      this.showSingle(data);
+      void this.showSingle(data);
 
       // start window to batch any immediate follow-ups of the same type and notebook
-      state.timer = window.setTimeout(
-        () => this.flush(type, notebookId),
-        this.batchWindow,
-      );
+      this.openWindow(type, notebookId, now);
     } else {
-      // within window: buffer it
+      // within window: buffer it, and keep the window open while the burst
+      // goes on, up to MAX_BATCH_WINDOW
       state.buffer.push(data);
+      state.deadline = Math.min(
+        now + BATCH_WINDOW,
+        state.opened + MAX_BATCH_WINDOW,
+      );
     }
   }
 
+  /**
+   * Show several notifications at once as a single summary
+   */
+  async notifyAll(batch: INotificationData[], title: string) {
+    if (batch.length === 0) {
+      return;
+    }
+    if (batch.length === 1) {
+      await this.showSingle(batch[0]);
+      return;
+    }
+    await this.showSingle({
+      ...batch[0],
+      payload: {
+        ...batch[0].payload,
+        title,
+        body: batch.map(notification => notification.payload.title).join('\n'),
+      },
+    });
+  }
+
+  /**
+   * Show what is buffered for a notebook and forget its windows
+   *
+   * @param notebookId Id of a notebook that was closed
+   */
+  disposeNotebook(notebookId: string) {
+    for (const type of Object.keys(this.states) as NotifyType[]) {
+      const state = this.states[type].get(notebookId);
+      if (!state) {
+        continue;
+      }
+      if (state.timer !== null) {
+        window.clearTimeout(state.timer);
+      }
+      this.states[type].delete(notebookId);
+      void this.show(state.buffer);
+    }
+  }
+
+  private openWindow(type: NotifyType, notebookId: string, now: number) {
+    const state: IBatchState = {
+      buffer: [],
+      timer: null,
+      opened: now,
+      deadline: now + BATCH_WINDOW,
+    };
+    state.timer = window.setTimeout(
+      () => this.flush(type, notebookId),
+      BATCH_WINDOW,
+    );
+    this.states[type].set(notebookId, state);
+  }
+
   private async flush(type: NotifyType, notebookId: string) {
-    const state = this.states[type][notebookId];
-    state.timer = null;
+    const state = this.states[type].get(notebookId);
+    if (!state) {
+      return;
+    }
+    const now = Date.now();
+    if (state.deadline > now) {
+      // The window was extended since the timer was set
+      state.timer = window.setTimeout(
+        () => this.flush(type, notebookId),
+        state.deadline - now,
+      );
+      return;
+    }
 
+    this.states[type].delete(notebookId);
     if (state.buffer.length === 0) {
       return;
     }
+    // A burst that outlasted the window may go on: batch what follows too
+    this.openWindow(type, notebookId, now);
+    await this.show(state.buffer);
+  }
 
-    if (state.buffer.length === 1) {
-      await this.showSingle(state.buffer[0]);
-    } else {
-      await this.showBatch(state.buffer);
+  private async show(buffer: INotificationData[]) {
+    if (buffer.length === 1) {
+      await this.showSingle(buffer[0]);
+    } else if (buffer.length > 1) {
+      await this.showBatch(buffer);
     }
-
-    state.buffer = [];
   }
 
   private async showSingle(data: INotificationData) {
     try {
       const mimeModel = new MimeModel({
-        data: { [MIME_TYPE]: JSON.parse(JSON.stringify(data)) },
+        // Rendering only reads the notification
+        data: { [MIME_TYPE]: data as unknown as ReadonlyPartialJSONObject },
       });
       const renderer = this.rendermime.createRenderer(MIME_TYPE);
       await renderer.renderModel(mimeModel);
@@ -99,7 +182,9 @@ export class BatchNotifier {
 
     try {
       const mimeModel = new MimeModel({
-        data: { [MIME_TYPE]: JSON.parse(JSON.stringify(summary)) },
+        data: {
+          [MIME_TYPE]: summary as unknown as ReadonlyPartialJSONObject,
+        },
       });
       const renderer = this.rendermime.createRenderer(MIME_TYPE);
       await renderer.renderModel(mimeModel);
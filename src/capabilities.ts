@@ -0,0 +1,92 @@
+import { URLExt } from '@jupyterlab/coreutils';
+
+import { ServerConnection } from '@jupyterlab/services';
+
+import { IInitialResponse } from './token';
+
+/**
+ * Minimum time between two revalidations, in milliseconds
+ */
+const MIN_REVALIDATE_INTERVAL = 5000;
+
+/**
+ * Capabilities assumed until the server answered
+ */
+const UNKNOWN: IInitialResponse = {
+  nbmodel_installed: false,
+  kernel_tap: false,
+  email_configured: false,
+  slack_configured: false,
+  smtp_server_running: false,
+  resource_monitoring: false,
+  channels: [],
+};
+
+/**
+ * Client copy of the server's capability snapshot
+ *
+ * Revalidation sends the ETag of the current copy, so while nothing changed
+ * the server answers 304 without a body. Concurrent refreshes share one
+ * request, and refreshes within a few seconds of the last one return the
+ * current copy without any request.
+ */
+export class ServerCapabilities {
+  private _current: IInitialResponse = UNKNOWN;
+  private _etag: string | null = null;
+  private _checkedAt = 0;
+  private _pending: Promise<IInitialResponse> | null = null;
+
+  /**
+   * The latest known capabilities
+   */
+  get current(): IInitialResponse {
+    return this._current;
+  }
+
+  /**
+   * Revalidate the capabilities with the server
+   *
+   * @param force Revalidate even if the copy was checked recently
+   * @returns The up-to-date capabilities; the previous ones if the server
+   * could not be reached
+   */
+  refresh(force = false): Promise<IInitialResponse> {
+    if (this._pending) {
+      return this._pending;
+    }
+    if (!force && Date.now() - this._checkedAt < MIN_REVALIDATE_INTERVAL) {
+      return Promise.resolve(this._current);
+    }
+    this._pending = this._revalidate().finally(() => {
+      this._pending = null;
+    });
+    return this._pending;
+  }
+
+  private async _revalidate(): Promise<IInitialResponse> {
+    const settings = ServerConnection.makeSettings();
+    const url = URLExt.join(settings.baseUrl, 'api/jupyter-notify/notify');
+    const headers: Record<string, string> = {};
+    if (this._etag) {
+      headers['If-None-Match'] = this._etag;
+    }
+    try {
+      // Bypass the browser cache so that a 304 reaches this code
+      const response = await ServerConnection.makeRequest(
+        url,
+        { headers, cache: 'no-store' },
+        settings,
+      );
+      if (response.status === 200) {
+        this._current = await response.json();
+        this._etag = response.headers.get('ETag');
+      } else if (response.status !== 304) {
+        throw new ServerConnection.ResponseError(response);
+      }
+      this._checkedAt = Date.now();
+    } catch (e) {
+      console.error('Checking server capability failed:', e);
+    }
+    return this._current;
+  }
+}
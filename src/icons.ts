@@ -4,6 +4,7 @@ import bellFilled from '../style/icons/bell-filled.svg';
 import bellOff from '../style/icons/bell-off.svg';
 import bellAlert from '../style/icons/bell-alert.svg';
 import bellClock from '../style/icons/bell-clock.svg';
+import bellGauge from '../style/icons/bell-gauge.svg';
 
 export const bellOutlineIcon = new LabIcon({
   name: 'notify:bell-outline',
@@ -29,3 +30,8 @@ export const bellClockIcon = new LabIcon({
   name: 'notify:bell-clock',
   svgstr: bellClock,
 });
+
+export const bellGaugeIcon = new LabIcon({
+  name: 'notify:bell-gauge',
+  svgstr: bellGauge,
+});
@@ -0,0 +1,226 @@
+import { URLExt } from '@jupyterlab/coreutils';
+
+import { ServerConnection } from '@jupyterlab/services';
+
+import { requestAPI } from './handler';
+import { IEventsResponse, IServerEvent, NotifyRequestType } from './token';
+
+const MAX_RECONNECT_DELAY = 30000;
+const LAST_EVENT_KEY = 'jupyterlab-notify:last-event';
+
+interface IPendingRequest {
+  resolve: () => void;
+  reject: (reason: Error) => void;
+}
+
+/**
+ * Persistent connection to the server carrying registrations, cancellations
+ * and triggers, and receiving notification and delivery events
+ *
+ * Requests fall back to the HTTP endpoints while the socket is not open.
+ * Whenever the socket opens, the notification events missed since the last
+ * one seen, also before a page reload, are fetched in one request.
+ */
+export class NotifySocket {
+  private _onEvent: (event: IServerEvent) => void;
+  private _onReplay: (events: IServerEvent[], truncated: boolean) => void;
+  private _storageKey: string;
+  private _epoch: string | null = null;
+  private _seq = 0;
+  // Live events received while missed ones are being fetched
+  private _replaying: IServerEvent[] | null = null;
+  private _ws: WebSocket | null = null;
+  private _pending: Map<number, IPendingRequest> = new Map();
+  private _lastId = 0;
+  private _attempts = 0;
+  private _reconnectTimer: number | null = null;
+  private _disposed = false;
+
+  constructor(options: NotifySocket.IOptions) {
+    this._onEvent = options.onEvent;
+    this._onReplay = options.onReplay;
+    this._storageKey = `${LAST_EVENT_KEY}:${
+      ServerConnection.makeSettings().baseUrl
+    }`;
+    try {
+      const stored = JSON.parse(localStorage.getItem(this._storageKey) ?? '');
+      this._epoch = stored.epoch;
+      this._seq = stored.seq;
+    } catch {
+      // Nothing seen yet
+    }
+    this._connect();
+  }
+
+  /**
+   * Send a request and resolve once the server acknowledged it
+   *
+   * @param type Request type
+   * @param payload Notification payload, or `{ cell_id }` for cancellations
+   */
+  send(type: NotifyRequestType, payload: object): Promise<void> {
+    const ws = this._ws;
+    if (!ws || ws.readyState !== WebSocket.OPEN) {
+      return this._sendHttp(type, payload);
+    }
+    const id = ++this._lastId;
+    return new Promise<void>((resolve, reject) => {
+      this._pending.set(id, { resolve, reject });
+      ws.send(JSON.stringify({ id, type, payload }));
+    });
+  }
+
+  /**
+   * Close the connection and stop reconnecting
+   */
+  dispose(): void {
+    this._disposed = true;
+    if (this._reconnectTimer) {
+      clearTimeout(this._reconnectTimer);
+    }
+    this._ws?.close();
+  }
+
+  private _connect(): void {
+    const settings = ServerConnection.makeSettings();
+    let url = URLExt.join(settings.wsUrl, 'api/jupyter-notify/ws');
+    if (settings.appendToken && settings.token) {
+      url += `?token=${encodeURIComponent(settings.token)}`;
+    }
+
+    const ws = new settings.WebSocket(url);
+    ws.onopen = () => {
+      this._attempts = 0;
+      void this._replay();
+    };
+    ws.onmessage = (event: MessageEvent) => {
+      this._handleMessage(event.data);
+    };
+    ws.onclose = () => {
+      this._ws = null;
+      // The outcome of unacknowledged requests is unknown
+      this._pending.forEach(({ reject }) =>
+        reject(new Error('Notification socket closed')),
+      );
+      this._pending.clear();
+      if (!this._disposed) {
+        const delay = Math.min(1000 * 2 ** this._attempts, MAX_RECONNECT_DELAY);
+        this._attempts++;
+        this._reconnectTimer = window.setTimeout(() => this._connect(), delay);
+      }
+    };
+    this._ws = ws;
+  }
+
+  private _handleMessage(data: string): void {
+    let message: IServerEvent | { type: 'ack'; id: number; ok: boolean };
+    try {
+      message = JSON.parse(data);
+    } catch (e) {
+      console.error('Invalid message on notification socket:', e);
+      return;
+    }
+    if (message.type !== 'ack') {
+      if (this._replaying) {
+        this._replaying.push(message);
+        return;
+      }
+      if (message.seq !== undefined) {
+        this._setSeq(message.seq);
+      }
+      this._onEvent(message);
+      return;
+    }
+    const pending = this._pending.get(message.id);
+    if (!pending) {
+      return;
+    }
+    this._pending.delete(message.id);
+    if (message.ok) {
+      pending.resolve();
+    } else {
+      pending.reject(new Error(`Notification ${message.id} was rejected`));
+    }
+  }
+
+  private async _replay(): Promise<void> {
+    const known = this._epoch !== null;
+    this._replaying = [];
+    try {
+      const reply = await requestAPI<IEventsResponse>(
+        known
+          ? `events?after=${this._seq}&epoch=${this._epoch}`
+          : 'events?after=0',
+      );
+      this._epoch = reply.epoch;
+      this._setSeq(reply.seq);
+      // On the very first connection there is nothing to catch up on
+      if (known && reply.events.length > 0) {
+        this._onReplay(reply.events, reply.truncated);
+      }
+    } catch (e) {
+      console.error('Failed to fetch missed notifications:', e);
+    }
+
+    const live = this._replaying;
+    this._replaying = null;
+    for (const event of live) {
+      if (event.seq !== undefined) {
+        if (event.seq <= this._seq) {
+          continue;
+        }
+        this._setSeq(event.seq);
+      }
+      this._onEvent(event);
+    }
+  }
+
+  private _setSeq(seq: number): void {
+    this._seq = seq;
+    try {
+      localStorage.setItem(
+        this._storageKey,
+        JSON.stringify({ epoch: this._epoch, seq }),
+      );
+    } catch {
+      // Storage may be unavailable, e.g. in private browsing
+    }
+  }
+
+  private async _sendHttp(
+    type: NotifyRequestType,
+    payload: object,
+  ): Promise<void> {
+    if (type === 'cancel') {
+      const cellId = (payload as { cell_id: string }).cell_id;
+      await requestAPI(`notify?cell_id=${encodeURIComponent(cellId)}`, {
+        method: 'DELETE',
+      });
+      return;
+    }
+    await requestAPI(type === 'register' ? 'notify' : 'notify-trigger', {
+      method: 'POST',
+      body: JSON.stringify(payload),
+    });
+  }
+}
+
+/**
+ * A namespace for NotifySocket statics
+ */
+export namespace NotifySocket {
+  /**
+   * Options to create a notification socket
+   */
+  export interface IOptions {
+    /**
+     * Called for every event pushed by the server
+     */
+    onEvent: (event: IServerEvent) => void;
+
+    /**
+     * Called with the notification events missed while disconnected
+     */
+    onReplay: (events: IServerEvent[], truncated: boolean) => void;
+  }
+}
@@ -0,0 +1,209 @@
+import {
+  CELL_CUSTOM_TIMEOUT_KEY,
+  CELL_DEFAULT_THRESHOLD_KEY,
+  INotifyMetadata,
+  INotifySettings,
+  ModeId,
+  NOTEBOOK_CUSTOM_TIMEOUT_KEY,
+  NOTEBOOK_DEFAULT_THRESHOLD_KEY,
+  NOTIFY_METADATA_KEY,
+  TIMEOUT_PATTERN,
+} from './token';
+
+/**
+ * Decodes a threshold string or number to seconds
+ * @param threshold - The threshold string (e.g., '2s', '5m', '1.5h') or number in seconds
+ * @returns The threshold in seconds, or null if invalid
+ */
+export function decodeThresholdToSeconds(threshold: string | number) {
+  if (typeof threshold === 'number') {
+    return threshold;
+  }
+  const match = threshold.match(TIMEOUT_PATTERN);
+  if (!match) {
+    return null;
+  }
+  const value = parseFloat(match[1]);
+  const unit = match[3];
+  switch (unit) {
+    case 's':
+      return value;
+    case 'm':
+      return value * 60;
+    case 'h':
+      return value * 3600;
+    default:
+      return null;
+  }
+}
+
+/**
+ * Retrieves the appropriate threshold value from cell, notebook, or settings
+ */
+export function getThresholdValue(
+  mode: ModeId,
+  cellMetadata: INotifyMetadata | undefined,
+  notebookMetadata: Record<string, string> | undefined,
+  settingsDefaultThreshold: number | null,
+  settingsCustomTimeout: number | null,
+): string | number | null {
+  if (mode === 'default') {
+    return (
+      cellMetadata?.[CELL_DEFAULT_THRESHOLD_KEY] ??
+      notebookMetadata?.[NOTEBOOK_DEFAULT_THRESHOLD_KEY] ??
+      settingsDefaultThreshold
+    );
+  }
+
+  if (mode === 'custom-timeout') {
+    return (
+      cellMetadata?.[CELL_CUSTOM_TIMEOUT_KEY] ??
+      notebookMetadata?.[NOTEBOOK_CUSTOM_TIMEOUT_KEY] ??
+      settingsCustomTimeout
+    );
+  }
+
+  return settingsDefaultThreshold;
+}
+
+/**
+ * Resolves the notification mode of a cell from cell, notebook, or settings
+ */
+export function resolveNotifyMode(
+  cellMetadata: Partial<INotifyMetadata> | undefined,
+  notebookMetadata: Partial<INotifyMetadata> | undefined,
+  settingsDefaultMode: ModeId,
+): ModeId {
+  return cellMetadata?.mode ?? notebookMetadata?.mode ?? settingsDefaultMode;
+}
+
+/**
+ * Notification mode and threshold a scheduled cell runs with
+ */
+export interface IResolvedNotify {
+  mode: ModeId;
+  /**
+   * Threshold as configured, for error messages
+   */
+  threshold: string | number | null;
+  /**
+   * Threshold in seconds; NaN if the configured value is invalid
+   */
+  seconds: number | null;
+}
+
+/**
+ * A cell or notebook model carrying notify metadata
+ */
+export interface IMetadataSource {
+  getMetadata(key: string): any;
+}
+
+/**
+ * What a cell without its own settings inherits from a notebook
+ */
+interface INotebookDefaults {
+  mode: ModeId;
+  default: Omit<IResolvedNotify, 'mode'>;
+  customTimeout: Omit<IResolvedNotify, 'mode'>;
+  other: Omit<IResolvedNotify, 'mode'>;
+}
+
+/**
+ * Resolves the notification mode and threshold of scheduled cells
+ *
+ * What cells inherit from a notebook and the settings is decoded once per
+ * notebook and reused until the notebook's metadata or the settings change,
+ * so resolving a cell without settings of its own costs a map lookup.
+ */
+export class NotifyResolver {
+  private _settings: INotifySettings;
+  private _byNotebook: WeakMap<IMetadataSource, INotebookDefaults> =
+    new WeakMap();
+
+  constructor(settings: INotifySettings) {
+    this._settings = settings;
+  }
+
+  /**
+   * Use new settings, forgetting what every notebook inherited
+   */
+  set settings(settings: INotifySettings) {
+    this._settings = settings;
+    this._byNotebook = new WeakMap();
+  }
+
+  /**
+   * Forget what a notebook's cells inherit, e.g. after its metadata changed
+   */
+  invalidate(notebook: IMetadataSource): void {
+    this._byNotebook.delete(notebook);
+  }
+
+  /**
+   * Resolve the mode and threshold of a cell
+   *
+   * @param cell The cell model
+   * @param notebook The model of the cell's notebook, if any
+   * @returns The cell's settings, then the notebook's, then the defaults
+   */
+  resolve(
+    cell: IMetadataSource,
+    notebook: IMetadataSource | null,
+  ): IResolvedNotify {
+    const defaults = this._defaults(notebook);
+    const own = cell.getMetadata(NOTIFY_METADATA_KEY) as
+      | Partial<INotifyMetadata>
+      | undefined;
+    const mode = own?.mode ?? defaults.mode;
+    if (mode === 'default') {
+      const threshold = own?.[CELL_DEFAULT_THRESHOLD_KEY];
+      return { mode, ...(threshold ? decode(threshold) : defaults.default) };
+    }
+    if (mode === 'custom-timeout') {
+      const threshold = own?.[CELL_CUSTOM_TIMEOUT_KEY];
+      return {
+        mode,
+        ...(threshold ? decode(threshold) : defaults.customTimeout),
+      };
+    }
+    return { mode, ...defaults.other };
+  }
+
+  private _defaults(notebook: IMetadataSource | null): INotebookDefaults {
+    const cached = notebook ? this._byNotebook.get(notebook) : undefined;
+    if (cached) {
+      return cached;
+    }
+    const settings = this._settings;
+    const metadata = notebook?.getMetadata(NOTIFY_METADATA_KEY) as
+      | Partial<INotifyMetadata>
+      | undefined;
+    const defaults: INotebookDefaults = {
+      mode: resolveNotifyMode(undefined, metadata, settings.defaultMode),
+      default: decode(
+        metadata?.[NOTEBOOK_DEFAULT_THRESHOLD_KEY] ?? settings.defaultThreshold,
+      ),
+      customTimeout: decode(
+        metadata?.[NOTEBOOK_CUSTOM_TIMEOUT_KEY] ?? settings.customTimeout,
+      ),
+      other: decode(settings.defaultThreshold),
+    };
+    if (notebook) {
+      this._byNotebook.set(notebook, defaults);
+    }
+    return defaults;
+  }
+}
+
+function decode(
+  threshold: string | number | null | undefined,
+): Omit<IResolvedNotify, 'mode'> {
+  if (threshold === null || threshold === undefined) {
+    return { threshold: null, seconds: null };
+  }
+  return {
+    threshold,
+    seconds: decodeThresholdToSeconds(threshold) ?? NaN,
+  };
+}
@@ -1,3 +1,4 @@
+import { ICellModel } from '@jupyterlab/cells';
 import { KernelError } from '@jupyterlab/notebook';
 import { LabIcon } from '@jupyterlab/ui-components';
 
@@ -30,6 +31,10 @@ export interface INotifySettings {
   successMessage: string;
   defaultThreshold: number | null;
   customTimeout: number | null;
+  memoryThreshold: number | null;
+  cpuThreshold: number | null;
+  channels: string[];
+  runNotifications: boolean;
   alwaysNotifyOnError: boolean;
 }
 
@@ -47,9 +52,12 @@ export interface INotifyMetadata {
  */
 export interface IInitialResponse {
   nbmodel_installed: boolean;
+  kernel_tap: boolean;
   email_configured: boolean;
   slack_configured: boolean;
   smtp_server_running: boolean;
+  resource_monitoring: boolean;
+  channels: string[];
 }
 
 /**
@@ -60,12 +68,55 @@ export interface INotifyPayload {
   mode: ModeId;
   emailEnabled: boolean;
   slackEnabled: boolean;
+  channels: string[];
   successMessage: string;
   failureMessage: string;
   threshold: number | null;
   notebook_name: string;
+  notebook_path: string | null;
   notebookId: string;
   execution_count: number | null;
+  kernel_id: string | null;
+  memory_threshold: number | null;
+  cpu_threshold: number | null;
+  run_id: string | null;
+  run_size: number | null;
+  run_started: number | null;
+  msg_id: string | null;
+}
+
+/**
+ * Request sent to the server over the notification socket
+ */
+export type NotifyRequestType = 'register' | 'cancel' | 'trigger';
+
+/**
+ * Event pushed by the server over the notification socket
+ */
+export interface IServerEvent {
+  type: 'notification' | 'delivery';
+  // Sequence number of notification events, per user
+  seq?: number;
+  cell_id: string | null;
+  run_id?: string | null;
+  notebook_name?: string | null;
+  notebook_id?: string | null;
+  status?: string;
+  message?: string;
+  execution_count?: number | null;
+  // Delivery outcome per channel; 'deferred' when folded into a digest
+  results?: { [channel: string]: boolean | 'deferred' };
+}
+
+/**
+ * Notification events replayed after a reconnection
+ */
+export interface IEventsResponse {
+  epoch: string;
+  seq: number;
+  events: IServerEvent[];
+  // Whether older missed events were already dropped by the server
+  truncated: boolean;
 }
 
 /**
@@ -76,6 +127,19 @@ export interface ICellNotification {
   timeoutId: number | null;
   notificationIssued: boolean;
   notebookId: string;
+  cell: ICellModel;
+}
+
+/**
+ * Progress of cells scheduled together, e.g. by "Run All"
+ */
+export interface IRunState {
+  id: string;
+  size: number;
+  started: number;
+  finished: number;
+  failed: number;
+  notified: boolean;
 }
 
 /**
@@ -104,6 +168,7 @@ export const ModeIds = [
   'never',
   'on-error',
   'custom-timeout',
+  'resource-threshold',
 ] as const;
 export type ModeId = (typeof ModeIds)[number];
 
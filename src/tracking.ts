@@ -0,0 +1,153 @@
+/**
+ * A tracked value that belongs to a notebook
+ */
+export interface INotebookScoped {
+  notebookId: string;
+}
+
+/**
+ * Pending notifications by cell, indexed by notebook and by the msg_ids of
+ * the execute_requests sent for each cell
+ *
+ * Every operation costs time proportional to the cells or messages it
+ * affects, never to the number of tracked cells or open notebooks.
+ */
+export class NotificationTracker<T extends INotebookScoped> {
+  private _byCell: Map<string, T> = new Map();
+  private _byNotebook: Map<string, Set<string>> = new Map();
+  private _cellByMsg: Map<string, string> = new Map();
+  private _msgsByCell: Map<string, Set<string>> = new Map();
+
+  /**
+   * Number of tracked cells
+   */
+  get size(): number {
+    return this._byCell.size;
+  }
+
+  /**
+   * Return the value tracked for a cell
+   */
+  get(cellId: string): T | undefined {
+    return this._byCell.get(cellId);
+  }
+
+  /**
+   * Whether a cell is tracked
+   */
+  has(cellId: string): boolean {
+    return this._byCell.has(cellId);
+  }
+
+  /**
+   * Track a cell, replacing any previous value
+   */
+  set(cellId: string, value: T): void {
+    const previous = this._byCell.get(cellId);
+    if (previous && previous.notebookId !== value.notebookId) {
+      this._removeFromNotebook(previous.notebookId, cellId);
+    }
+    this._byCell.set(cellId, value);
+    let cells = this._byNotebook.get(value.notebookId);
+    if (!cells) {
+      cells = new Set();
+      this._byNotebook.set(value.notebookId, cells);
+    }
+    cells.add(cellId);
+  }
+
+  /**
+   * Stop tracking a cell and forget its messages
+   */
+  delete(cellId: string): boolean {
+    const value = this._byCell.get(cellId);
+    if (!value) {
+      return false;
+    }
+    this.clearMessages(cellId);
+    this._byCell.delete(cellId);
+    this._removeFromNotebook(value.notebookId, cellId);
+    return true;
+  }
+
+  /**
+   * Iterate over the cells tracked in a notebook
+   */
+  *inNotebook(notebookId: string): IterableIterator<[string, T]> {
+    const cells = this._byNotebook.get(notebookId);
+    if (!cells) {
+      return;
+    }
+    // Copy, so that callers may delete while iterating
+    for (const cellId of [...cells]) {
+      const value = this._byCell.get(cellId);
+      if (value) {
+        yield [cellId, value];
+      }
+    }
+  }
+
+  /**
+   * Associate an execute_request with a tracked cell
+   */
+  addMessage(msgId: string, cellId: string): void {
+    if (!this._byCell.has(cellId)) {
+      return;
+    }
+    this._cellByMsg.set(msgId, cellId);
+    let msgs = this._msgsByCell.get(cellId);
+    if (!msgs) {
+      msgs = new Set();
+      this._msgsByCell.set(cellId, msgs);
+    }
+    msgs.add(msgId);
+  }
+
+  /**
+   * Return the cell of an execute_request and forget the association
+   */
+  takeMessage(msgId: string): string | undefined {
+    const cellId = this._cellByMsg.get(msgId);
+    if (cellId === undefined) {
+      return undefined;
+    }
+    this._cellByMsg.delete(msgId);
+    const msgs = this._msgsByCell.get(cellId);
+    msgs?.delete(msgId);
+    if (msgs?.size === 0) {
+      this._msgsByCell.delete(cellId);
+    }
+    return cellId;
+  }
+
+  /**
+   * Forget the execute_requests of a cell
+   */
+  clearMessages(cellId: string): void {
+    const msgs = this._msgsByCell.get(cellId);
+    if (!msgs) {
+      return;
+    }
+    for (const msgId of msgs) {
+      this._cellByMsg.delete(msgId);
+    }
+    this._msgsByCell.delete(cellId);
+  }
+
+  /**
+   * Forget the execute_requests of every cell of a notebook
+   */
+  clearNotebookMessages(notebookId: string): void {
+    for (const cellId of this._byNotebook.get(notebookId) ?? []) {
+      this.clearMessages(cellId);
+    }
+  }
+
+  private _removeFromNotebook(notebookId: string, cellId: string): void {
+    const cells = this._byNotebook.get(notebookId);
+    cells?.delete(cellId);
+    if (cells?.size === 0) {
+      this._byNotebook.delete(notebookId);
+    }
+  }
+}
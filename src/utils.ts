@@ -14,13 +14,9 @@ import {
   TIMEOUT_PATTERN,
   NOTEBOOK_FILE_EXTENSION,
   INotifyMetadata,
-  CELL_DEFAULT_THRESHOLD_KEY,
-  CELL_CUSTOM_TIMEOUT_KEY,
-  NOTEBOOK_DEFAULT_THRESHOLD_KEY,
-  NOTEBOOK_CUSTOM_TIMEOUT_KEY,
-  ModeId,
   IExecutionTimingMetadata,
   NotifyType,
+  NOTIFY_METADATA_KEY,
 } from './token';
 import { ITranslator, nullTranslator } from '@jupyterlab/translation';
 import { KernelError } from '@jupyterlab/notebook';
@@ -244,33 +240,6 @@ export const displayConfigWarning = (
   });
 };
 
-/**
- * Decodes a threshold string or number to seconds
- * @param threshold - The threshold string (e.g., '2s', '5m', '1.5h') or number in seconds
- * @returns The threshold in seconds, or null if invalid
- */
-export function decodeThresholdToSeconds(threshold: string | number) {
-  if (typeof threshold === 'number') {
-    return threshold;
-  }
-  const match = threshold.match(TIMEOUT_PATTERN);
-  if (!match) {
-    return null;
-  }
-  const value = parseFloat(match[1]);
-  const unit = match[3];
-  switch (unit) {
-    case 's':
-      return value;
-    case 'm':
-      return value * 60;
-    case 'h':
-      return value * 3600;
-    default:
-      return null;
-  }
-}
-
 /**
  * Parses a threshold string like '2s', '5m', '1.5h' and returns value and TimeUnit
  * @param threshold - The threshold string or number
@@ -321,32 +290,41 @@ export interface ITimeoutPromptOptions {
 }
 
 /**
- * Retrieves the appropriate threshold value from cell, notebook, or settings
+ * Formats a threshold for display; bare numbers are in seconds
  */
-export function getThresholdValue(
-  mode: ModeId,
-  cellMetadata: INotifyMetadata | undefined,
-  notebookMetadata: Record<string, string> | undefined,
-  settingsDefaultThreshold: number | null,
-  settingsCustomTimeout: number | null,
-): string | number | null {
-  if (mode === 'default') {
-    return (
-      cellMetadata?.[CELL_DEFAULT_THRESHOLD_KEY] ??
-      notebookMetadata?.[NOTEBOOK_DEFAULT_THRESHOLD_KEY] ??
-      settingsDefaultThreshold
-    );
+export function formatThreshold(
+  value: string | number | null | undefined,
+): string | null {
+  if (value === null || value === undefined || value === '') {
+    return null;
   }
+  return typeof value === 'number' ? `${value}s` : value;
+}
 
-  if (mode === 'custom-timeout') {
-    return (
-      cellMetadata?.[CELL_CUSTOM_TIMEOUT_KEY] ??
-      notebookMetadata?.[NOTEBOOK_CUSTOM_TIMEOUT_KEY] ??
-      settingsCustomTimeout
-    );
-  }
+/**
+ * Model that stores notify metadata: a cell or a notebook
+ */
+interface INotifyMetadataOwner {
+  setMetadata(key: string, value: any): void;
+  deleteMetadata(key: string): void;
+}
 
-  return settingsDefaultThreshold;
+/**
+ * Stores notify metadata on a model, or removes the key when nothing differs
+ * from what the model inherits
+ */
+export function storeNotifyMetadata(
+  model: INotifyMetadataOwner,
+  metadata: Partial<INotifyMetadata>,
+): void {
+  const entries = Object.entries(metadata).filter(
+    ([, value]) => value !== undefined && value !== null && value !== '',
+  );
+  if (entries.length === 0) {
+    model.deleteMetadata(NOTIFY_METADATA_KEY);
+  } else {
+    model.setMetadata(NOTIFY_METADATA_KEY, Object.fromEntries(entries));
+  }
 }
 
 /**
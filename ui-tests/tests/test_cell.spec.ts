@@ -21,17 +21,23 @@ test('Toggle notification mode updates icon and metadata', async ({ page }) => {
   await page.locator('.jp-Collapse-header:has-text("ADVANCED TOOLS")').click();
   const metadata = page.locator('.jp-JSONEditor-host').first();
 
-  // Check initial icon and metadata (default mode: 'default')
+  // Check initial icon and metadata (default mode: 'default', inherited)
   let icon = await toolbarButton.locator('svg').getAttribute('data-icon');
   expect(icon).toBe('notify:bell-outline');
-  await expect(metadata).toContainText('"mode": "default"');
+  await expect(metadata).not.toContainText('"mode"');
 
-  // Toggle to 'default'
+  // Toggle to 'default'; the inherited mode is not stored
   await selectCellNotificationMode(page, 0, 'Default');
   icon = await toolbarButton.locator('svg').getAttribute('data-icon');
   expect(icon).toBe('notify:bell-outline'); // bellOutlineIcon
-  await expect(metadata).toContainText('"mode": "default"');
-  await expect(metadata).toContainText('"defaultThreshold": "30s"');
+  await expect(metadata).not.toContainText('"mode"');
+  await expect(metadata).not.toContainText('"defaultThreshold"');
+  // The settings threshold, which used to be copied, is inherited instead
+  await toolbarButton.click();
+  await expect(
+    page.locator('.lm-Menu-item:has-text("Default (30s)")'),
+  ).toBeVisible();
+  await page.keyboard.press('Escape');
 
   // Toggle to 'on-error'
   await selectCellNotificationMode(page, 0, 'On error');
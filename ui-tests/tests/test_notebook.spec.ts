@@ -9,18 +9,22 @@ import {
   selectCellNotificationMode,
 } from './helpers';
 
-test('New Notebook metadata contains all required notify properties', async ({
+test('New Notebook metadata has no notify properties until one is set', async ({
   page,
 }) => {
   await createNewNotebook(page, 'test.ipynb');
   await page.sidebar.close('left');
 
   const metadata = await openNotebookMetadata(page);
+  await expect(metadata).not.toContainText('jupyterlab_notify.notify');
 
+  // The settings default is inherited, so choosing it stores nothing
+  await setNotebookNotifyType(page, 'Default');
+  await expect(metadata).not.toContainText('jupyterlab_notify.notify');
+
+  await setNotebookNotifyType(page, 'Never');
   await expect(metadata).toContainText('jupyterlab_notify.notify');
-  await expect(metadata).toContainText('"mode": "default"');
-  await expect(metadata).toContainText('"customTimeout":');
-  await expect(metadata).toContainText('"defaultThreshold":');
+  await expect(metadata).toContainText('"mode": "never"');
 });
 
 test('setNotebookDefaultThreshold toolbar button updates notebook metadata', async ({
@@ -159,8 +163,19 @@ test('New cells inherit notebook notifyType setting', async ({ page }) => {
   await page.sidebar.close('right');
   await page.notebook.addCell('code', '# New cell');
 
+  // The mode is inherited when the cell runs, not copied into the cell
+  await page.notebook.enterCellEditingMode(1);
+  const cell = await page.notebook.getCellLocator(1);
+  const toolbarButton = cell!.locator(
+    '[data-jp-item-name="cellNotifyMenu"]',
+  );
+  await expect(toolbarButton.locator('svg')).toHaveAttribute(
+    'data-icon',
+    'notify:bell-off',
+  );
+
   const cellMetadata = await openCellMetadata(page, 1);
-  await expect(cellMetadata).toContainText('"mode": "never"');
+  await expect(cellMetadata).not.toContainText('jupyterlab_notify.notify');
 });
 
 test('Multiple sequential timeout changes update correctly', async ({
@@ -0,0 +1,78 @@
+import { test, expect } from '@jupyterlab/galata';
+
+/**
+ * Number of code cells in the large notebook
+ */
+const CELL_COUNT = 5000;
+
+/**
+ * Build a notebook with CELL_COUNT short code cells and no notify metadata
+ */
+function largeNotebook(): string {
+  const cells = Array.from({ length: CELL_COUNT }, (_, i) => ({
+    cell_type: 'code',
+    execution_count: null,
+    metadata: {},
+    outputs: [],
+    source: `x = ${i}`,
+  }));
+  return JSON.stringify({
+    cells,
+    metadata: {
+      kernelspec: {
+        display_name: 'Python 3 (ipykernel)',
+        language: 'python',
+        name: 'python3',
+      },
+    },
+    nbformat: 4,
+    nbformat_minor: 5,
+  });
+}
+
+test('Opening a large notebook writes no notify metadata', async ({
+  page,
+}, testInfo) => {
+  const path = 'large.ipynb';
+  await page.contents.uploadContent(largeNotebook(), 'text', path);
+
+  const start = Date.now();
+  await page.notebook.openByPath(path);
+  await page.notebook.activate(path);
+  const toolbar = await page.notebook.getToolbarLocator();
+  await expect(
+    toolbar!.locator('[data-jp-item-name="notifyType"]'),
+  ).toBeVisible();
+  await page.notebook.enterCellEditingMode(0);
+  const timeToInteractive = Date.now() - start;
+
+  const state = await page.evaluate(() => {
+    const panel = window.jupyterapp.shell.currentWidget as any;
+    const model = panel.context.model;
+    let stamped = 0;
+    for (const cell of model.cells) {
+      if (cell.getMetadata('jupyterlab_notify.notify')) {
+        stamped++;
+      }
+    }
+    return {
+      dirty: model.dirty as boolean,
+      notebookStamped: !!model.getMetadata('jupyterlab_notify.notify'),
+      stamped,
+    };
+  });
+
+  // Recorded in the report, to compare runs across commits
+  testInfo.annotations.push({
+    type: 'time-to-interactive',
+    description: `${timeToInteractive} ms with ${CELL_COUNT} cells`,
+  });
+  await testInfo.attach('time-to-interactive', {
+    body: JSON.stringify({ cells: CELL_COUNT, ms: timeToInteractive }),
+    contentType: 'application/json',
+  });
+
+  expect(state.dirty).toBe(false);
+  expect(state.notebookStamped).toBe(false);
+  expect(state.stamped).toBe(0);
+});